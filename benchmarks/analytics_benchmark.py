@@ -0,0 +1,125 @@
+# Бенчмарк загрузки аналитики при запуске и расчета статистики
+#
+# Заполняет временную базу синтетическими записями analytics_messages
+# и сравнивает загрузку итогов из агрегатов (Analytics.load_history)
+# с полным перечитыванием всех записей, как было до появления analytics_rollup.
+#
+# Запуск из корня репозитория:
+#     python benchmarks/analytics_benchmark.py --records 1000000
+
+# Импорт необходимых библиотек
+import argparse                           # Разбор аргументов командной строки
+import os                                 # Библиотека для работы с системой
+import random                             # Генерация синтетических данных
+import sys                                # Библиотека для работы с системой
+import tempfile                           # Временная папка для базы бенчмарка
+import time                               # Замер времени
+import tracemalloc                        # Замер памяти
+from datetime import datetime, timedelta  # Временные метки записей
+from pathlib import Path                  # Библиотека для работы с системными путями
+
+# Модули приложения лежат в папке src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+MODELS = ["openai/gpt-4o-mini", "anthropic/claude-3-haiku", "google/gemini-flash-1.5", "meta-llama/llama-3-8b"]
+
+
+def full_replay(cache) -> dict:
+    """
+        Загрузка аналитики перечитыванием всех записей (прежний способ).
+    """
+    model_usage = {}
+    session_data = []
+    for timestamp, model, message_length, response_time, tokens_used, cache_hit, _ in cache.get_analytics_history():
+        if cache_hit:
+            continue
+        usage = model_usage.setdefault(model, {'count': 0, 'tokens': 0})
+        usage['count'] += 1
+        usage['tokens'] += tokens_used
+        session_data.append({
+            'timestamp': datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S.%f'),
+            'model': model,
+            'message_length': message_length,
+            'response_time': response_time,
+            'tokens_used': tokens_used
+        })
+    return model_usage
+
+
+def measure(fn, repeat: int = 1):
+    """
+        Лучшее время выполнения (мс) и пик выделенной памяти (МБ).
+        Память замеряется отдельным запуском: tracemalloc замедляет выполнение.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, (time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк загрузки аналитики")
+    parser.add_argument("--records", type=int, default=1_000_000, help="Количество записей аналитики")
+    parser.add_argument("--days", type=int, default=365, help="За сколько дней распределить записи")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора данных")
+    args = parser.parse_args()
+
+    # База создается во временной папке, рабочая аналитика не затрагивается
+    os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="analytics_bench_")
+    from cache import ChatCache
+    from analytics import Analytics
+
+    cache = ChatCache()
+    conn = cache.get_connection()
+    rng = random.Random(args.seed)
+
+    # Заполнение аналитики (агрегаты обновляются триггером на каждую вставку)
+    started = time.perf_counter()
+    start_date = datetime.now() - timedelta(days=args.days)
+    step = args.days * 86400 / args.records
+    batch = 10_000
+    for offset in range(0, args.records, batch):
+        rows = [
+            (
+                start_date + timedelta(seconds=(offset + i) * step),
+                rng.choice(MODELS),
+                rng.randint(5, 500),
+                rng.uniform(0.3, 20.0),
+                rng.randint(50, 3000),
+                int(rng.random() < 0.05),
+                0
+            )
+            for i in range(min(batch, args.records - offset))
+        ]
+        with conn:
+            conn.executemany(
+                "INSERT INTO analytics_messages "
+                "(timestamp, model, message_length, response_time, tokens_used, cache_hit, saved_tokens) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+    print(f"Сгенерировано {args.records} записей за {time.perf_counter() - started:.1f} с")
+
+    replay_ms, replay_mb, replay_usage = measure(lambda: full_replay(cache))
+    rollup_ms, rollup_mb, analytics = measure(lambda: Analytics(cache), repeat=5)
+    stats_ms, _, _ = measure(analytics.get_statistics, repeat=1000)
+
+    assert replay_usage == analytics.model_usage, "Итоги из агрегатов не совпадают с полным пересчетом"
+
+    print(f"{'загрузка':<28} {'время, мс':>10} {'пик памяти, МБ':>15}")
+    print(f"{'полное перечитывание':<28} {replay_ms:>10.1f} {replay_mb:>15.1f}")
+    print(f"{'агрегаты analytics_rollup':<28} {rollup_ms:>10.2f} {rollup_mb:>15.2f}")
+    print(f"get_statistics: {stats_ms * 1000:.1f} мкс")
+
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
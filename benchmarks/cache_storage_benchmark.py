@@ -0,0 +1,125 @@
+# Бенчмарк запросов к chat_cache.db с индексами и без них
+#
+# Заполняет временную базу синтетическими записями messages и
+# analytics_messages (по умолчанию по 1 000 000, распределенных на два года)
+# и замеряет задержку запросов, которые выполняются при запуске и в аналитике:
+#     - get_chat_history: последние 50 сообщений (ORDER BY timestamp DESC)
+#     - iter_analytics_history: первая порция истории аналитики (ORDER BY timestamp)
+#     - get_analytics_series: ряд за последний час по 5 минут (диапазон по времени)
+#     - количество сообщений одной модели (фильтр по model)
+# Сначала индексы миграции 3 удаляются (как в базах до появления индексов),
+# затем создаются заново той же миграцией; печатается время до и после.
+#
+# Запуск из корня репозитория:
+#     python benchmarks/cache_storage_benchmark.py --rows 1000000 --repeat 5
+
+# Импорт необходимых библиотек
+import argparse                           # Разбор аргументов командной строки
+import os                                 # Библиотека для работы с системой
+import random                             # Генерация синтетических данных
+import sys                                # Библиотека для работы с системой
+import tempfile                           # Временная папка для базы бенчмарка
+import time                               # Замер времени
+from datetime import datetime, timedelta  # Временные метки записей
+from pathlib import Path                  # Библиотека для работы с системными путями
+
+# Модули приложения лежат в папке src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+MODELS = ["openai/gpt-4o-mini", "anthropic/claude-3-haiku", "google/gemini-flash-1.5", "meta-llama/llama-3-8b",
+          "mistralai/mistral-7b", "qwen/qwen-2-7b", "deepseek/deepseek-chat", "rare/model"]
+# Индексы миграции 3 (ChatCache._migration_3_indexes) на таблицах истории и аналитики
+INDEXES = ["idx_messages_timestamp", "idx_messages_model", "idx_analytics_timestamp", "idx_analytics_model"]
+SPAN = timedelta(days=730)  # Период синтетической истории
+
+
+def fill(conn, rows: int, rng: random.Random):
+    """
+        Заполнение messages и analytics_messages записями за последние два года.
+    """
+    now = datetime.now()
+    # Модель "rare/model" встречается редко - запрос по ней избирательный
+    weights = [20] * (len(MODELS) - 1) + [1]
+    for offset in range(0, rows, 10_000):
+        count = min(10_000, rows - offset)
+        stamps = [now - SPAN * rng.random() for _ in range(count)]
+        models = rng.choices(MODELS, weights, k=count)
+        with conn:
+            conn.executemany(
+                "INSERT INTO messages (model, user_message, ai_response, timestamp, tokens_used) VALUES (?, ?, ?, ?, ?)",
+                [(model, "вопрос", "ответ", stamp, 100) for model, stamp in zip(models, stamps)]
+            )
+            conn.executemany(
+                "INSERT INTO analytics_messages (timestamp, model, message_length, response_time, tokens_used, "
+                "cache_hit, saved_tokens) VALUES (?, ?, ?, ?, ?, 0, 0)",
+                [(stamp, model, 50, rng.uniform(0.2, 5.0), 100) for model, stamp in zip(models, stamps)]
+            )
+
+
+def measure(cache, repeat: int) -> dict:
+    """
+        Медианное время запросов в миллисекундах.
+    """
+    conn = cache.get_connection()
+    queries = {
+        "get_chat_history(50)": lambda: cache.get_chat_history(50),
+        "iter_analytics_history (1-я порция)": lambda: next(cache.iter_analytics_history()),
+        "get_analytics_series (час, 5 мин)": lambda: cache.get_analytics_series(datetime.now() - timedelta(hours=1), 300),
+        "сообщений модели": lambda: conn.execute(
+            "SELECT COUNT(*) FROM analytics_messages WHERE model = ?", ("rare/model",)).fetchone(),
+    }
+    results = {}
+    for name, query in queries.items():
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            query()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[name] = timings[len(timings) // 2]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк запросов к chat_cache.db с индексами и без")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Записей в каждой таблице")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов каждого запроса")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора данных")
+    args = parser.parse_args()
+
+    # База создается во временной папке, рабочая история не затрагивается
+    os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="storage_bench_")
+    sys.stderr, stderr = open(os.devnull, "w"), sys.stderr
+    from cache import ChatCache
+
+    cache = ChatCache()
+    conn = cache.get_connection()
+
+    started = time.perf_counter()
+    fill(conn, args.rows, random.Random(args.seed))
+    fill_time = time.perf_counter() - started
+
+    # Без индексов (базы, созданные до миграции 3)
+    with conn:
+        for index in INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
+    before = measure(cache, args.repeat)
+
+    # Создание индексов той же миграцией, что при обновлении базы
+    started = time.perf_counter()
+    with conn:
+        cache._migration_3_indexes(conn.cursor())
+    index_time = time.perf_counter() - started
+    after = measure(cache, args.repeat)
+
+    cache.close()
+    sys.stderr = stderr
+    print(f"{args.rows} записей в messages и analytics_messages (заполнение {fill_time:.1f} с, "
+          f"создание индексов {index_time:.1f} с), медиана {args.repeat} повторов")
+    print(f"{'запрос':<38} {'без индексов, мс':>17} {'с индексами, мс':>16}")
+    for name in before:
+        print(f"{name:<38} {before[name]:>17.2f} {after[name]:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# Бенчмарк сборки контекста диалога (ConversationContext)
+#
+# Для каждого размера истории (по умолчанию 10, 1 000 и 100 000 сообщений)
+# заполняет временную базу синтетическими сообщениями и сравнивает сборку
+# контекста для нового запроса двумя способами:
+#     - перечитывание: вся история читается из базы, токены каждой реплики
+#       считаются заново, затем реплики обрезаются под бюджет модели
+#     - окно в памяти: add_turn + build по заранее подсчитанным токенам
+#       (окно заполняется один раз при запуске из первой страницы истории)
+# Печатает время заполнения окна при запуске и p50/p99 сборки на запрос.
+#
+# Запуск из корня репозитория:
+#     python benchmarks/context_benchmark.py --sizes 10 1000 100000 --turns 200
+
+# Импорт необходимых библиотек
+import argparse                # Разбор аргументов командной строки
+import os                      # Библиотека для работы с системой
+import random                  # Генерация синтетических сообщений
+import sys                     # Библиотека для работы с системой
+import tempfile                # Временная папка для базы бенчмарка
+import time                    # Замер времени
+from datetime import datetime, timedelta  # Временные метки сообщений
+from pathlib import Path       # Библиотека для работы с системными путями
+
+# Модули приложения лежат в папке src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+WORDS = ["python", "code", "function", "error", "data", "model", "как", "что", "код", "функция", "ошибка", "данные"]
+CONTEXT_LENGTH = 8192  # Окно контекста модели в токенах
+PAGE_SIZE = 20         # Страница истории при запуске (как ChatApp.HISTORY_PAGE_SIZE)
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    """
+        Генерация синтетического текста сообщения.
+    """
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def percentile(values: list, p: float) -> float:
+    """
+        Перцентиль по отсортированному списку (ближайший ранг).
+    """
+    index = min(len(values) - 1, max(0, int(round(p / 100 * len(values))) - 1))
+    return values[index]
+
+
+def reread_context(cache, context, prompt: str) -> list:
+    """
+        Сборка контекста перечитыванием всей истории из базы (без окна в памяти).
+    """
+    from context import estimate_tokens
+
+    budget = context.budget(CONTEXT_LENGTH) - estimate_tokens(prompt) - context.MESSAGE_OVERHEAD
+    selected, used = [], 0
+    for _, _, user_message, ai_response, _, _ in cache.get_chat_history(limit=-1):
+        tokens = estimate_tokens(user_message) + estimate_tokens(ai_response) + 2 * context.MESSAGE_OVERHEAD
+        if used + tokens > budget:
+            break
+        used += tokens
+        selected.append((user_message, ai_response))
+
+    messages = []
+    for user_message, ai_response in reversed(selected):
+        messages.append({"role": "user", "content": user_message})
+        messages.append({"role": "assistant", "content": ai_response})
+    return messages
+
+
+def run_size(size: int, turns: int, rng: random.Random) -> dict:
+    """
+        Замеры для истории из size сообщений.
+    """
+    from cache import ChatCache
+    from context import ConversationContext
+
+    os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="context_bench_")
+    cache = ChatCache()
+    conn = cache.get_connection()
+
+    # Заполнение истории пакетами
+    start = datetime.now() - timedelta(seconds=size)
+    for offset in range(0, size, 10_000):
+        rows = [
+            ("openai/gpt-4o-mini", make_text(rng, rng.randint(5, 30)), make_text(rng, rng.randint(20, 120)),
+             start + timedelta(seconds=offset + i), 100)
+            for i in range(min(10_000, size - offset))
+        ]
+        with conn:
+            conn.executemany(
+                "INSERT INTO messages (model, user_message, ai_response, timestamp, tokens_used) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    # Заполнение окна при запуске (одна страница истории, как ChatApp.load_chat_history)
+    context = ConversationContext()
+    started = time.perf_counter()
+    context.seed(cache.get_chat_history(limit=PAGE_SIZE))
+    seed_ms = (time.perf_counter() - started) * 1000
+
+    prompts = [make_text(rng, rng.randint(5, 30)) for _ in range(turns)]
+    answers = [make_text(rng, rng.randint(20, 120)) for _ in range(turns)]
+
+    window, reread = [], []
+    for prompt, answer in zip(prompts, answers):
+        started = time.perf_counter()
+        context.build(CONTEXT_LENGTH, prompt)
+        window.append((time.perf_counter() - started) * 1000)
+        context.add_turn(prompt, answer)
+
+    # Перечитывание медленное на больших историях - хватает меньшего числа запросов
+    for prompt in prompts[:max(5, turns // 10)]:
+        started = time.perf_counter()
+        reread_context(cache, context, prompt)
+        reread.append((time.perf_counter() - started) * 1000)
+
+    cache.close()
+    window.sort()
+    reread.sort()
+    return {
+        'seed': seed_ms,
+        'window': (percentile(window, 50), percentile(window, 99)),
+        'reread': (percentile(reread, 50), percentile(reread, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк сборки контекста диалога")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100_000], help="Размеры истории")
+    parser.add_argument("--turns", type=int, default=200, help="Количество запросов на размер")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора сообщений")
+    args = parser.parse_args()
+
+    # Консольный вывод логов отбрасывается
+    sys.stderr, stderr = open(os.devnull, "w"), sys.stderr
+    rng = random.Random(args.seed)
+    results = [(size, run_size(size, args.turns, rng)) for size in args.sizes]
+    sys.stderr = stderr
+
+    print(f"Окно модели {CONTEXT_LENGTH} токенов, {args.turns} запросов на размер")
+    print(f"{'сообщений':>10} {'запуск, мс':>11} {'окно p50, мс':>13} {'окно p99, мс':>13} "
+          f"{'перечит. p50, мс':>17} {'перечит. p99, мс':>17}")
+    for size, stats in results:
+        print(f"{size:>10} {stats['seed']:>11.2f} {stats['window'][0]:>13.3f} {stats['window'][1]:>13.3f} "
+              f"{stats['reread'][0]:>17.2f} {stats['reread'][1]:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# Бенчмарк отправки уведомлений по почте (EmailNotificationSender)
+#
+# Поднимает локальный SMTP-сервер-заглушку (без TLS - вход без шифрования
+# разрешен только для нее, с задержкой ответа, имитирующей сеть) и отправляет N уведомлений подряд тремя способами:
+#     - прежний: синхронная отправка в цикле событий, новое соединение на письмо
+#     - в отдельном потоке, новое соединение на письмо
+#     - в отдельном потоке через одно переиспользуемое соединение
+# Для каждого печатается время на письмо и максимальная задержка цикла событий.
+# Заглушка может разрывать соединение каждые K писем (проверка переподключения).
+#
+# Запуск из корня репозитория:
+#     python benchmarks/email_benchmark.py --messages 100 --rtt-ms 20 --drop-every 25
+
+# Импорт необходимых библиотек
+import argparse           # Разбор аргументов командной строки
+import asyncio            # SMTP-заглушка и асинхронная отправка
+import os                 # Библиотека для работы с системой
+import sys                # Библиотека для работы с системой
+import tempfile           # Временная папка для логов
+import threading          # Поток SMTP-заглушки
+import time               # Замер времени
+from pathlib import Path  # Библиотека для работы с системными путями
+
+# Модули приложения лежат в папке src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+class StubSMTPServer:
+    """
+        Минимальный SMTP-сервер: принимает EHLO, AUTH PLAIN, MAIL, RCPT,
+        DATA, NOOP, RSET и QUIT, письма не сохраняет.
+    """
+
+    def __init__(self, rtt: float, drop_every: int):
+        self.rtt = rtt                # Задержка перед каждым ответом
+        self.drop_every = drop_every  # Разрывать соединение каждые N писем (0 - нет)
+        self.connections = 0          # Открыто соединений
+        self.received = 0             # Принято писем
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            server = self.loop.run_until_complete(asyncio.start_server(self.handle, "127.0.0.1", 0))
+            self.port = server.sockets[0].getsockname()[1]
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+
+        async def reply(text):
+            await asyncio.sleep(self.rtt)
+            writer.write(text.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 stub ESMTP")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                await reply("250-stub\r\n250-AUTH PLAIN\r\n250 8BITMIME")
+            elif command.startswith("AUTH"):
+                await reply("235 Authentication successful")
+            elif command.startswith("DATA"):
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                while (await reader.readline()) not in (b".\r\n", b""):
+                    pass
+                self.received += 1
+                await reply("250 OK")
+                if self.drop_every and self.received % self.drop_every == 0:
+                    break  # Разрыв соединения со стороны сервера
+            elif command.startswith("QUIT"):
+                await reply("221 Bye")
+                break
+            else:
+                await reply("250 OK")  # MAIL, RCPT, NOOP, RSET
+        writer.close()
+
+
+async def run_case(sender, messages: int, inline: bool) -> dict:
+    """
+        Отправка messages писем подряд и замер задержки цикла событий.
+    """
+    lags = []
+    stop = False
+
+    async def ticker():
+        # Задержка пробуждения каждые 5 мс: блокировка цикла событий
+        while not stop:
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - started - 0.005)
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+
+    timings, errors = [], 0
+    for i in range(messages):
+        started = time.perf_counter()
+        if inline:
+            error = sender._send("to@example.com", f"Уведомление #{i}", "login", "password", "example.com")
+        else:
+            error = await sender.send_notification("to@example.com", f"Уведомление #{i}", "login", "password", "example.com")
+        timings.append(time.perf_counter() - started)
+        errors += error is not None
+        await asyncio.sleep(0)  # Даем циклу событий обработать таймеры
+
+    stop = True
+    await tick_task
+    await sender.close()
+    timings.sort()
+    return {
+        'mean': sum(timings) / len(timings) * 1000,
+        'p50': timings[len(timings) // 2] * 1000,
+        'p99': timings[int(len(timings) * 0.99)] * 1000,
+        'lag': max(lags) * 1000 if lags else 0.0,
+        'errors': errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк отправки email-уведомлений")
+    parser.add_argument("--messages", type=int, default=100, help="Количество писем")
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="Задержка ответа сервера (мс)")
+    parser.add_argument("--drop-every", type=int, default=25, help="Сервер разрывает соединение каждые N писем (0 - нет)")
+    args = parser.parse_args()
+
+    # Логи пишутся во временную папку, консольный вывод отбрасывается
+    os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="email_bench_")
+    sys.stderr, stderr = open(os.devnull, "w"), sys.stderr
+
+    from email_notify import EmailNotificationSender
+
+    results = []
+    for name, inline, pooled in (
+        ("прежний (в цикле событий)", True, False),
+        ("поток, новое соединение", False, False),
+        ("поток, общее соединение", False, True),
+    ):
+        server = StubSMTPServer(args.rtt_ms / 1000, args.drop_every)
+        server.start()
+        sender = EmailNotificationSender(host="127.0.0.1", port=server.port, use_ssl=False, require_tls=False)
+        if not pooled:
+            sender.IDLE_TIMEOUT = 0  # Новое соединение и авторизация на каждое письмо
+        stats = await run_case(sender, args.messages, inline)
+        results.append((name, stats, server.connections, server.received))
+
+    sys.stderr = stderr
+    print(f"{args.messages} писем, задержка ответа сервера {args.rtt_ms:.0f} мс, разрыв каждые {args.drop_every}")
+    print(f"{'способ':<28} {'ср., мс':>8} {'p50, мс':>8} {'p99, мс':>8} {'макс. задержка цикла, мс':>25} {'соединений':>11} {'ошибок':>7}")
+    for name, stats, connections, received in results:
+        print(f"{name:<28} {stats['mean']:>8.1f} {stats['p50']:>8.1f} {stats['p99']:>8.1f} "
+              f"{stats['lag']:>25.1f} {connections:>11} {stats['errors']:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
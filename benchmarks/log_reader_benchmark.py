@@ -0,0 +1,89 @@
+# Бенчмарк чтения последних строк лога (log_reader.read_tail)
+#
+# Создает синтетический файл лога заданного размера и сравнивает прежнее
+# чтение (readlines() всего файла и срез последних строк) с чтением
+# блоками от конца файла, включая подгрузку предыдущих страниц.
+#
+# Запуск из корня репозитория:
+#     python benchmarks/log_reader_benchmark.py --size-mb 1024
+
+# Импорт необходимых библиотек
+import argparse           # Разбор аргументов командной строки
+import os                 # Библиотека для работы с системой
+import resource           # Пиковое потребление памяти процессом
+import sys                # Библиотека для работы с системой
+import tempfile           # Временная папка для файла лога
+import time               # Замер времени
+from pathlib import Path  # Библиотека для работы с системными путями
+
+# Модули приложения лежат в папке src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from log_reader import read_tail  # noqa: E402
+
+
+def generate(path: Path, size_mb: int):
+    """
+        Заполнение файла строками в формате AppLogger.
+    """
+    chunk = "".join(
+        f"2026-01-01 12:00:00 - INFO - Performance metrics - CPU: 3.{i % 10}%, Memory: 2.5%, Threads: 9, Uptime: {i}s\n"
+        for i in range(10_000)
+    ).encode("utf-8")
+    target = size_mb * 1024 * 1024
+    with open(path, "wb") as f:
+        written = 0
+        while written < target:
+            f.write(chunk)
+            written += len(chunk)
+
+
+def peak_mb() -> float:
+    """
+        Пиковое потребление памяти процессом (МБ).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк чтения хвоста лога")
+    parser.add_argument("--size-mb", type=int, default=1024, help="Размер файла лога в МБ")
+    parser.add_argument("--lines", type=int, default=200, help="Строк на страницу")
+    parser.add_argument("--pages", type=int, default=50, help="Сколько страниц листать назад")
+    parser.add_argument("--skip-readlines", action="store_true", help="Не замерять прежний способ (нужно ~размер файла x3 памяти)")
+    args = parser.parse_args()
+
+    path = Path(tempfile.mkdtemp(prefix="log_reader_bench_")) / "chat_app_2026-01-01.log"
+    started = time.perf_counter()
+    generate(path, args.size_mb)
+    print(f"Файл {path.stat().st_size / 1024 / 1024:.0f} МБ создан за {time.perf_counter() - started:.1f} с")
+
+    # Чтение хвоста с конца файла
+    started = time.perf_counter()
+    lines, start = read_tail(path, args.lines)
+    tail_ms = (time.perf_counter() - started) * 1000
+
+    # Листание назад по страницам
+    started = time.perf_counter()
+    for _ in range(args.pages):
+        _, start = read_tail(path, args.lines, start)
+    page_ms = (time.perf_counter() - started) * 1000 / args.pages
+    tail_peak = peak_mb()
+
+    print(f"{'способ':<26} {'время, мс':>10} {'пик памяти процесса, МБ':>24}")
+    print(f"{'read_tail':<26} {tail_ms:>10.2f} {tail_peak:>24.0f}")
+    print(f"{'read_tail, след. страница':<26} {page_ms:>10.2f}")
+
+    if not args.skip_readlines:
+        started = time.perf_counter()
+        with open(path, "r", encoding="utf-8") as f:
+            expected = [line.rstrip("\n") for line in f.readlines()[-args.lines:]]
+        readlines_ms = (time.perf_counter() - started) * 1000
+        print(f"{'readlines()[-N:]':<26} {readlines_ms:>10.0f} {peak_mb():>24.0f}")
+        assert expected == lines, "Результаты чтения не совпадают"
+
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
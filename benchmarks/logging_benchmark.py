@@ -0,0 +1,89 @@
+# Бенчмарк затрат на вызов логирования (AppLogger)
+#
+# Сравнивает время одного вызова logger.info в вызывающем потоке для прежней
+# схемы (FileHandler и StreamHandler прямо в логгере, сброс файла на каждой
+# записи) и для AppLogger с очередью и фоновой пакетной записью.
+#
+# Запуск из корня репозитория:
+#     python benchmarks/logging_benchmark.py --calls 100000
+
+# Импорт необходимых библиотек
+import argparse           # Разбор аргументов командной строки
+import logging            # Прежняя схема логирования
+import os                 # Библиотека для работы с системой
+import sys                # Библиотека для работы с системой
+import tempfile           # Временная папка для файлов логов
+import time               # Замер времени
+from pathlib import Path  # Библиотека для работы с системными путями
+
+# Модули приложения лежат в папке src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+def direct_logger(log_file: str, stream) -> logging.Logger:
+    """
+        Прежняя схема: обработчики файла и консоли в самом логгере.
+    """
+    logger = logging.getLogger("bench_direct")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    for handler in (logging.FileHandler(log_file, encoding='utf-8'), logging.StreamHandler(stream)):
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    return logger
+
+
+def per_call_us(log, calls: int) -> list:
+    """
+        Время каждого вызова в микросекундах.
+    """
+    timings = []
+    for i in range(calls):
+        started = time.perf_counter()
+        log(f"Streaming message to model: openai/gpt-4o-mini #{i}")
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return timings
+
+
+def report(name: str, timings: list):
+    """
+        Печать среднего и перцентилей.
+    """
+    mean = sum(timings) / len(timings)
+    p50 = timings[len(timings) // 2]
+    p99 = timings[int(len(timings) * 0.99)]
+    print(f"{name:<24} {mean:>9.2f} {p50:>9.2f} {p99:>9.2f} {timings[-1]:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк AppLogger")
+    parser.add_argument("--calls", type=int, default=100_000, help="Количество вызовов лога")
+    args = parser.parse_args()
+
+    # Логи пишутся во временную папку, консольный вывод отбрасывается
+    storage = tempfile.mkdtemp(prefix="logging_bench_")
+    os.environ["FLET_APP_STORAGE_DATA"] = storage
+    devnull = open(os.devnull, "w")
+    sys.stderr, stderr = devnull, sys.stderr
+
+    direct = direct_logger(os.path.join(storage, "direct.log"), devnull)
+    direct_timings = per_call_us(direct.info, args.calls)
+
+    from logger import AppLogger
+    app_logger = AppLogger()
+    queued_timings = per_call_us(app_logger.info, args.calls)
+    started = time.perf_counter()
+    app_logger.flush()
+    drain_ms = (time.perf_counter() - started) * 1000
+
+    sys.stderr = stderr
+    print(f"{'схема':<24} {'ср., мкс':>9} {'p50, мкс':>9} {'p99, мкс':>9} {'max, мкс':>10}")
+    report("FileHandler напрямую", direct_timings)
+    report("AppLogger (очередь)", queued_timings)
+    print(f"Дозапись очереди после замера: {drain_ms:.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
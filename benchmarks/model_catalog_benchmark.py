@@ -0,0 +1,140 @@
+# Бенчмарк старта приложения с дисковым кэшем каталога моделей (ModelCatalogCache)
+#
+# Поднимает локальный сервер-заглушку /models (с задержкой ответа, имитирующей
+# сеть, и поддержкой ETag/304) и замеряет время до первого кадра - от создания
+# клиента OpenRouter до готового выпадающего списка моделей, как в ChatApp.build:
+#     - прежний: каталог загружается синхронно при входе и еще раз в ChatApp
+#     - холодный кэш: файла кэша нет, список заполняется фоновым запросом
+#     - теплый кэш: свежий файл кэша, сеть не используется
+#     - устаревший кэш: список из файла, фоновая проверка получает 304
+# Для каждого случая печатается время до первого кадра и до готового списка моделей.
+#
+# Запуск из корня репозитория:
+#     python benchmarks/model_catalog_benchmark.py --models 400 --latency-ms 300
+
+# Импорт необходимых библиотек
+import argparse           # Разбор аргументов командной строки
+import asyncio            # Фоновое обновление каталога
+import json               # Ответ заглушки /models
+import os                 # Библиотека для работы с системой
+import sys                # Библиотека для работы с системой
+import tempfile           # Временная папка для кэша и логов
+import threading          # Поток сервера-заглушки
+import time               # Замер времени
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Сервер-заглушка
+from pathlib import Path  # Библиотека для работы с системными путями
+
+# Модули приложения лежат в папке src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+ETAG = '"catalog-v1"'
+
+
+def start_stub(models: int, latency: float):
+    """
+        Сервер-заглушка GET /models: models записей, ответ через latency секунд,
+        304 на If-None-Match с текущим ETag.
+    """
+    body = json.dumps({"data": [
+        {"id": f"vendor/model-{i}", "name": f"Model {i}", "context_length": 8192 + i,
+         "description": "x" * 500, "pricing": {"prompt": "0.000001", "completion": "0.000002"}}
+        for i in range(models)
+    ]}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if self.headers.get("If-None-Match") == ETAG:
+                self.send_response(304)
+                self.send_header("ETag", ETAG)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def startup(base_url: str, case: str, cache_file: Path) -> tuple:
+    """
+        Один старт: время до первого кадра и до готового списка моделей (мс).
+    """
+    from openrouter import OpenRouterClient
+    from components import ModelSelector
+
+    started = time.perf_counter()
+    if case == "old":
+        # Окно входа и ChatApp загружали каталог синхронно, каждый свой (без кэша)
+        OpenRouterClient(api_key="key", base_url=base_url)
+        cache_file.unlink(missing_ok=True)
+        client = OpenRouterClient(api_key="key", base_url=base_url)
+        models = client.available_models
+    else:
+        client = OpenRouterClient(api_key="key", base_url=base_url, preload_models=False)
+        models = client.catalog.models or []
+    selector = ModelSelector(models)
+    first_frame = time.perf_counter() - started
+
+    # Фоновое обновление, как ChatApp.refresh_models
+    if case != "old" and client.models_need_refresh:
+        selector.set_models(await client.refresh_models())
+    ready = time.perf_counter() - started
+    await client.close()
+    return first_frame * 1000, ready * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк старта с кэшем каталога моделей")
+    parser.add_argument("--models", type=int, default=400, help="Количество моделей в каталоге")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Задержка ответа /models (мс)")
+    parser.add_argument("--runs", type=int, default=5, help="Количество стартов на случай")
+    args = parser.parse_args()
+
+    # Кэш и логи пишутся во временную папку, консольный вывод отбрасывается
+    storage = Path(tempfile.mkdtemp(prefix="catalog_bench_"))
+    os.environ["FLET_APP_STORAGE_DATA"] = str(storage)
+    sys.stderr, stderr = open(os.devnull, "w"), sys.stderr
+    cache_file = storage / "models_cache.json"
+
+    server, base_url = start_stub(args.models, args.latency_ms / 1000)
+
+    results = []
+    for name, case in (
+        ("прежний (2 синхронных запроса)", "old"),
+        ("холодный кэш", "cold"),
+        ("теплый кэш", "warm"),
+        ("устаревший кэш (304)", "stale"),
+    ):
+        timings = []
+        for _ in range(args.runs):
+            if case in ("old", "cold"):
+                cache_file.unlink(missing_ok=True)
+            elif case == "stale":
+                # Срок жизни истек: список берется из файла, проверка идет в фоне
+                data = json.loads(cache_file.read_text(encoding="utf-8"))
+                data["fetched_at"] = 0.0
+                cache_file.write_text(json.dumps(data), encoding="utf-8")
+            timings.append(await startup(base_url, case, cache_file))
+        first = sorted(t[0] for t in timings)[len(timings) // 2]
+        ready = sorted(t[1] for t in timings)[len(timings) // 2]
+        results.append((name, first, ready))
+
+    server.shutdown()
+    sys.stderr = stderr
+    print(f"{args.models} моделей, задержка ответа /models {args.latency_ms:.0f} мс, медиана {args.runs} стартов")
+    print(f"{'случай':<32} {'первый кадр, мс':>16} {'список моделей, мс':>19}")
+    for name, first, ready in results:
+        print(f"{name:<32} {first:>16.1f} {ready:>19.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
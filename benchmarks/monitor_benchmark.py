@@ -0,0 +1,79 @@
+# Бенчмарк фоновых замеров производительности (PerformanceMonitor)
+#
+# Измеряет затраты на один замер метрик процесса, долю времени на замеры
+# при заданном интервале и сравнивает кольцевой буфер MetricsRing
+# с прежним списком истории (list.pop(0) и полный проход для средних).
+#
+# Запуск из корня репозитория:
+#     python benchmarks/monitor_benchmark.py --interval 0.05 --duration 5
+
+# Импорт необходимых библиотек
+import argparse           # Разбор аргументов командной строки
+import sys                # Библиотека для работы с системой
+import time               # Замер времени
+from pathlib import Path  # Библиотека для работы с системными путями
+
+# Модули приложения лежат в папке src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from monitor import PerformanceMonitor, MetricsRing, PSUTIL_AVAILABLE  # noqa: E402
+
+
+def list_history(samples: int, size: int) -> float:
+    """
+        Прежняя история: добавление в список, pop(0) и средние полным проходом (мкс на замер).
+    """
+    history = []
+    started = time.perf_counter()
+    for i in range(samples):
+        history.append({'cpu_percent': float(i % 100), 'memory_percent': 1.0, 'thread_count': 10})
+        if len(history) > size:
+            history.pop(0)
+        sum(m['cpu_percent'] for m in history) / len(history)
+        max(m['cpu_percent'] for m in history)
+    return (time.perf_counter() - started) / samples * 1e6
+
+
+def ring_history(samples: int, size: int) -> float:
+    """
+        Кольцевой буфер: запись и средние/максимум из текущих сумм (мкс на замер).
+    """
+    ring = MetricsRing(size)
+    started = time.perf_counter()
+    for i in range(samples):
+        ring.append(float(i), cpu_percent=float(i % 100), memory_percent=1.0, thread_count=10)
+        ring.average('cpu_percent')
+        ring.maximum('cpu_percent')
+    return (time.perf_counter() - started) / samples * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк PerformanceMonitor")
+    parser.add_argument("--interval", type=float, default=0.05, help="Интервал замеров в секундах")
+    parser.add_argument("--duration", type=float, default=5.0, help="Длительность фоновых замеров в секундах")
+    parser.add_argument("--history", type=int, default=1000, help="Размер истории")
+    parser.add_argument("--samples", type=int, default=20_000, help="Количество записей для сравнения историй")
+    args = parser.parse_args()
+
+    if PSUTIL_AVAILABLE:
+        monitor = PerformanceMonitor(sample_interval=args.interval, history_size=args.history)
+        monitor.start_sampler()
+        time.sleep(args.duration)
+        monitor.stop_sampler()
+        stats = monitor.get_sampling_stats()
+        print(
+            f"Замеры: {stats['samples']}, среднее {stats['avg_cost_ms']:.3f} мс, "
+            f"максимум {stats['max_cost_ms']:.3f} мс, доля времени {stats['overhead_percent']:.3f}% "
+            f"при интервале {args.interval} с"
+        )
+        print(f"При интервале 5 с доля времени: {stats['avg_cost_ms'] / 5000 * 100:.4f}%")
+    else:
+        print("psutil не установлен: замеры процесса пропущены")
+
+    print(f"{'история':<20} {'мкс на замер':>13}")
+    print(f"{'список, pop(0)':<20} {list_history(args.samples, args.history):>13.2f}")
+    print(f"{'MetricsRing':<20} {ring_history(args.samples, args.history):>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
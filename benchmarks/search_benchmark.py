@@ -0,0 +1,108 @@
+# Бенчмарк полнотекстового поиска по истории чата (ChatCache.search)
+#
+# Генерирует синтетическую историю заданного размера во временной базе
+# и измеряет задержку поисковых запросов (p50/p90/p99).
+#
+# Запуск из корня репозитория:
+#     python benchmarks/search_benchmark.py --messages 1000000 --queries 200
+
+# Импорт необходимых библиотек
+import argparse                # Разбор аргументов командной строки
+import os                      # Библиотека для работы с системой
+import random                  # Генерация синтетического корпуса
+import sys                     # Библиотека для работы с системой
+import tempfile                # Временная папка для базы бенчмарка
+import time                    # Замер времени
+from datetime import datetime  # Временные метки сообщений
+from pathlib import Path       # Библиотека для работы с системными путями
+
+# Модули приложения лежат в папке src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# Словарь синтетического корпуса: частые и редкие слова (латиница и кириллица)
+COMMON_WORDS = [
+    "the", "and", "python", "code", "function", "error", "data", "model", "request", "value",
+    "как", "что", "это", "код", "функция", "ошибка", "данные", "модель", "запрос", "значение",
+]
+RARE_WORDS = [f"term{i}" for i in range(5000)] + [f"слово{i}" for i in range(5000)]
+MODELS = ["openai/gpt-4o-mini", "anthropic/claude-3-haiku", "google/gemini-flash-1.5", "meta-llama/llama-3-8b"]
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    """
+        Генерация синтетического текста сообщения.
+    """
+    return " ".join(
+        rng.choice(RARE_WORDS) if rng.random() < 0.1 else rng.choice(COMMON_WORDS)
+        for _ in range(words)
+    )
+
+
+def percentile(values: list, p: float) -> float:
+    """
+        Перцентиль по отсортированному списку (ближайший ранг).
+    """
+    index = min(len(values) - 1, max(0, int(round(p / 100 * len(values))) - 1))
+    return values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк ChatCache.search")
+    parser.add_argument("--messages", type=int, default=1_000_000, help="Размер синтетической истории")
+    parser.add_argument("--queries", type=int, default=200, help="Количество запросов каждого вида")
+    parser.add_argument("--limit", type=int, default=20, help="Количество результатов на запрос")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора корпуса")
+    args = parser.parse_args()
+
+    # База создается во временной папке, рабочая история не затрагивается
+    os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="search_bench_")
+    from cache import ChatCache
+
+    cache = ChatCache()
+    conn = cache.get_connection()
+    rng = random.Random(args.seed)
+
+    # Заполнение истории (FTS-индекс обновляется триггером на каждую вставку)
+    started = time.perf_counter()
+    batch = 10_000
+    now = datetime.now()
+    for offset in range(0, args.messages, batch):
+        rows = [
+            (rng.choice(MODELS), make_text(rng, rng.randint(5, 30)), make_text(rng, rng.randint(20, 120)), now, 100)
+            for _ in range(min(batch, args.messages - offset))
+        ]
+        with conn:
+            conn.executemany(
+                "INSERT INTO messages (model, user_message, ai_response, timestamp, tokens_used) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+    print(f"Сгенерировано {args.messages} сообщений за {time.perf_counter() - started:.1f} с")
+
+    # Виды запросов: редкое слово, префикс, два слова, частое слово, фильтр по модели
+    scenarios = {
+        "rare term": lambda: (rng.choice(RARE_WORDS), None),
+        "prefix": lambda: (rng.choice(RARE_WORDS)[:-1] + "*", None),
+        "two terms": lambda: (f"{rng.choice(COMMON_WORDS)} {rng.choice(RARE_WORDS)}", None),
+        "common term": lambda: (rng.choice(COMMON_WORDS), None),
+        "rare + model": lambda: (rng.choice(RARE_WORDS), rng.choice(MODELS)),
+    }
+
+    print(f"{'запрос':<14} {'p50, мс':>9} {'p90, мс':>9} {'p99, мс':>9} {'max, мс':>9}")
+    for name, make_query in scenarios.items():
+        timings = []
+        for _ in range(args.queries):
+            query, model = make_query()
+            started = time.perf_counter()
+            cache.search(query, limit=args.limit, model=model)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(
+            f"{name:<14} {percentile(timings, 50):>9.2f} {percentile(timings, 90):>9.2f} "
+            f"{percentile(timings, 99):>9.2f} {timings[-1]:>9.2f}"
+        )
+
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Бенчмарк хранилища записей сессии аналитики (SessionStore)
+#
+# Сравнивает память и время расчета статистики для колоночного хранилища
+# и прежнего списка словарей при заданном количестве записей.
+#
+# Запуск из корня репозитория:
+#     python benchmarks/session_store_benchmark.py --records 1000000
+
+# Импорт необходимых библиотек
+import argparse                           # Разбор аргументов командной строки
+import random                             # Генерация синтетических данных
+import sys                                # Библиотека для работы с системой
+import time                               # Замер времени
+import tracemalloc                        # Замер памяти
+from datetime import datetime, timedelta  # Временные метки записей
+from pathlib import Path                  # Библиотека для работы с системными путями
+
+# Модули приложения лежат в папке src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from session_store import SessionStore, NUMPY_AVAILABLE  # noqa: E402
+
+MODELS = ["openai/gpt-4o-mini", "anthropic/claude-3-haiku", "google/gemini-flash-1.5", "meta-llama/llama-3-8b"]
+
+
+def generate(records: int, seed: int):
+    """
+        Генерация синтетических записей в порядке времени.
+    """
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=30)
+    step = 30 * 86400 / records
+    for i in range(records):
+        yield (
+            start + timedelta(seconds=i * step),
+            # Новая строка на каждую запись, как при чтении из базы
+            "".join(rng.choice(MODELS)),
+            rng.randint(5, 500),
+            rng.uniform(0.3, 20.0),
+            rng.randint(50, 3000),
+        )
+
+
+def build_dicts(rows) -> list:
+    """
+        Прежнее хранение: словарь на каждую запись.
+    """
+    return [
+        {'timestamp': ts, 'model': model, 'message_length': length, 'response_time': rt, 'tokens_used': tokens}
+        for ts, model, length, rt, tokens in rows
+    ]
+
+
+def build_store(rows) -> SessionStore:
+    """
+        Колоночное хранилище.
+    """
+    store = SessionStore()
+    for row in rows:
+        store.append(*row)
+    return store
+
+
+def dict_statistics(data: list) -> dict:
+    """
+        Статистика по списку словарей (полный проход).
+    """
+    usage = {}
+    total_rt = 0.0
+    for record in data:
+        item = usage.setdefault(record['model'], {'count': 0, 'tokens': 0, 'rt': 0.0})
+        item['count'] += 1
+        item['tokens'] += record['tokens_used']
+        item['rt'] += record['response_time']
+        total_rt += record['response_time']
+    return {'usage': usage, 'avg_response_time': total_rt / len(data)}
+
+
+def store_statistics(store: SessionStore) -> dict:
+    """
+        Статистика по колоночному хранилищу (из итогов).
+    """
+    return {'usage': store.breakdown(), 'totals': store.totals()}
+
+
+def best_ms(fn, repeat: int) -> float:
+    """
+        Лучшее время выполнения функции (мс).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def traced(fn):
+    """
+        Результат функции и объем памяти, оставшийся занятым после нее (МБ).
+    """
+    tracemalloc.start()
+    result = fn()
+    current = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк SessionStore")
+    parser.add_argument("--records", type=int, default=1_000_000, help="Количество записей")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора данных")
+    args = parser.parse_args()
+
+    # Записи генерируются внутри замера: в памяти остается только то,
+    # что хранит сама структура (для словарей - и объекты полей)
+    data, dict_mb = traced(lambda: build_dicts(generate(args.records, args.seed)))
+    store, store_mb = traced(lambda: build_store(generate(args.records, args.seed)))
+
+    dict_stats_ms = best_ms(lambda: dict_statistics(data), 3)
+    store_stats_ms = best_ms(lambda: store_statistics(store), 1000)
+    since = data[len(data) * 9 // 10]['timestamp'].timestamp()
+    window_ms = best_ms(lambda: store.breakdown(since=since), 10)
+
+    print(f"numpy: {'да' if NUMPY_AVAILABLE else 'нет'}")
+    print(f"{'хранение':<20} {'память, МБ':>11} {'статистика, мс':>15}")
+    print(f"{'список словарей':<20} {dict_mb:>11.1f} {dict_stats_ms:>15.2f}")
+    print(f"{'SessionStore':<20} {store_mb:>11.1f} {store_stats_ms:>15.4f}")
+    print(f"Разбивка по моделям за последние 10% записей: {window_ms:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# Бенчмарк отправки уведомлений в Telegram (TelegramNotificationSender)
+#
+# Поднимает локальный сервер-заглушку Bot API (aiohttp), который, как
+# Telegram, отвечает 429 (retry_after) при превышении лимитов: одно
+# сообщение в секунду в чат и GLOBAL_RATE сообщений в секунду на бота.
+# Отправляет N сообщений одной пачкой в несколько чатов двумя способами:
+#     - прежний: новый Bot и HTTP-сессия на каждое сообщение, без ограничения частоты
+#     - TelegramNotificationSender: бот на токен, очередь под лимиты, повтор после 429
+# Печатает время, пропускную способность, число ошибок, ответов 429 и соединений.
+#
+# Запуск из корня репозитория:
+#     python benchmarks/telegram_benchmark.py --messages 1000 --chats 100
+
+# Импорт необходимых библиотек
+import argparse           # Разбор аргументов командной строки
+import asyncio            # Заглушка и параллельная отправка
+import os                 # Библиотека для работы с системой
+import sys                # Библиотека для работы с системой
+import tempfile           # Временная папка для логов
+import time               # Замер времени
+from pathlib import Path  # Библиотека для работы с системными путями
+from aiohttp import web   # Сервер-заглушка Bot API
+
+# Модули приложения лежат в папке src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+TOKEN = "123456:benchmark-token"
+
+
+class FakeBotAPI:
+    """
+        Заглушка метода sendMessage с лимитами, как у Telegram.
+    """
+
+    def __init__(self, global_rate: float, chat_interval: float):
+        self.global_rate = global_rate
+        self.chat_interval = chat_interval
+        self.chat_last = {}   # chat_id -> время последнего принятого сообщения
+        self.recent = []      # Времена принятых сообщений за последнюю секунду
+        self.accepted = 0     # Принято сообщений
+        self.rejected = 0     # Ответов 429
+        self.connections = set()  # Адреса клиентов (число TCP-соединений)
+        self.message_id = 0
+
+    async def send_message(self, request):
+        self.connections.add(request.transport.get_extra_info("peername"))
+        data = await request.post() if request.content_type != "application/json" else await request.json()
+        chat_id = int(data["chat_id"])
+        now = time.monotonic()
+        self.recent = [t for t in self.recent if now - t < 1.0]
+
+        # Допуск 10% на неточность таймеров клиента
+        too_fast = now - self.chat_last.get(chat_id, -1e9) < self.chat_interval * 0.9
+        if too_fast or len(self.recent) >= self.global_rate * 1.1:
+            self.rejected += 1
+            return web.json_response({
+                "ok": False, "error_code": 429,
+                "description": "Too Many Requests: retry after 1",
+                "parameters": {"retry_after": 1},
+            })
+
+        self.chat_last[chat_id] = now
+        self.recent.append(now)
+        self.accepted += 1
+        self.message_id += 1
+        return web.json_response({"ok": True, "result": {
+            "message_id": self.message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": data.get("text", ""),
+        }})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/bot{token}/sendMessage", self.send_message)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+async def send_old(api_base: str, chat_id: int, text: str):
+    """
+        Прежняя отправка: новый бот и сессия на каждое сообщение.
+    """
+    from aiogram import Bot
+    from aiogram.client.session.aiohttp import AiohttpSession
+    from aiogram.client.telegram import TelegramAPIServer
+
+    bot = Bot(token=TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(api_base)))
+    try:
+        await bot.send_message(chat_id=chat_id, text=text)
+        return None
+    except Exception as e:
+        return str(e)
+    finally:
+        await bot.session.close()
+
+
+async def run_case(name: str, args, send) -> tuple:
+    """
+        Отправка всех сообщений одной пачкой через send(api_base, chat_id, text).
+    """
+    server = FakeBotAPI(args.global_rate, 1.0)
+    api_base = await server.start()
+    started = time.perf_counter()
+    errors = await asyncio.gather(*(
+        send(api_base, 1000 + i % args.chats, f"Уведомление #{i}") for i in range(args.messages)
+    ))
+    elapsed = time.perf_counter() - started
+    await server.stop()
+    failed = sum(error is not None for error in errors)
+    return name, elapsed, args.messages - failed, failed, server.rejected, len(server.connections)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк отправки Telegram-уведомлений")
+    parser.add_argument("--messages", type=int, default=1000, help="Количество сообщений")
+    parser.add_argument("--chats", type=int, default=100, help="Количество чатов-получателей")
+    parser.add_argument("--global-rate", type=float, default=30.0, help="Лимит сообщений в секунду на бота")
+    parser.add_argument("--skip-old", action="store_true", help="Не замерять прежний способ")
+    args = parser.parse_args()
+
+    # Логи пишутся во временную папку, консольный вывод отбрасывается
+    os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="telegram_bench_")
+    sys.stderr, stderr = open(os.devnull, "w"), sys.stderr
+
+    from telegram import TelegramNotificationSender
+
+    results = []
+    if not args.skip_old:
+        results.append(await run_case("прежний (бот на сообщение)", args, send_old))
+
+    sender = None
+
+    async def send_new(api_base, chat_id, text):
+        nonlocal sender
+        if sender is None:
+            sender = TelegramNotificationSender(api_base=api_base)
+            sender.GLOBAL_RATE = args.global_rate
+        return await sender.send_notification(chat_id, text, TOKEN)
+
+    results.append(await run_case("кэш ботов + лимиты", args, send_new))
+    await sender.close()
+
+    sys.stderr = stderr
+    print(f"{args.messages} сообщений в {args.chats} чатов, лимиты заглушки: 1/с на чат, {args.global_rate:.0f}/с на бота")
+    print(f"{'способ':<28} {'время, с':>9} {'сообщ./с':>9} {'доставлено':>11} {'ошибок':>7} {'ответов 429':>12} {'соединений':>11}")
+    for name, elapsed, delivered, failed, rejected, connections in results:
+        print(f"{name:<28} {elapsed:>9.1f} {delivered / elapsed:>9.1f} {delivered:>11} {failed:>7} {rejected:>12} {connections:>11}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,13 @@
 # Импорт необходимых библиотек
 import time                  # Библиотека для работы с временными метками и измерения интервалов
-from datetime import datetime  # Библиотека для работы с датой и временем в удобном формате
+import threading             # Синхронизация фоновой загрузки с отслеживанием сообщений
+from datetime import datetime, timedelta  # Библиотека для работы с датой и временем в удобном формате
+from session_store import SessionStore  # Колоночное хранилище записей сессии
+from histogram import LatencyHistogram  # Гистограммы для оценки перцентилей задержек
+
+# Начало отсчета "наивных" секунд: время в базе хранится локальным, без часового пояса
+NAIVE_EPOCH = datetime(1970, 1, 1)
+
 
 class Analytics:
     """
@@ -8,18 +15,26 @@ class Analytics:
 
         Отслеживает различные метрики использования чата:
             - Статистику по моделям
-            - Время ответа
+            - Время ответа, скорость генерации и время до первого токена
+              (перцентили по моделям)
             - Использование токенов
             - Длину сообщений
             - Общую длительность сессии
+            - Временные ряды за произвольный период
     """
 
-    def __init__(self, cache):
+    # Максимальное число точек во временном ряду (см. query_series)
+    MAX_SERIES_POINTS = 1000
+
+    def __init__(self, cache, preload: bool = True):
         """
             Инициализация системы аналитики.
 
             Args:
                 cache (ChatCache): Экземпляр класса для работы с базой данных
+                preload (bool): Загружать ли исторические данные сразу.
+                    При False данные загружаются позже вызовом load_history()
+                    (например, в фоне во время запуска приложения)
 
             Создает необходимые структуры данных для хранения:
                 - Времени начала сессии
@@ -28,77 +43,155 @@ class Analytics:
         """
         self.cache = cache
         self.start_time = time.time()
-        self.model_usage = {}
-        self.session_data = []
+        self.model_usage = {}   # Итоги по моделям за все время
+        self.session_data = SessionStore()  # Подробные записи сообщений текущей сессии
+
+        # Гистограммы задержек: модель -> метрика -> LatencyHistogram
+        self.latency = {}
+
+        # Загрузка итогов и учет новых сообщений не должны пересекаться
+        self.lock = threading.Lock()
+
+        # Статистика кэша ответов (попадания не считаются запросами к моделям)
+        self.cache_stats = {
+            'hits': 0,          # Количество ответов, взятых из кэша
+            'saved_tokens': 0   # Количество сэкономленных токенов
+        }
         
         # Загрузка исторических данных из базы
+        if preload:
+            self.load_history()
+
+    def load_history(self):
+        """
+            Загрузка исторических данных из базы данных.
+
+            Потокобезопасна по отношению к базе (каждый поток получает свое
+            соединение), поэтому может выполняться в пуле потоков.
+        """
         self._load_historical_data()
-        
+
     def _load_historical_data(self):
         """
-            Загрузка исторических данных из базы данных.
-            Обновляет статистику использования моделей и сессионные данные.
+            Загрузка итогов по моделям из агрегатов аналитики (analytics_rollup).
+            Отдельные записи не читаются: время загрузки зависит от числа
+            моделей и дней, а не от объема истории.
         """
-        history = self.cache.get_analytics_history()
-        
-        for record in history:
-            timestamp, model, message_length, response_time, tokens_used = record
-            
-            # Обновление статистики моделей
-            if model not in self.model_usage:
-                self.model_usage[model] = {
-                    'count': 0,
-                    'tokens': 0
+        # Под блокировкой: сообщение, отслеженное во время чтения, либо уже
+        # попало в агрегаты, либо будет добавлено к загруженным итогам
+        with self.lock:
+            self._apply_totals(self.cache.get_analytics_totals())
+            self._apply_histograms(self.cache.get_latency_histograms())
+
+    def _apply_histograms(self, buckets):
+        """
+            Замена гистограмм задержек загруженными из базы.
+
+            Args:
+                buckets (list): Результат ChatCache.get_latency_histograms
+        """
+        latency = {}
+        for model, metric, bucket, count in buckets:
+            histogram = latency.setdefault(model, {}).setdefault(metric, LatencyHistogram())
+            histogram.add_bucket(bucket, count)
+        self.latency = latency
+
+    def _record_latency(self, model: str, metric: str, value: float):
+        """
+            Добавление значения в гистограмму модели и в базу.
+
+            Args:
+                model (str): Идентификатор модели
+                metric (str): response_time, tokens_per_second или ttft
+                value (float): Значение метрики
+        """
+        histogram = self.latency.setdefault(model, {}).setdefault(metric, LatencyHistogram())
+        self.cache.save_latency_bucket(model, metric, histogram.record(value))
+
+    def _apply_totals(self, totals):
+        """
+            Замена итогов по моделям и статистики кэша ответов.
+
+            Args:
+                totals (list): Результат ChatCache.get_analytics_totals
+        """
+        model_usage = {}
+        cache_stats = {'hits': 0, 'saved_tokens': 0}
+
+        for model, count, tokens, cache_hits, saved_tokens in totals:
+            # Попадания в кэш ответов учитываются отдельно от запросов к моделям
+            cache_stats['hits'] += cache_hits
+            cache_stats['saved_tokens'] += saved_tokens
+            if count:
+                model_usage[model] = {
+                    'count': count,
+                    'tokens': tokens
                 }
-            self.model_usage[model]['count'] += 1
-            self.model_usage[model]['tokens'] += tokens_used
-            
-            # Добавление в сессионные данные
-            self.session_data.append({
-                'timestamp': datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S.%f'),
-                'model': model,
-                'message_length': message_length,
-                'response_time': response_time,
-                'tokens_used': tokens_used
-            })
 
-    def track_message(self, model: str, message_length: int, response_time: float, tokens_used: int):
+        self.model_usage = model_usage
+        self.cache_stats = cache_stats
+
+    def track_message(self, model: str, message_length: int, response_time: float, tokens_used: int,
+                      cache_hit: bool = False, saved_tokens: int = 0,
+                      ttft: float = None, completion_tokens: int = None, failed: bool = False):
         """
             Отслеживание метрик отдельного сообщения.
 
             Сохраняет подробную информацию о каждом сообщении и обновляет
-            общую статистику использования моделей.
+            общую статистику использования моделей. Ответы из кэша ответов
+            учитываются отдельно (количество попаданий и сэкономленные токены).
 
             Args:
                 model (str): Идентификатор использованной модели
                 message_length (int): Длина сообщения в символах
                 response_time (float): Время ответа в секундах
                 tokens_used (int): Количество использованных токенов
+                cache_hit (bool): Ответ взят из кэша ответов
+                saved_tokens (int): Количество токенов, сэкономленных кэшем
+                ttft (float): Время до первого фрагмента ответа в секундах (при потоковом получении)
+                completion_tokens (int): Количество токенов ответа (для скорости генерации)
+                failed (bool): Запрос завершился ошибкой API - время такого ответа
+                    не попадает в гистограммы задержек модели
         """
         timestamp = datetime.now()
         
-        # Сохранение в базу данных
-        self.cache.save_analytics(timestamp, model, message_length, response_time, tokens_used)
-        
-        # Инициализация статистики для новой модели при первом использовании
-        if model not in self.model_usage:
-            self.model_usage[model] = {
-                'count': 0,    # Счетчик использований
-                'tokens': 0    # Счетчик токенов
-            }
+        # Запись и обновление итогов атомарны относительно загрузки итогов из базы
+        with self.lock:
+            # Сохранение в базу данных
+            self.cache.save_analytics(timestamp, model, message_length, response_time, tokens_used,
+                                      cache_hit, saved_tokens)
+
+            # Попадание в кэш - запрос к модели не выполнялся
+            if cache_hit:
+                self.cache_stats['hits'] += 1
+                self.cache_stats['saved_tokens'] += saved_tokens
+                return
+
+            # Инициализация статистики для новой модели при первом использовании
+            if model not in self.model_usage:
+                self.model_usage[model] = {
+                    'count': 0,    # Счетчик использований
+                    'tokens': 0    # Счетчик токенов
+                }
+
+            # Обновление статистики использования модели
+            self.model_usage[model]['count'] += 1          # Увеличение счетчика сообщений
+            self.model_usage[model]['tokens'] += tokens_used  # Добавление использованных токенов
 
-        # Обновление статистики использования модели
-        self.model_usage[model]['count'] += 1          # Увеличение счетчика сообщений
-        self.model_usage[model]['tokens'] += tokens_used  # Добавление использованных токенов
+            # Сохранение подробной информации о сообщении
+            self.session_data.append(timestamp, model, message_length, response_time, tokens_used)
 
-        # Сохранение подробной информации о сообщении
-        self.session_data.append({
-            'timestamp': timestamp,           # Время отправки сообщения
-            'model': model,                   # Использованная модель
-            'message_length': message_length, # Длина сообщения
-            'response_time': response_time,   # Время ответа
-            'tokens_used': tokens_used        # Количество токенов
-        })
+            # Гистограммы задержек (быстрые ошибки 401/429/таймауты исказили бы перцентили)
+            if failed:
+                return
+            self._record_latency(model, 'response_time', response_time)
+            if ttft is not None:
+                self._record_latency(model, 'ttft', ttft)
+            if completion_tokens:
+                # Скорость генерации считается без ожидания первого токена
+                generation_time = response_time - (ttft or 0)
+                if generation_time > 0:
+                    self._record_latency(model, 'tokens_per_second', completion_tokens / generation_time)
 
     def get_statistics(self) -> dict:
         """
@@ -115,6 +208,13 @@ class Analytics:
                     - messages_per_minute: среднее количество сообщений в минуту
                     - tokens_per_message: среднее количество токенов на сообщение
                     - model_usage: статистика использования каждой модели
+                    - cache_hits: количество ответов из кэша ответов
+                    - cache_hit_rate: доля ответов из кэша среди всех ответов
+                    - saved_tokens: количество токенов, сэкономленных кэшем
+                    - session_messages: количество сообщений текущей сессии
+                    - avg_response_time: среднее время ответа в текущей сессии
+                    - session_model_usage: статистика моделей в текущей сессии
+                    - latency: перцентили задержек по моделям (см. get_latency_stats)
         """
         # Расчет общей длительности сессии
         total_time = time.time() - self.start_time
@@ -125,34 +225,134 @@ class Analytics:
         # Подсчет общего количества сообщений по всем моделям
         total_messages = sum(model['count'] for model in self.model_usage.values())
 
+        # Итоги текущей сессии
+        session = self.session_data.totals()
+
         # Формирование и возврат статистики
         return {
             'total_messages': total_messages,  # Общее количество сообщений
             'total_tokens': total_tokens,      # Общее количество токенов
             'session_duration': total_time,    # Длительность сессии в секундах
             
-            # Расчет среднего количества сообщений в минуту
+            # Расчет среднего количества сообщений в минуту за текущую сессию
             # Если сессия только началась (total_time близко к 0),
             # возвращаем 0 чтобы избежать деления на очень маленькое число
-            'messages_per_minute': (total_messages * 60) / total_time if total_time > 0 else 0,
+            'messages_per_minute': (session['count'] * 60) / total_time if total_time > 0 else 0,
             
             # Расчет среднего количества токенов на сообщение
             # Если сообщений нет, возвращаем 0 чтобы избежать деления на ноль
             'tokens_per_message': total_tokens / total_messages if total_messages > 0 else 0,
             
             # Полная статистика использования моделей
-            'model_usage': self.model_usage
+            'model_usage': self.model_usage,
+
+            # Статистика кэша ответов
+            'cache_hits': self.cache_stats['hits'],
+            'cache_hit_rate': (
+                self.cache_stats['hits'] / (self.cache_stats['hits'] + total_messages)
+                if self.cache_stats['hits'] + total_messages > 0 else 0
+            ),
+            'saved_tokens': self.cache_stats['saved_tokens'],
+
+            # Статистика текущей сессии (из итогов колоночного хранилища)
+            'session_messages': session['count'],
+            'avg_response_time': session['avg_response_time'],
+            'session_model_usage': self.session_data.breakdown(),
+
+            # Перцентили задержек по моделям
+            'latency': self.get_latency_stats()
+        }
+
+    def get_latency_stats(self) -> dict:
+        """
+            Перцентили задержек по моделям.
+
+            Returns:
+                dict: {модель: {метрика: {'p50', 'p90', 'p99', 'count'}}}, где метрики:
+                    - response_time: время ответа в секундах
+                    - tokens_per_second: скорость генерации ответа
+                    - ttft: время до первого токена в секундах
+        """
+        return {
+            model: {metric: histogram.quantiles() for metric, histogram in metrics.items()}
+            for model, metrics in self.latency.items()
         }
 
-    def export_data(self) -> list:
+    def query_series(self, window, bucket, now: datetime = None) -> list:
         """
-            Экспорт всех собранных данных сессии.
+            Временной ряд использования за период с заданным шагом.
+
+            Группировка выполняется в SQL (для шага, кратного часу или дню, -
+            по агрегатам analytics_rollup), поэтому время запроса не зависит
+            от объема истории. Интервалы без сообщений заполняются нулями.
+
+            Args:
+                window (timedelta | float): Длина периода (или секунды)
+                bucket (timedelta | float): Шаг ряда (или секунды)
+                now (datetime): Конец периода. По умолчанию: текущее время
 
             Returns:
-                list: Список словарей с подробной информацией о каждом сообщении
-                     включая временные метки, использованные модели и метрики.
+                list: Список словарей по возрастанию времени:
+                    {
+                        "start": datetime,             # Начало интервала
+                        "messages": int,               # Запросов к моделям
+                        "tokens": int,                 # Использовано токенов
+                        "avg_response_time": float,    # Среднее время ответа
+                        "max_response_time": float,    # Максимальное время ответа
+                        "cache_hits": int              # Ответов из кэша
+                    }
+
+            Raises:
+                ValueError: Если шаг не положительный или точек больше MAX_SERIES_POINTS
+        """
+        window_seconds = window.total_seconds() if isinstance(window, timedelta) else float(window)
+        bucket_seconds = int(bucket.total_seconds() if isinstance(bucket, timedelta) else bucket)
+        if bucket_seconds <= 0:
+            raise ValueError("Шаг ряда должен быть положительным")
+        if window_seconds / bucket_seconds > self.MAX_SERIES_POINTS:
+            raise ValueError(f"Слишком много точек в ряду (максимум {self.MAX_SERIES_POINTS})")
+
+        now = now or datetime.now()
+        since = now - timedelta(seconds=window_seconds)
+        rows = {row[0]: row for row in self.cache.get_analytics_series(since, bucket_seconds)}
+
+        # Границы интервалов в "наивных" секундах, как в SQL-запросе
+        first = int((since - NAIVE_EPOCH).total_seconds()) // bucket_seconds * bucket_seconds
+        last = int((now - NAIVE_EPOCH).total_seconds()) // bucket_seconds * bucket_seconds
+
+        series = []
+        for start in range(first, last + 1, bucket_seconds):
+            _, messages, tokens, response_time, response_time_max, cache_hits = rows.get(start, (start, 0, 0, 0.0, 0.0, 0))
+            series.append({
+                'start': NAIVE_EPOCH + timedelta(seconds=start),
+                'messages': messages or 0,
+                'tokens': tokens or 0,
+                'avg_response_time': response_time / messages if messages else 0.0,
+                'max_response_time': response_time_max or 0.0,
+                'cache_hits': cache_hits or 0
+            })
+        return series
+
+    def export_data(self):
         """
-        return self.session_data
+            Экспорт всех собранных данных.
+
+            Записи читаются из базы порциями по мере перебора и не хранятся в памяти.
+
+            Yields:
+                dict: Подробная информация о сообщении, включая временную метку,
+                     использованную модель и метрики.
+        """
+        for timestamp, model, message_length, response_time, tokens_used, cache_hit, _ in self.cache.iter_analytics_history():
+            if cache_hit:
+                continue
+            yield {
+                'timestamp': datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S.%f'),
+                'model': model,
+                'message_length': message_length,
+                'response_time': response_time,
+                'tokens_used': tokens_used
+            }
 
     def clear_data(self):
         """
@@ -165,3 +365,5 @@ class Analytics:
         """
         self.model_usage.clear()    # Очистка статистики по моделям
         self.session_data.clear()   # Очистка истории сообщений
+        self.latency = {}           # Очистка гистограмм задержек
+        self.cache_stats = {'hits': 0, 'saved_tokens': 0}  # Сброс статистики кэша ответов
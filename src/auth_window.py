@@ -91,7 +91,7 @@ class AuthenticationWindow:
 
             # Получаем баланс через API
             try:
-                client = OpenRouterClient(api_key=key)
+                client = OpenRouterClient(api_key=key, preload_models=False)  # Каталог моделей для проверки ключа не нужен
                 balance = client.get_balance()
             except Exception as e:
                 self.logger.error(f"Ошибка проверки ключа: {e}")
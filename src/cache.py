@@ -1,10 +1,14 @@
 # Импорт необходимых библиотек
 import sqlite3                 # Библиотека для работы с SQLite базой данных
 import json                    # Библиотека для работы с JSON форматом
-from datetime import datetime  # Библиотека для работы с датой и временем
+from datetime import datetime, timedelta  # Библиотека для работы с датой и временем
 import threading               # Библиотека для обеспечения потокобезопасности
+import hashlib                 # Библиотека для хэширования ключей кэша ответов
+import time                    # Библиотека для работы с временными метками
 from pathlib import Path       # Библиотека для работы с системными путями
 import os                      # Библиотека для работы с системой
+from writer import WriteBehindWriter  # Фоновая пакетная запись в базу
+from histogram import LatencyHistogram  # Корзины гистограмм задержек
 
 class ChatCache:
     """
@@ -15,18 +19,42 @@ class ChatCache:
             - Сохранение метаданных (модель, токены, время)
             - Форматированный вывод истории
             - Очистку истории
+            - Фоновую пакетную запись (write-behind)
+            - Полнотекстовый поиск по истории (FTS5)
     """
-    
-    def __init__(self):
+
+    # Очистка старых трассировок выполняется каждые столько сохраненных ходов
+    TRACE_PRUNE_EVERY = 100
+
+    def __init__(self, response_cache_ttl: float = 24 * 60 * 60,
+                 response_cache_max_entries: int = 500,
+                 response_cache_max_bytes: int = 5 * 1024 * 1024,
+                 trace_max_turns: int = 1000):
         """
             Инициализация системы кэширования.
 
+            Args:
+                response_cache_ttl (float): Время жизни записи кэша ответов в секундах
+                response_cache_max_entries (int): Максимальное число записей кэша ответов
+                response_cache_max_bytes (int): Максимальный суммарный размер ответов в кэше
+                trace_max_turns (int): Сколько последних ходов хранить в trace_spans
+
             Создает:
                 - Файл базы данных SQLite
                 - Потокобезопасное хранилище соединений
                 - Необходимые таблицы в базе данных
         """
 
+        # Ограничения кэша ответов
+        self.response_cache_ttl = response_cache_ttl                  # Время жизни записи
+        self.response_cache_max_entries = response_cache_max_entries  # Лимит числа записей
+        self.response_cache_max_bytes = response_cache_max_bytes      # Лимит размера
+
+        # Хранение трассировок ходов: последние trace_max_turns, очистка при первом
+        # сохранении за запуск и затем каждые TRACE_PRUNE_EVERY ходов
+        self.trace_max_turns = trace_max_turns
+        self.traces_saved = 0
+
         # Получаем путь до хранилища
         storage_path = os.getenv("FLET_APP_STORAGE_DATA")
         base_dir = Path(storage_path) if storage_path else Path(".")
@@ -41,6 +69,10 @@ class ChatCache:
         # Создание необходимых таблиц при инициализации
         self.create_tables()
 
+        # Фоновая запись: сохранение сообщений и аналитики не ждет диска
+        # и объединяется в пакеты (одна транзакция и один fsync на пакет)
+        self.writer = WriteBehindWriter(self._connect)
+
     def get_connection(self):
         """
             Получение соединения с базой данных для текущего потока.
@@ -55,12 +87,46 @@ class ChatCache:
         # Проверяем, есть ли уже соединение в текущем потоке
         if not hasattr(self.local, 'connection'):
             # Если соединения нет - создаем новое
-            self.local.connection = sqlite3.connect(self.db_name)
+            self.local.connection = self._connect()
         return self.local.connection
 
+    def _connect(self):
+        """
+            Открытие нового соединения с настроенными параметрами SQLite.
+
+            Настраивает:
+                - synchronous=NORMAL: в режиме WAL fsync выполняется только
+                  при контрольной точке, а не на каждый commit
+                - busy_timeout: ожидание блокировки вместо ошибки при записи из другого потока
+                - cache_size и temp_store: кэш страниц и временные данные в памяти
+                - mmap_size: чтение файла базы через отображение в память
+
+            Returns:
+                sqlite3.Connection: Объект соединения с базой данных
+        """
+        conn = sqlite3.connect(self.db_name, timeout=5.0)
+        conn.execute('PRAGMA synchronous=NORMAL')    # Безопасно в режиме WAL и намного быстрее FULL
+        conn.execute('PRAGMA busy_timeout=5000')     # Ожидание блокировки до 5 секунд
+        conn.execute('PRAGMA cache_size=-8000')      # Кэш страниц ~8 МБ
+        conn.execute('PRAGMA temp_store=MEMORY')     # Временные таблицы и сортировки в памяти
+        conn.execute('PRAGMA mmap_size=67108864')    # Отображение до 64 МБ файла в память
+        return conn
+
+    # Актуальная версия схемы базы данных (см. create_tables)
+    SCHEMA_VERSION = 8
+
+    # Маркеры начала и конца совпадения в сниппетах результатов поиска
+    SEARCH_MATCH_START = "\x02"
+    SEARCH_MATCH_END = "\x03"
+
     def create_tables(self):
         """
-            Создание необходимых таблиц в базе данных.
+            Создание и миграция таблиц базы данных.
+
+            Версия схемы хранится в таблице schema_version. При запуске
+            последовательно применяются все миграции новее сохраненной версии,
+            каждая в своей транзакции, поэтому существующие базы обновляются
+            без потери данных.
 
             Создает таблицу messages со следующими полями:
                 - id: уникальный идентификатор сообщения
@@ -71,9 +137,51 @@ class ChatCache:
                 - tokens_used: количество использованных токенов
         """
         # Создаем новое соединение с базой
-        conn = sqlite3.connect(self.db_name)
+        conn = self._connect()
+
+        # Журнал WAL: чтение не блокируется записью, commit не переписывает файл базы.
+        # Режим сохраняется в файле базы, поэтому достаточно включить его один раз
+        conn.execute('PRAGMA journal_mode=WAL')
+
         cursor = conn.cursor()
-        
+        cursor.execute('CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)')
+        row = cursor.execute('SELECT version FROM schema_version').fetchone()
+        version = row[0] if row else 0
+
+        # Миграции по порядку: индекс в списке + 1 = номер версии
+        migrations = [
+            self._migration_1_base_tables,
+            self._migration_2_response_cache,
+            self._migration_3_indexes,
+            self._migration_4_fts,
+            self._migration_5_analytics_rollup,
+            self._migration_6_latency_histogram,
+            self._migration_7_trace_spans,
+            self._migration_8_notification_outbox,
+        ]
+
+        for target, migration in enumerate(migrations, start=1):
+            if version >= target:
+                continue
+
+            cursor.execute('BEGIN')
+            try:
+                migration(cursor)
+                cursor.execute('DELETE FROM schema_version')
+                cursor.execute('INSERT INTO schema_version (version) VALUES (?)', (target,))
+                conn.commit()  # Сохранение изменений в базе
+            except Exception:
+                conn.rollback()
+                conn.close()
+                raise
+            version = target
+
+        conn.close()   # Закрытие соединения
+
+    def _migration_1_base_tables(self, cursor):
+        """
+            Миграция 1: основные таблицы истории чата и аналитики.
+        """
         # SQL запросы для создания таблиц
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS messages (
@@ -96,9 +204,247 @@ class ChatCache:
                 tokens_used INTEGER
             )
         ''')
-        
-        conn.commit()  # Сохранение изменений в базе
-        conn.close()   # Закрытие соединения
+
+    def _migration_2_response_cache(self, cursor):
+        """
+            Миграция 2: кэш ответов и колонки попаданий в кэш в аналитике.
+        """
+        # Кэш ответов на одинаковые запросы (ключ - хэш модели, сообщений и параметров)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,   -- SHA-256 от (модель, сообщения, параметры)
+                model TEXT,             -- Идентификатор модели
+                response TEXT,          -- Текст ответа
+                tokens_used INTEGER,    -- Токены, потраченные на исходный ответ
+                created_at REAL,        -- Время сохранения (epoch)
+                last_access REAL,       -- Время последнего обращения (для LRU)
+                size INTEGER            -- Размер ответа в байтах
+            )
+        ''')
+
+        # Колонки могут уже существовать в базах, созданных до появления schema_version
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(analytics_messages)')}
+        if 'cache_hit' not in columns:
+            # Ответ взят из кэша ответов
+            cursor.execute('ALTER TABLE analytics_messages ADD COLUMN cache_hit INTEGER DEFAULT 0')
+        if 'saved_tokens' not in columns:
+            # Токены, сэкономленные кэшем
+            cursor.execute('ALTER TABLE analytics_messages ADD COLUMN saved_tokens INTEGER DEFAULT 0')
+
+    def _migration_3_indexes(self, cursor):
+        """
+            Миграция 3: индексы для сортировки по времени и фильтрации по модели.
+        """
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages (timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_model ON messages (model)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_analytics_timestamp ON analytics_messages (timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_analytics_model ON analytics_messages (model)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_response_cache_last_access ON response_cache (last_access)')
+
+    def _migration_4_fts(self, cursor):
+        """
+            Миграция 4: полнотекстовый индекс FTS5 по истории чата.
+
+            Индекс хранит только токены (external content), текст читается
+            из таблицы messages. Синхронизация выполняется триггерами, поэтому
+            фоновая запись и очистка истории не требуют изменений.
+        """
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                    user_message,
+                    ai_response,
+                    content='messages',
+                    content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            # Сборка SQLite без FTS5: поиск будет работать через LIKE
+            if 'fts5' not in str(e):
+                raise
+            return
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+                INSERT INTO messages_fts (rowid, user_message, ai_response)
+                VALUES (new.id, new.user_message, new.ai_response);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+                INSERT INTO messages_fts (messages_fts, rowid, user_message, ai_response)
+                VALUES ('delete', old.id, old.user_message, old.ai_response);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE ON messages BEGIN
+                INSERT INTO messages_fts (messages_fts, rowid, user_message, ai_response)
+                VALUES ('delete', old.id, old.user_message, old.ai_response);
+                INSERT INTO messages_fts (rowid, user_message, ai_response)
+                VALUES (new.id, new.user_message, new.ai_response);
+            END
+        ''')
+
+        # Индексация уже сохраненной истории
+        cursor.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+
+    # Выражения группировки записей аналитики по периодам (см. analytics_rollup)
+    ROLLUP_BUCKETS = {
+        'hour': "strftime('%Y-%m-%d %H:00', {ts})",
+        'day': "date({ts})",
+    }
+
+    def _migration_5_analytics_rollup(self, cursor):
+        """
+            Миграция 5: агрегаты аналитики по моделям за час и за день.
+
+            Агрегаты обновляются триггером в той же транзакции, что и вставка
+            записи в analytics_messages, поэтому для статистики не нужно
+            перечитывать все записи.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analytics_rollup (
+                period TEXT NOT NULL,               -- Период агрегации: hour / day
+                bucket TEXT NOT NULL,               -- Начало периода ('YYYY-MM-DD HH:00' / 'YYYY-MM-DD')
+                model TEXT NOT NULL,                -- Идентификатор модели
+                count INTEGER NOT NULL DEFAULT 0,   -- Запросов к модели (без ответов из кэша)
+                tokens INTEGER NOT NULL DEFAULT 0,  -- Использовано токенов
+                message_length INTEGER NOT NULL DEFAULT 0,  -- Сумма длин сообщений
+                response_time REAL NOT NULL DEFAULT 0,      -- Сумма времени ответа
+                response_time_max REAL NOT NULL DEFAULT 0,  -- Максимальное время ответа
+                cache_hits INTEGER NOT NULL DEFAULT 0,      -- Ответов из кэша ответов
+                saved_tokens INTEGER NOT NULL DEFAULT 0,    -- Сэкономлено токенов кэшем
+                PRIMARY KEY (period, bucket, model)
+            ) WITHOUT ROWID
+        ''')
+
+        for period, bucket in self.ROLLUP_BUCKETS.items():
+            new_bucket = bucket.format(ts='new.timestamp')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS analytics_rollup_{period} AFTER INSERT ON analytics_messages BEGIN
+                    INSERT INTO analytics_rollup (
+                        period, bucket, model, count, tokens, message_length,
+                        response_time, response_time_max, cache_hits, saved_tokens
+                    )
+                    VALUES (
+                        '{period}', {new_bucket}, COALESCE(new.model, ''),
+                        CASE WHEN new.cache_hit THEN 0 ELSE 1 END,
+                        CASE WHEN new.cache_hit THEN 0 ELSE COALESCE(new.tokens_used, 0) END,
+                        CASE WHEN new.cache_hit THEN 0 ELSE COALESCE(new.message_length, 0) END,
+                        CASE WHEN new.cache_hit THEN 0 ELSE COALESCE(new.response_time, 0) END,
+                        CASE WHEN new.cache_hit THEN 0 ELSE COALESCE(new.response_time, 0) END,
+                        CASE WHEN new.cache_hit THEN 1 ELSE 0 END,
+                        COALESCE(new.saved_tokens, 0)
+                    )
+                    ON CONFLICT (period, bucket, model) DO UPDATE SET
+                        count = count + excluded.count,
+                        tokens = tokens + excluded.tokens,
+                        message_length = message_length + excluded.message_length,
+                        response_time = response_time + excluded.response_time,
+                        response_time_max = MAX(response_time_max, excluded.response_time_max),
+                        cache_hits = cache_hits + excluded.cache_hits,
+                        saved_tokens = saved_tokens + excluded.saved_tokens;
+                END
+            ''')
+
+            # Агрегаты по уже сохраненной аналитике
+            old_bucket = bucket.format(ts='timestamp')
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO analytics_rollup
+                SELECT
+                    '{period}', {old_bucket}, COALESCE(model, ''),
+                    SUM(CASE WHEN cache_hit THEN 0 ELSE 1 END),
+                    SUM(CASE WHEN cache_hit THEN 0 ELSE COALESCE(tokens_used, 0) END),
+                    SUM(CASE WHEN cache_hit THEN 0 ELSE COALESCE(message_length, 0) END),
+                    SUM(CASE WHEN cache_hit THEN 0 ELSE COALESCE(response_time, 0) END),
+                    MAX(CASE WHEN cache_hit THEN 0 ELSE COALESCE(response_time, 0) END),
+                    SUM(CASE WHEN cache_hit THEN 1 ELSE 0 END),
+                    SUM(COALESCE(saved_tokens, 0))
+                FROM analytics_messages
+                GROUP BY 2, 3
+            ''')
+
+    def _migration_6_latency_histogram(self, cursor):
+        """
+            Миграция 6: гистограммы задержек по моделям (см. LatencyHistogram).
+
+            Хранятся счетчики корзин, поэтому новое значение - это увеличение
+            одного счетчика, а гистограммы за разные периоды просто складываются.
+            Гистограмма времени ответа заполняется из уже сохраненной аналитики.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS latency_histogram (
+                model TEXT NOT NULL,               -- Идентификатор модели
+                metric TEXT NOT NULL,              -- response_time / tokens_per_second / ttft
+                bucket INTEGER NOT NULL,           -- Номер корзины LatencyHistogram
+                count INTEGER NOT NULL DEFAULT 0,  -- Количество значений в корзине
+                PRIMARY KEY (model, metric, bucket)
+            ) WITHOUT ROWID
+        ''')
+
+        buckets = {}
+        rows = cursor.execute(
+            'SELECT model, response_time FROM analytics_messages WHERE NOT cache_hit AND response_time IS NOT NULL'
+        )
+        for model, response_time in rows:
+            key = (model or '', 'response_time', LatencyHistogram.bucket_index(response_time))
+            buckets[key] = buckets.get(key, 0) + 1
+
+        cursor.executemany(
+            'INSERT OR REPLACE INTO latency_histogram (model, metric, bucket, count) VALUES (?, ?, ?, ?)',
+            [key + (count,) for key, count in buckets.items()]
+        )
+
+    def _migration_7_trace_spans(self, cursor):
+        """
+            Миграция 7: длительность этапов хода чата (см. Trace).
+
+            На каждый этап хода - одна строка с собственным временем этапа
+            и количеством вызовов, общее время хода хранится этапом 'total'.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trace_spans (
+                trace_id TEXT NOT NULL,            -- Идентификатор трассировки (хода)
+                stage TEXT NOT NULL,               -- Этап: api, parse, render, notify, save, ...
+                timestamp DATETIME NOT NULL,       -- Время начала хода
+                model TEXT,                        -- Идентификатор модели
+                duration REAL NOT NULL,            -- Собственное время этапа в секундах
+                calls INTEGER NOT NULL DEFAULT 1,  -- Количество вызовов этапа за ход
+                PRIMARY KEY (trace_id, stage)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_trace_spans_stage_timestamp
+            ON trace_spans(stage, timestamp DESC)
+        ''')
+
+    def _migration_8_notification_outbox(self, cursor):
+        """
+            Миграция 8: очередь уведомлений (см. NotificationOutbox).
+
+            Уведомление сохраняется до отправки и остается в таблице со статусом
+            доставки. Данные для входа (токен, пароль почты) не хранятся -
+            они берутся из настроек в момент отправки.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS notification_outbox (
+                id TEXT PRIMARY KEY,                     -- Идентификатор уведомления
+                channel TEXT NOT NULL,                   -- Канал: email, telegram
+                recipient TEXT NOT NULL,                 -- Получатель
+                message TEXT NOT NULL,                   -- Текст уведомления
+                status TEXT NOT NULL,                    -- pending, sent, dead
+                attempts INTEGER NOT NULL DEFAULT 0,     -- Количество попыток отправки
+                next_attempt REAL NOT NULL,              -- Время следующей попытки (Unix)
+                last_error TEXT,                         -- Ошибка последней попытки
+                created DATETIME NOT NULL,               -- Время постановки в очередь
+                updated DATETIME NOT NULL                -- Время последнего изменения статуса
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_notification_outbox_status
+            ON notification_outbox(status, next_attempt)
+        ''')
 
     def save_message(self, model, user_message, ai_response, tokens_used):
         """
@@ -110,15 +456,11 @@ class ChatCache:
                 ai_response (str): Ответ AI модели
                 tokens_used (int): Количество использованных токенов
         """
-        conn = self.get_connection()  # Получение соединения для текущего потока
-        cursor = conn.cursor()
-        
-        # Вставка новой записи в таблицу messages
-        cursor.execute('''
+        # Постановка вставки новой записи в очередь фоновой записи
+        self.writer.submit('''
             INSERT INTO messages (model, user_message, ai_response, timestamp, tokens_used)
             VALUES (?, ?, ?, ?, ?)
         ''', (model, user_message, ai_response, datetime.now(), tokens_used))
-        conn.commit()  # Сохранение изменений
 
     def get_chat_history(self, limit=50):
         """
@@ -131,6 +473,7 @@ class ChatCache:
                 list: Список кортежей с данными сообщений, отсортированных
                      по времени в обратном порядке (новые сначала)
         """
+        self.flush()  # Дожидаемся записи сообщений из очереди
         conn = self.get_connection()  # Получение соединения для текущего потока
         cursor = conn.cursor()
         
@@ -142,7 +485,175 @@ class ChatCache:
         ''', (limit,))
         return cursor.fetchall()  # Возврат всех найденных записей
 
-    def save_analytics(self, timestamp, model, message_length, response_time, tokens_used):
+    def get_chat_page(self, before_id: int = None, after_id: int = None, limit: int = 20):
+        """
+            Получение страницы истории чата с курсорной (keyset) пагинацией.
+
+            Вместо OFFSET используется условие по id, поэтому стоимость запроса
+            не зависит от того, насколько глубоко пролистана история.
+
+            Args:
+                before_id (int): Вернуть сообщения старше этого id (листание вверх)
+                after_id (int): Вернуть сообщения новее этого id (листание вниз)
+                limit (int): Максимальное количество сообщений на странице
+
+            Returns:
+                list: Список кортежей с данными сообщений (формат get_chat_history),
+                     отсортированных по id в обратном порядке (новые сначала)
+        """
+        self.flush()  # Дожидаемся записи сообщений из очереди
+        conn = self.get_connection()  # Получение соединения для текущего потока
+        cursor = conn.cursor()
+
+        if after_id is not None:
+            # Ближайшие более новые сообщения, затем разворот к порядку "новые сначала"
+            cursor.execute('''
+                SELECT * FROM messages
+                WHERE id > ?
+                ORDER BY id ASC
+                LIMIT ?
+            ''', (after_id, limit))
+            return cursor.fetchall()[::-1]
+
+        if before_id is not None:
+            cursor.execute('''
+                SELECT * FROM messages
+                WHERE id < ?
+                ORDER BY id DESC
+                LIMIT ?
+            ''', (before_id, limit))
+        else:
+            # Первая (самая новая) страница
+            cursor.execute('''
+                SELECT * FROM messages
+                ORDER BY id DESC
+                LIMIT ?
+            ''', (limit,))
+        return cursor.fetchall()
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """
+            Преобразование пользовательского ввода в запрос FTS5.
+
+            Каждое слово берется в кавычки (операторы и спецсимволы FTS5
+            не интерпретируются). Слово со звездочкой на конце ("ошибк*")
+            ищется по префиксу.
+
+            Args:
+                query (str): Строка поиска пользователя
+
+            Returns:
+                str: Выражение для MATCH или пустая строка
+        """
+        terms = []
+        for term in query.split():
+            prefix = term.endswith('*') and len(term) > 1
+            term = term.rstrip('*')
+            if term:
+                terms.append('"' + term.replace('"', '""') + '"' + ('*' if prefix else ''))
+        return " ".join(terms)
+
+    def has_fts(self) -> bool:
+        """
+            Доступен ли полнотекстовый индекс (SQLite собран с FTS5).
+        """
+        conn = self.get_connection()
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+        ).fetchone()
+        return row is not None
+
+    # Сколько последних совпадений ранжируется по релевантности (см. search)
+    SEARCH_CANDIDATES = 2000
+
+    def search(self, query: str, limit: int = 20, model: str = None):
+        """
+            Полнотекстовый поиск по истории чата.
+
+            Результаты упорядочены по релевантности (BM25). Для частых слов
+            ранжируются только SEARCH_CANDIDATES самых новых совпадений:
+            граница по id находится по индексу без подсчета релевантности,
+            поэтому время запроса не растет вместе с историей.
+            Совпадения в сниппетах обрамлены маркерами SEARCH_MATCH_START / SEARCH_MATCH_END.
+
+            Args:
+                query (str): Строка поиска
+                limit (int): Максимальное количество результатов
+                model (str): Искать только в ответах этой модели
+
+            Returns:
+                list: Список словарей в формате:
+                    {
+                        "id": int,              # ID сообщения
+                        "model": str,           # Использованная модель
+                        "timestamp": str,       # Время создания
+                        "user_snippet": str,    # Фрагмент сообщения пользователя
+                        "ai_snippet": str       # Фрагмент ответа AI
+                    }
+        """
+        match = self._fts_query(query)
+        if not match:
+            return []
+
+        self.flush()  # Дожидаемся записи сообщений из очереди
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        model_filter = 'AND m.model = ?' if model else ''
+        model_params = [model] if model else []
+
+        if self.has_fts():
+            # Граница окна кандидатов: id N-го совпадения с конца (обход индекса по убыванию id)
+            row = cursor.execute(f'''
+                SELECT messages_fts.rowid
+                FROM messages_fts
+                JOIN messages m ON m.id = messages_fts.rowid
+                WHERE messages_fts MATCH ? {model_filter}
+                ORDER BY messages_fts.rowid DESC
+                LIMIT 1 OFFSET ?
+            ''', [match] + model_params + [self.SEARCH_CANDIDATES - 1]).fetchone()
+            min_id = row[0] if row else 0
+
+            cursor.execute(f'''
+                SELECT
+                    m.id,
+                    m.model,
+                    m.timestamp,
+                    snippet(messages_fts, 0, ?, ?, '…', 12),
+                    snippet(messages_fts, 1, ?, ?, '…', 12)
+                FROM messages_fts
+                JOIN messages m ON m.id = messages_fts.rowid
+                WHERE messages_fts MATCH ? AND messages_fts.rowid >= ? {model_filter}
+                ORDER BY messages_fts.rank
+                LIMIT ?
+            ''', [self.SEARCH_MATCH_START, self.SEARCH_MATCH_END] * 2 + [match, min_id] + model_params + [limit])
+        else:
+            # Запасной вариант без FTS5: поиск подстроки, новые сначала.
+            # Спецсимволы LIKE в запросе экранируются ("50%", "snake_case" ищутся буквально)
+            escaped = query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            pattern = f"%{escaped}%"
+            cursor.execute(f'''
+                SELECT m.id, m.model, m.timestamp, m.user_message, m.ai_response
+                FROM messages m
+                WHERE (m.user_message LIKE ? ESCAPE '\\' OR m.ai_response LIKE ? ESCAPE '\\') {model_filter}
+                ORDER BY m.id DESC
+                LIMIT ?
+            ''', [pattern, pattern] + model_params + [limit])
+
+        return [
+            {
+                "id": row[0],
+                "model": row[1],
+                "timestamp": row[2],
+                "user_snippet": row[3],
+                "ai_snippet": row[4]
+            }
+            for row in cursor.fetchall()
+        ]
+
+    def save_analytics(self, timestamp, model, message_length, response_time, tokens_used,
+                       cache_hit=False, saved_tokens=0):
         """
             Сохранение данных аналитики в базу данных.
 
@@ -152,16 +663,15 @@ class ChatCache:
                 message_length (int): Длина сообщения
                 response_time (float): Время ответа
                 tokens_used (int): Количество использованных токенов
+                cache_hit (bool): Ответ взят из кэша ответов
+                saved_tokens (int): Количество токенов, сэкономленных кэшем
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        # Постановка записи в очередь фоновой записи
+        self.writer.submit('''
             INSERT INTO analytics_messages 
-            (timestamp, model, message_length, response_time, tokens_used)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (timestamp, model, message_length, response_time, tokens_used))
-        conn.commit()
+            (timestamp, model, message_length, response_time, tokens_used, cache_hit, saved_tokens)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (timestamp, model, message_length, response_time, tokens_used, int(cache_hit), saved_tokens))
 
     def get_analytics_history(self):
         """
@@ -170,16 +680,452 @@ class ChatCache:
             Returns:
                 list: Список записей аналитики
         """
+        self.flush()  # Дожидаемся записи сообщений из очереди
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT timestamp, model, message_length, response_time, tokens_used
+            SELECT timestamp, model, message_length, response_time, tokens_used, cache_hit, saved_tokens
             FROM analytics_messages
             ORDER BY timestamp ASC
         ''')
         return cursor.fetchall()
 
+    def iter_analytics_history(self, batch_size: int = 1000):
+        """
+            Перебор всей истории аналитики порциями (без загрузки в память целиком).
+
+            Args:
+                batch_size (int): Количество записей, читаемых за раз
+
+            Yields:
+                tuple: Запись аналитики в формате get_analytics_history
+        """
+        self.flush()  # Дожидаемся записи аналитики из очереди
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT timestamp, model, message_length, response_time, tokens_used, cache_hit, saved_tokens
+            FROM analytics_messages
+            ORDER BY timestamp ASC
+        ''')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    def save_latency_bucket(self, model: str, metric: str, bucket: int):
+        """
+            Увеличение счетчика корзины гистограммы задержек.
+
+            Args:
+                model (str): Идентификатор модели
+                metric (str): Название метрики (response_time, tokens_per_second, ttft)
+                bucket (int): Номер корзины LatencyHistogram
+        """
+        self.writer.submit('''
+            INSERT INTO latency_histogram (model, metric, bucket, count)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT (model, metric, bucket) DO UPDATE SET count = count + 1
+        ''', (model or '', metric, bucket))
+
+    def get_latency_histograms(self):
+        """
+            Получение счетчиков корзин всех гистограмм задержек.
+
+            Returns:
+                list: Список кортежей (model, metric, bucket, count)
+        """
+        self.flush()  # Дожидаемся записи из очереди
+        conn = self.get_connection()
+        return conn.execute('SELECT model, metric, bucket, count FROM latency_histogram').fetchall()
+
+    def save_trace(self, trace, model: str = None):
+        """
+            Сохранение этапов трассировки хода чата.
+
+            Args:
+                trace (Trace): Завершенная трассировка
+                model (str): Идентификатор модели
+        """
+        timestamp = datetime.fromtimestamp(trace.timestamp)
+        stages = dict(trace.breakdown(), total=(trace.total, 1))
+        for stage, (duration, calls) in stages.items():
+            self.writer.submit('''
+                INSERT OR REPLACE INTO trace_spans (trace_id, stage, timestamp, model, duration, calls)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (trace.trace_id, stage, timestamp, model, duration, calls))
+
+        if self.traces_saved % self.TRACE_PRUNE_EVERY == 0:
+            self.prune_traces()
+        self.traces_saved += 1
+
+    def prune_traces(self):
+        """
+            Удаление трассировок старше последних trace_max_turns ходов.
+        """
+        # Граница - время хода с номером trace_max_turns от новых (по индексу stage, timestamp);
+        # если ходов меньше, подзапрос пуст и ничего не удаляется
+        self.writer.submit('''
+            DELETE FROM trace_spans
+            WHERE timestamp < (
+                SELECT timestamp FROM trace_spans
+                WHERE stage = 'total'
+                ORDER BY timestamp DESC
+                LIMIT 1 OFFSET ?
+            )
+        ''', (self.trace_max_turns - 1,))
+
+    def get_trace_breakdown(self, limit: int = 100):
+        """
+            Разбивка времени хода по этапам за последние ходы.
+
+            Args:
+                limit (int): Количество последних ходов
+
+            Returns:
+                tuple: (количество ходов, среднее общее время хода,
+                    список кортежей (stage, среднее время за ход, максимум, ходов с этапом)
+                    по убыванию среднего времени)
+        """
+        self.flush()  # Дожидаемся записи из очереди
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        # Последние ходы выбираются по индексу (stage, timestamp) через строки 'total'
+        cursor.execute('''
+            WITH recent AS (
+                SELECT trace_id, duration FROM trace_spans
+                WHERE stage = 'total'
+                ORDER BY timestamp DESC
+                LIMIT ?
+            )
+            SELECT COUNT(*), AVG(duration) FROM recent
+        ''', (limit,))
+        turns, avg_total = cursor.fetchone()
+        if not turns:
+            return 0, 0.0, []
+
+        cursor.execute('''
+            WITH recent AS (
+                SELECT trace_id FROM trace_spans
+                WHERE stage = 'total'
+                ORDER BY timestamp DESC
+                LIMIT ?
+            )
+            SELECT stage, SUM(duration) / ?, MAX(duration), COUNT(*)
+            FROM trace_spans
+            WHERE trace_id IN (SELECT trace_id FROM recent) AND stage != 'total'
+            GROUP BY stage
+            ORDER BY SUM(duration) DESC
+        ''', (limit, turns))
+        return turns, avg_total, cursor.fetchall()
+
+    def save_notification(self, notification_id: str, channel: str, recipient: str, message: str, next_attempt: float):
+        """
+            Постановка уведомления в очередь отправки (notification_outbox).
+
+            Args:
+                notification_id (str): Идентификатор уведомления
+                channel (str): Канал уведомления
+                recipient (str): Получатель
+                message (str): Текст уведомления
+                next_attempt (float): Время первой попытки отправки (Unix)
+        """
+        now = datetime.now()
+        self.writer.submit('''
+            INSERT INTO notification_outbox
+                (id, channel, recipient, message, status, attempts, next_attempt, created, updated)
+            VALUES (?, ?, ?, ?, 'pending', 0, ?, ?, ?)
+        ''', (notification_id, channel, recipient, message, next_attempt, now, now))
+
+    def update_notification(self, notification_id: str, status: str, attempts: int,
+                            next_attempt: float = None, error: str = None):
+        """
+            Сохранение итога попытки отправки уведомления.
+
+            Args:
+                notification_id (str): Идентификатор уведомления
+                status (str): Новый статус: pending, sent или dead
+                attempts (int): Количество сделанных попыток
+                next_attempt (float): Время следующей попытки (для pending)
+                error (str): Ошибка последней попытки
+        """
+        self.writer.submit('''
+            UPDATE notification_outbox
+            SET status = ?, attempts = ?, next_attempt = COALESCE(?, next_attempt), last_error = ?, updated = ?
+            WHERE id = ?
+        ''', (status, attempts, next_attempt, error, datetime.now(), notification_id))
+
+    def get_pending_notifications(self):
+        """
+            Уведомления, ожидающие отправки (например, оставшиеся с прошлого запуска).
+
+            Returns:
+                list: Кортежи (id, channel, recipient, message, attempts, next_attempt)
+                    в порядке времени следующей попытки
+        """
+        self.flush()  # Дожидаемся записи из очереди
+        conn = self.get_connection()
+        return conn.execute('''
+            SELECT id, channel, recipient, message, attempts, next_attempt
+            FROM notification_outbox
+            WHERE status = 'pending'
+            ORDER BY next_attempt
+        ''').fetchall()
+
+    def get_notification(self, notification_id: str):
+        """
+            Статус доставки уведомления.
+
+            Args:
+                notification_id (str): Идентификатор уведомления
+
+            Returns:
+                tuple | None: (status, attempts, last_error, updated) или None, если уведомления нет
+        """
+        self.flush()  # Дожидаемся записи из очереди
+        conn = self.get_connection()
+        return conn.execute('''
+            SELECT status, attempts, last_error, updated
+            FROM notification_outbox
+            WHERE id = ?
+        ''', (notification_id,)).fetchone()
+
+    def get_outbox_counts(self) -> dict:
+        """
+            Количество уведомлений по статусам доставки.
+
+            Returns:
+                dict: status -> количество
+        """
+        self.flush()  # Дожидаемся записи из очереди
+        conn = self.get_connection()
+        return dict(conn.execute(
+            'SELECT status, COUNT(*) FROM notification_outbox GROUP BY status'
+        ).fetchall())
+
+    def prune_notifications(self, max_age_days: int):
+        """
+            Удаление доставленных уведомлений старше max_age_days.
+            Недоставленные (dead) остаются для разбора.
+
+            Args:
+                max_age_days (int): Сколько дней хранить доставленные уведомления
+        """
+        self.writer.submit(
+            "DELETE FROM notification_outbox WHERE status = 'sent' AND updated < ?",
+            (datetime.now() - timedelta(days=max_age_days),)
+        )
+
+    def get_analytics_series(self, since: datetime, bucket_seconds: int):
+        """
+            Временной ряд аналитики, сгруппированный в SQL по интервалам.
+
+            Интервалы, кратные часу или дню, собираются из агрегатов
+            analytics_rollup (стоимость не зависит от числа сообщений),
+            более мелкие - из записей analytics_messages за период по индексу времени.
+
+            Args:
+                since (datetime): Начало периода
+                bucket_seconds (int): Размер интервала в секундах
+
+            Returns:
+                list: Кортежи (начало интервала в секундах от эпохи, сообщений,
+                    токенов, сумма времени ответа, максимум времени ответа, ответов из кэша),
+                    только непустые интервалы по возрастанию времени
+        """
+        self.flush()  # Дожидаемся записи аналитики из очереди
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        # Время хранится как локальное без часового пояса, поэтому и граница,
+        # и интервалы считаются в "наивных" секундах (strftime('%s') без сдвига)
+        if bucket_seconds % 86400 == 0:
+            period, since_bucket = 'day', since.strftime('%Y-%m-%d')
+        elif bucket_seconds % 3600 == 0:
+            period, since_bucket = 'hour', since.strftime('%Y-%m-%d %H:00')
+        else:
+            period = None
+
+        if period is not None:
+            cursor.execute('''
+                SELECT
+                    CAST(strftime('%s', bucket) AS INTEGER) / :size * :size AS start,
+                    SUM(count), SUM(tokens), SUM(response_time), MAX(response_time_max), SUM(cache_hits)
+                FROM analytics_rollup
+                WHERE period = :period AND bucket >= :since
+                GROUP BY start
+                ORDER BY start
+            ''', {'size': bucket_seconds, 'period': period, 'since': since_bucket})
+        else:
+            cursor.execute('''
+                SELECT
+                    CAST(strftime('%s', timestamp) AS INTEGER) / :size * :size AS start,
+                    SUM(CASE WHEN cache_hit THEN 0 ELSE 1 END),
+                    SUM(CASE WHEN cache_hit THEN 0 ELSE tokens_used END),
+                    SUM(CASE WHEN cache_hit THEN 0 ELSE response_time END),
+                    MAX(CASE WHEN cache_hit THEN 0 ELSE response_time END),
+                    SUM(CASE WHEN cache_hit THEN 1 ELSE 0 END)
+                FROM analytics_messages
+                WHERE timestamp >= :since
+                GROUP BY start
+                ORDER BY start
+            ''', {'size': bucket_seconds, 'since': str(since)})
+        return cursor.fetchall()
+
+    def get_analytics_totals(self):
+        """
+            Получение итогов аналитики по моделям из агрегатов.
+
+            Время выполнения зависит от числа дней и моделей,
+            а не от количества записей аналитики.
+
+            Returns:
+                list: Список кортежей (model, count, tokens, cache_hits, saved_tokens)
+        """
+        self.flush()  # Дожидаемся записи аналитики из очереди
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT model, SUM(count), SUM(tokens), SUM(cache_hits), SUM(saved_tokens)
+            FROM analytics_rollup
+            WHERE period = 'day'
+            GROUP BY model
+        ''')
+        return cursor.fetchall()
+
+    @staticmethod
+    def make_response_key(model: str, messages: list, params: dict = None) -> str:
+        """
+            Формирование ключа кэша ответов.
+
+            Текст сообщений нормализуется (обрезка краев и схлопывание пробелов),
+            чтобы запросы, отличающиеся только пробелами, давали один ключ.
+
+            Args:
+                model (str): Идентификатор модели
+                messages (list): Сообщения запроса в формате API
+                params (dict): Параметры генерации (temperature и т.п.)
+
+            Returns:
+                str: SHA-256 в шестнадцатеричном виде
+        """
+        normalized = [
+            {"role": m["role"], "content": " ".join(str(m["content"]).split())}
+            for m in messages
+        ]
+        payload = json.dumps(
+            {"model": model, "messages": normalized, "params": params or {}},
+            ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_cached_response(self, key: str):
+        """
+            Поиск ответа в кэше ответов.
+
+            Чтение выполняется сразу, а удаление просроченной записи и
+            обновление времени обращения ставятся в очередь фоновой записи,
+            чтобы ход чата не ждал commit.
+
+            Args:
+                key (str): Ключ, полученный из make_response_key
+
+            Returns:
+                tuple | None: (текст ответа, токены исходного ответа) или None,
+                    если записи нет или ее срок жизни истек
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        now = time.time()
+
+        cursor.execute(
+            'SELECT response, tokens_used, created_at FROM response_cache WHERE key = ?',
+            (key,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        response, tokens_used, created_at = row
+
+        # Просроченная запись удаляется
+        if now - created_at > self.response_cache_ttl:
+            self.writer.submit('DELETE FROM response_cache WHERE key = ?', (key,))
+            return None
+
+        # Обновление времени обращения для LRU
+        self.writer.submit('UPDATE response_cache SET last_access = ? WHERE key = ?', (now, key))
+        return response, tokens_used
+
+    def save_cached_response(self, key: str, model: str, response: str, tokens_used: int):
+        """
+            Сохранение ответа в кэш ответов с последующим вытеснением
+            просроченных и давно не используемых (LRU) записей.
+
+            Запись и вытеснение выполняются фоновой записью (одним пакетом
+            с сохранением сообщения), поэтому ход чата не ждет диска.
+
+            Args:
+                key (str): Ключ, полученный из make_response_key
+                model (str): Идентификатор модели
+                response (str): Текст ответа
+                tokens_used (int): Количество токенов, потраченных на ответ
+        """
+        now = time.time()
+
+        self.writer.submit('''
+            INSERT OR REPLACE INTO response_cache
+            (key, model, response, tokens_used, created_at, last_access, size)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (key, model, response, tokens_used, now, now, len(response.encode("utf-8"))))
+
+        # Удаление просроченных записей
+        self.writer.submit(
+            'DELETE FROM response_cache WHERE created_at < ?',
+            (now - self.response_cache_ttl,)
+        )
+
+        # Вытеснение самых давно используемых записей сверх лимитов: остаются самые
+        # свежие записи, пока их число и накопленный размер укладываются в лимиты
+        self.writer.submit('''
+            DELETE FROM response_cache WHERE key IN (
+                SELECT key FROM (
+                    SELECT
+                        key,
+                        ROW_NUMBER() OVER recent AS position,
+                        SUM(size) OVER recent AS running_size
+                    FROM response_cache
+                    WINDOW recent AS (ORDER BY last_access DESC, key)
+                )
+                WHERE position > ? OR running_size > ?
+            )
+        ''', (self.response_cache_max_entries, self.response_cache_max_bytes))
+
+    def clear_response_cache(self):
+        """
+            Очистка кэша ответов (через очередь фоновой записи, чтобы
+            ответы, еще ожидающие записи, не появились после очистки).
+        """
+        self.writer.submit('DELETE FROM response_cache')
+
+    def flush(self):
+        """
+            Ожидание записи в базу всех операций из очереди фоновой записи.
+        """
+        self.writer.flush()
+
+    def close(self):
+        """
+            Сброс очереди фоновой записи и остановка фонового потока.
+            Вызывается при завершении работы приложения.
+        """
+        self.writer.close()
+
     def __del__(self):
         """
         Деструктор класса.
@@ -198,10 +1144,9 @@ class ChatCache:
             Удаляет все записи из таблицы messages,
             эффективно очищая всю историю чата.
         """
-        conn = self.get_connection()  # Получение соединения
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM messages')  # Удаление всех записей
-        conn.commit()  # Сохранение изменений
+        # Удаление идет через очередь, чтобы не обогнать еще не записанные сообщения
+        self.writer.submit('DELETE FROM messages')  # Удаление всех записей
+        self.flush()  # Дожидаемся выполнения
 
     def get_formatted_history(self):
         """
@@ -218,6 +1163,7 @@ class ChatCache:
                         "tokens_used": int      # Использовано токенов
                     }
         """
+        self.flush()  # Дожидаемся записи сообщений из очереди
         conn = self.get_connection()  # Получение соединения
         cursor = conn.cursor()
         
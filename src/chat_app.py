@@ -2,16 +2,21 @@
 import flet as ft                             # Фреймворк для создания кроссплатформенных приложений с современным UI
 from openrouter import OpenRouterClient       # Клиент для взаимодействия с AI API через OpenRouter
 from styles import AppStyles                  # Модуль с настройками стилей интерфейса
-from components import MessageBubble, ModelSelector, NotificationSelector # Компоненты пользовательского интерфейса
+from components import MessageBubble, ModelSelector, NotificationSelector, SearchResult # Компоненты пользовательского интерфейса
 from cache import ChatCache                   # Модуль для кэширования истории чата
 from logger import AppLogger                  # Модуль для логирования работы приложения
 from analytics import Analytics               # Модуль для сбора и анализа статистики использования
 from monitor import PerformanceMonitor        # Модуль для мониторинга производительности
 from notifications import NotificationService # Модуль для отправки уведомлений
+from outbox import NotificationOutbox          # Очередь уведомлений с фоновой отправкой
+from context import ConversationContext       # Модуль для сборки контекста диалога
+from tracing import Trace, traced             # Трассировка этапов хода чата
+import metrics                                # Локальный endpoint метрик в формате Prometheus
+from log_reader import latest_log, read_tail  # Чтение лога с конца файла
 import asyncio                                # Библиотека для асинхронного программирования
 import time                                   # Библиотека для работы с временными метками
 import json                                   # Библиотека для работы с JSON-данными
-from datetime import datetime                 # Класс для работы с датой и временем
+from datetime import datetime, timedelta      # Классы для работы с датой и временем
 import os                                     # Библиотека для работы с операционной системой
 from pathlib import Path                      # Библиотека для работы с путями
 import asyncio                                # Библиотека для асинхронных запросов
@@ -23,6 +28,40 @@ class ChatApp:
         Управляет всей логикой работы приложения, включая UI и взаимодействие с API.
     """
 
+    # Минимальный интервал между перерисовками при потоковом получении ответа (в секундах)
+    STREAM_UPDATE_INTERVAL = 0.05
+
+    # Подгрузка истории в ленту чата страницами (курсор по id сообщения)
+    HISTORY_PAGE_SIZE = 20           # Количество пар сообщений в одной странице
+    HISTORY_MAX_BUBBLES = 200        # Максимум пузырьков в ленте одновременно
+    HISTORY_SCROLL_THRESHOLD = 300   # Расстояние до края ленты (в пикселях) для подгрузки страницы
+
+    # Периоды графика использования в окне аналитики: ключ -> (подпись, период, шаг)
+    ANALYTICS_WINDOWS = {
+        "hour": ("Час", timedelta(hours=1), timedelta(minutes=5)),
+        "day": ("День", timedelta(days=1), timedelta(hours=1)),
+        "month": ("30 дней", timedelta(days=30), timedelta(days=1)),
+    }
+
+    # Этапы хода чата (см. Trace) и их подписи в окне аналитики
+    TRACE_STAGES = {
+        "history": "Возврат к последним сообщениям",
+        "input": "Обработка ввода",
+        "context": "Контекст и кэш ответов",
+        "api": "Ожидание API",
+        "parse": "Разбор JSON",
+        "render": "Отрисовка",
+        "save": "Сохранение",
+        "notify": "Уведомление",
+        "analytics": "Аналитика",
+        "monitor": "Мониторинг",
+        "other": "Прочее",
+    }
+    TRACE_BREAKDOWN_TURNS = 100  # По скольким последним ходам считать разбивку по этапам
+
+    LOG_PAGE_LINES = 200  # Количество строк лога на страницу в окне логов
+    LOG_ERRORS_WINDOW = 3600  # Период фильтра "Ошибки за час" в окне логов (секунды)
+
     def __init__(self, api_key):
         """
             Инициализация основных компонентов приложения:
@@ -38,20 +77,34 @@ class ChatApp:
                 api_key: Переданный API ключ от OpenRouter.ai
         """
 
-        # Инициализация основных компонентов
-        self.api_client = OpenRouterClient(api_key=api_key)  # Создание клиента для работы с AI API
-        self.cache = ChatCache()  # Инициализация системы кэширования
-        self.logger = AppLogger()  # Инициализация системы логирования
-        self.analytics = Analytics(self.cache)  # Инициализация системы аналитики с передачей кэша
+        # Монитор создается первым, чтобы замерить все этапы запуска
         self.monitor = PerformanceMonitor()  # Инициализация системы мониторинга
-        self.notification_service = NotificationService()  # Инициализация системы отправки уведомлений
+
+        # Инициализация основных компонентов (без сетевых запросов и чтения истории -
+        # они выполняются параллельно в фоне после отрисовки интерфейса, см. run_startup)
+        with self.monitor.measure_stage("init"):
+            self.api_client = OpenRouterClient(api_key=api_key, preload_models=False)  # Создание клиента для работы с AI API
+            self.cache = ChatCache()  # Инициализация системы кэширования
+            self.logger = AppLogger()  # Инициализация системы логирования
+            self.analytics = Analytics(self.cache, preload=False)  # Инициализация системы аналитики с передачей кэша
+            self.notification_service = NotificationService()  # Инициализация системы отправки уведомлений
+            self.outbox = NotificationOutbox(self.cache, self.notification_service)  # Фоновая отправка уведомлений с повторами
+            self.context = ConversationContext()  # Скользящее окно предыдущих реплик для запросов к модели
+
+        # Состояние окна истории в ленте чата
+        self.history_oldest_id = None    # id самого старого сообщения в ленте (курсор для листания вверх)
+        self.history_newest_id = None    # id самого нового сообщения в ленте, если более новые выгружены
+        self.history_has_older = False   # Есть ли в базе более старые сообщения
+        self.history_loading = False     # Идет ли подгрузка страницы
+        self.turn_in_progress = False    # Идет ли отправка сообщения (низ ленты не выгружается)
+
+        self.metrics_server = None       # Локальный сервер метрик (если включен METRICS_PORT)
 
         # Создание компонента для отображения баланса API
         self.balance_text = ft.Text(
             "Баланс: Загрузка...",  # Начальный текст до загрузки реального баланса
             **AppStyles.BALANCE_TEXT  # Применение стилей из конфигурации
         )
-        self.update_balance()  # Первичное обновление баланса
 
         # Получаем путь для android
         storage_path = os.getenv("FLET_APP_STORAGE_DATA")
@@ -67,41 +120,227 @@ class ChatApp:
         self.exports_dir.mkdir(parents=True, exist_ok=True)
 
 
-    def load_chat_history(self):
+    async def _fetch_history_page(self, before_id: int = None, after_id: int = None) -> list:
+        """
+            Чтение страницы истории из базы в пуле потоков.
+
+            Args:
+                before_id (int): Вернуть сообщения старше этого id
+                after_id (int): Вернуть сообщения новее этого id
+
+            Returns:
+                list: Строки таблицы messages, новые сначала
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self.cache.get_chat_page(
+                before_id=before_id, after_id=after_id, limit=self.HISTORY_PAGE_SIZE
+            )
+        )
+
+    @staticmethod
+    def _history_bubbles(rows) -> list:
+        """
+            Создание пузырьков сообщений для страницы истории.
+
+            Args:
+                rows (list): Строки таблицы messages, новые сначала
+
+            Returns:
+                list: Пузырьки в хронологическом порядке (пользователь + AI для каждой строки)
+        """
+
+        bubbles = []
+        for row_id, model, user_message, ai_response, timestamp, tokens in reversed(rows):
+            bubbles.extend([
+                MessageBubble(message=user_message, is_user=True, row_id=row_id),   # Сообщение пользователя
+                MessageBubble(message=ai_response, is_user=False, row_id=row_id)    # Ответ AI
+            ])
+        return bubbles
+
+    def _update_history_keep_position(self, page: ft.Page, anchor: ft.Control):
         """
-            Загрузка истории чата из кэша и отображение её в интерфейсе.
-            Сообщения добавляются в обратном порядке для правильной хронологии.
+            Перерисовка ленты после подгрузки страницы с сохранением видимой позиции.
+
+            Автопрокрутка на время обновления отключается, а лента
+            прокручивается обратно к сообщению, которое было видно до подгрузки.
+
+            Args:
+                page (ft.Page): Объект страницы Flet для обновления интерфейса
+                anchor (ft.Control): Сообщение, к которому нужно вернуть прокрутку
+        """
+
+        auto_scroll = self.chat_history.auto_scroll
+        self.chat_history.auto_scroll = False
+        page.update()
+        if anchor is not None and anchor.key:
+            self.chat_history.scroll_to(key=anchor.key, duration=0)
+        self.chat_history.auto_scroll = auto_scroll
+
+    async def load_chat_history(self, page: ft.Page):
+        """
+            Загрузка последней страницы истории чата из кэша и отображение её в интерфейсе.
+            Чтение из базы выполняется в пуле потоков, чтобы не блокировать интерфейс.
+            Более старые страницы подгружаются при прокрутке ленты вверх (см. load_older_history).
+
+            Args:
+                page (ft.Page): Объект страницы Flet для обновления интерфейса
         """
 
         try:
-            history = self.cache.get_chat_history()  # Получение истории из кэша
-            for msg in reversed(history):  # Перебор сообщений в обратном порядке
-                # Распаковка данных сообщения в отдельные переменные
-                _, model, user_message, ai_response, timestamp, tokens = msg
-                # Добавление пары сообщений (пользователь + AI) в интерфейс
-                self.chat_history.controls.extend([
-                    MessageBubble(  # Создание пузырька сообщения пользователя
-                        message=user_message,
-                        is_user=True
-                    ),
-                    MessageBubble(  # Создание пузырька ответа AI
-                        message=ai_response,
-                        is_user=False
-                    )
-                ])
+            history = await self._fetch_history_page()  # Получение последней страницы из кэша
+
+            # Заполнение контекста диалога теми же строками (без повторного чтения базы)
+            self.context.seed(history)
+
+            self.history_oldest_id = history[-1][0] if history else None
+            self.history_newest_id = None
+            self.history_has_older = len(history) == self.HISTORY_PAGE_SIZE
+
+            # История вставляется перед сообщениями, отправленными во время загрузки
+            self.chat_history.controls[0:0] = self._history_bubbles(history)
+            page.update()
         except Exception as e:
             # Логирование ошибки при загрузке истории
             self.logger.error(f"Ошибка загрузки истории чата: {e}")
 
-    def update_balance(self):
+    async def load_older_history(self, page: ft.Page):
+        """
+            Подгрузка предыдущей (более старой) страницы истории в начало ленты.
+
+            Если лента превышает HISTORY_MAX_BUBBLES, самые новые сообщения
+            выгружаются из нее и подгружаются обратно при прокрутке вниз.
+
+            Args:
+                page (ft.Page): Объект страницы Flet для обновления интерфейса
+        """
+
+        if self.history_loading or not self.history_has_older:
+            return
+
+        self.history_loading = True
+        try:
+            rows = await self._fetch_history_page(before_id=self.history_oldest_id)
+            self.history_has_older = len(rows) == self.HISTORY_PAGE_SIZE
+            if not rows:
+                return
+
+            controls = self.chat_history.controls
+            anchor = controls[0] if controls else None
+            controls[0:0] = self._history_bubbles(rows)
+            self.history_oldest_id = rows[-1][0]
+
+            # Выгрузка самых новых сообщений (кроме отправляемого прямо сейчас)
+            excess = len(controls) - self.HISTORY_MAX_BUBBLES
+            if excess > 0 and not self.turn_in_progress:
+                excess += excess % 2  # Сообщения выгружаются парами
+                del controls[-excess:]
+                self.history_newest_id = next(
+                    (c.data for c in reversed(controls) if isinstance(c, MessageBubble) and c.data is not None),
+                    None
+                )
+
+            self._update_history_keep_position(page, anchor)
+        except Exception as e:
+            self.logger.error(f"Ошибка подгрузки истории чата: {e}")
+        finally:
+            self.history_loading = False
+
+    async def load_newer_history(self, page: ft.Page):
+        """
+            Подгрузка следующей (более новой) страницы истории в конец ленты,
+            если она была выгружена при листании вверх.
+
+            Args:
+                page (ft.Page): Объект страницы Flet для обновления интерфейса
+        """
+
+        if self.history_loading or self.history_newest_id is None:
+            return
+
+        self.history_loading = True
+        try:
+            rows = await self._fetch_history_page(after_id=self.history_newest_id)
+            if len(rows) < self.HISTORY_PAGE_SIZE:
+                self.history_newest_id = None  # Дошли до конца истории
+            if not rows:
+                return
+            if self.history_newest_id is not None:
+                self.history_newest_id = rows[0][0]
+
+            controls = self.chat_history.controls
+            anchor = controls[-1] if controls else None
+            controls.extend(self._history_bubbles(rows))
+
+            # Выгрузка самых старых сообщений
+            excess = len(controls) - self.HISTORY_MAX_BUBBLES
+            if excess > 0:
+                excess += excess % 2  # Сообщения выгружаются парами
+                del controls[:excess]
+                # Пузырьки, отправленные в этой сессии, не имеют id - курсор по первому сохраненному
+                self.history_oldest_id = next(
+                    (c.data for c in controls if isinstance(c, MessageBubble) and c.data is not None),
+                    rows[-1][0]
+                )
+                self.history_has_older = True
+
+            self._update_history_keep_position(page, anchor)
+        except Exception as e:
+            self.logger.error(f"Ошибка подгрузки истории чата: {e}")
+        finally:
+            self.history_loading = False
+
+    async def reset_history_window(self, page: ft.Page):
+        """
+            Возврат ленты к последней странице истории
+            (перед отправкой сообщения, если новые сообщения были выгружены).
+
+            Args:
+                page (ft.Page): Объект страницы Flet для обновления интерфейса
+        """
+
+        rows = await self._fetch_history_page()
+        self.history_oldest_id = rows[-1][0] if rows else None
+        self.history_newest_id = None
+        self.history_has_older = len(rows) == self.HISTORY_PAGE_SIZE
+        self.chat_history.controls[:] = self._history_bubbles(rows)
+        page.update()
+
+    async def jump_to_message(self, page: ft.Page, row_id: int):
+        """
+            Показ в ленте страницы истории, заканчивающейся указанным сообщением
+            (переход из результатов поиска). Более новые сообщения
+            подгружаются при прокрутке вниз.
+
+            Args:
+                page (ft.Page): Объект страницы Flet для обновления интерфейса
+                row_id (int): ID сообщения в таблице messages
+        """
+
+        rows = await self._fetch_history_page(before_id=row_id + 1)
+        if not rows:
+            return
+        self.history_oldest_id = rows[-1][0]
+        self.history_newest_id = rows[0][0]
+        self.history_has_older = len(rows) == self.HISTORY_PAGE_SIZE
+
+        self.chat_history.controls[:] = self._history_bubbles(rows)
+        self._update_history_keep_position(page, self.chat_history.controls[-2])
+
+    async def update_balance(self, page: ft.Page):
         """
             Обновление отображения баланса API в интерфейсе.
             При успешном получении баланса показывает его зеленым цветом,
             при ошибке - красным с текстом 'н/д' (не доступен).
+
+            Args:
+                page (ft.Page): Объект страницы Flet для обновления интерфейса
         """
 
         try:
-            balance = self.api_client.get_balance()  # Запрос баланса через API
+            balance = await self.api_client.get_balance_async()  # Запрос баланса через API
             self.balance_text.value = f"Баланс: {balance}"  # Обновление текста с балансом
             self.balance_text.color = ft.Colors.GREEN_400  # Установка зеленого цвета для успешного получения
         except Exception as e:
@@ -109,6 +348,243 @@ class ChatApp:
             self.balance_text.value = "Баланс: н/д"  # Установка текста ошибки
             self.balance_text.color = ft.Colors.RED_400  # Установка красного цвета для ошибки
             self.logger.error(f"Ошибка обновления баланса: {e}")
+        page.update()
+
+    async def load_settings(self, page: ft.Page):
+        """
+            Загрузка сохраненных настроек почты из памяти устройства.
+
+            Args:
+                page (ft.Page): Объект страницы Flet для обновления интерфейса
+        """
+
+        # Пытаемся достать данные из памяти телефона для авторизации в почте
+        try:
+            self.settings_login_field.value = await page.client_storage.get_async("email_login") or "" # Получаем логин для почты
+            self.settings_pass_field.value = await page.client_storage.get_async("email_pass") or ""   # Получаем пароль для IMAP
+            self.response_cache_switch.value = bool(await page.client_storage.get_async("response_cache"))  # Кэш ответов (по умолчанию выключен)
+            self.telegram_token_input.value = await page.client_storage.get_async("telegram_token") or ""  # Токен telegram-бота
+        except Exception as e:
+            # Если возникла непредвиденная ошибка
+            self.logger.error(f"Ошибка загрузки настроек: {e}") # Логируем ошибку
+
+    async def _replay_cached_response(self, response_text: str):
+        """
+            Выдача ответа из кэша в формате событий потока stream_message.
+
+            Args:
+                response_text (str): Текст ответа из кэша
+
+            Yields:
+                dict: Единственное событие {"delta": response_text}
+        """
+        yield {"delta": response_text}
+
+    @staticmethod
+    def _build_usage_chart(series: list, window: str) -> ft.BarChart:
+        """
+            Столбчатый график количества сообщений по интервалам.
+            Подсказка столбца показывает токены и время ответа.
+
+            Args:
+                series (list): Результат Analytics.query_series
+                window (str): Ключ периода из ANALYTICS_WINDOWS (для формата подписей)
+
+            Returns:
+                ft.BarChart: График использования
+        """
+        label_format = "%d.%m" if window == "month" else "%H:%M"
+        label_step = max(1, len(series) // 6)  # Не более ~6 подписей по оси X
+
+        return ft.BarChart(
+            bar_groups=[
+                ft.BarChartGroup(
+                    x=i,
+                    bar_rods=[
+                        ft.BarChartRod(
+                            from_y=0,
+                            to_y=point['messages'],
+                            width=max(2, 300 // max(1, len(series))),
+                            color=ft.Colors.BLUE_400,
+                            tooltip=(
+                                f"{point['start'].strftime(label_format)}: {point['messages']} сообщ.\n"
+                                f"{point['tokens']} ток., {point['avg_response_time']:.2f} с"
+                            ),
+                            border_radius=0,
+                        )
+                    ],
+                )
+                for i, point in enumerate(series)
+            ],
+            bottom_axis=ft.ChartAxis(
+                labels=[
+                    ft.ChartAxisLabel(value=i, label=ft.Text(point['start'].strftime(label_format), size=10))
+                    for i, point in enumerate(series) if i % label_step == 0
+                ],
+                labels_size=20,
+            ),
+            left_axis=ft.ChartAxis(labels_size=30),
+            max_y=max([point['messages'] for point in series] + [1]),
+            interactive=True,
+            **AppStyles.USAGE_CHART
+        )
+
+    async def load_usage_chart(self, window: str) -> ft.BarChart:
+        """
+            Запрос временного ряда в пуле потоков и построение графика.
+
+            Args:
+                window (str): Ключ периода из ANALYTICS_WINDOWS
+        """
+        _, period, step = self.ANALYTICS_WINDOWS[window]
+        loop = asyncio.get_running_loop()
+        series = await loop.run_in_executor(None, self.analytics.query_series, period, step)
+        return self._build_usage_chart(series, window)
+
+    async def load_analytics(self):
+        """
+            Прогрев аналитики: загрузка исторических данных в пуле потоков.
+        """
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.analytics.load_history)
+
+    async def run_startup(self, page: ft.Page):
+        """
+            Фоновые этапы запуска приложения.
+
+            Выполняются параллельно уже после отрисовки интерфейса и
+            заполняют свои виджеты по мере готовности:
+                - models: каталог моделей (сеть, если кэш устарел или отсутствует)
+                - balance: баланс аккаунта (сеть)
+                - history: история чата (база данных)
+                - analytics: исторические данные аналитики (база данных)
+                - settings: настройки почты из памяти устройства
+
+            Длительность каждого этапа записывается в монитор и логируется.
+
+            Args:
+                page (ft.Page): Объект страницы Flet для обновления интерфейса
+        """
+
+        stages = {
+            "balance": self.update_balance(page),
+            "history": self.load_chat_history(page),
+            "analytics": self.load_analytics(),
+            "settings": self.load_settings(page),
+        }
+
+        # Каталог моделей обновляется только если кэш устарел или отсутствует
+        if self.api_client.models_need_refresh:
+            stages["models"] = self.refresh_models(page)
+
+        results = await asyncio.gather(*(
+            self.monitor.run_stage(name, coro) for name, coro in stages.items()
+        ))
+
+        # Логирование ошибок этапов
+        for name, result in zip(stages, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Ошибка этапа запуска '{name}': {result}")
+
+        self.monitor.log_startup(self.logger)
+
+    async def refresh_models(self, page: ft.Page):
+        """
+            Фоновое обновление каталога моделей и выпадающего списка.
+
+            Args:
+                page (ft.Page): Объект страницы Flet для обновления интерфейса
+        """
+
+        try:
+            models = await self.api_client.refresh_models()  # Условный запрос каталога
+            self.model_dropdown.set_models(models)           # Обновление списка моделей
+            page.update()
+        except Exception as e:
+            self.logger.error(f"Ошибка обновления каталога моделей: {e}")
+
+    async def notification_credentials(self, page: ft.Page, channel: str) -> dict:
+        """
+            Данные для входа в канал уведомлений из текущих настроек.
+            Запрашиваются очередью уведомлений в момент отправки.
+
+            Args:
+                page (ft.Page): Страница приложения (хранилище настроек)
+                channel (str): Канал уведомления
+
+            Returns:
+                dict: Аргументы token, email_login, email_pass для NotificationService
+        """
+        if channel == "email":
+            # Текущий логин и пароль для авторизации на SMTP-сервере
+            return {
+                'email_login': await page.client_storage.get_async("email_login"),
+                'email_pass': await page.client_storage.get_async("email_pass"),
+            }
+        # Токен telegram-бота: из поля, а до загрузки настроек - из памяти устройства
+        return {'token': self.telegram_token_input.value or await page.client_storage.get_async("telegram_token")}
+
+    def start_metrics_server(self):
+        """
+            Запуск локального endpoint метрик Prometheus (http://127.0.0.1:<порт>/metrics).
+
+            Включается переменной окружения METRICS_PORT, по умолчанию выключен.
+        """
+        port = os.getenv("METRICS_PORT")
+        if not port or self.metrics_server is not None:
+            return
+
+        registry = metrics.MetricsRegistry()
+        registry.register(metrics.analytics_collector(self.analytics))
+        registry.register(metrics.monitor_collector(self.monitor))
+        registry.register(metrics.writer_collector(self.cache.writer))
+        registry.register(metrics.notifications_collector(self.notification_service, self.outbox))
+
+        try:
+            server = metrics.MetricsServer(registry, int(port))
+            server.start()
+        except (ValueError, OSError) as e:
+            self.logger.error(f"Не удалось запустить сервер метрик на порту {port}: {e}")
+            return
+
+        self.metrics_server = server
+        self.logger.info(f"Метрики доступны на http://{server.host}:{server.port}/metrics")
+
+    async def shutdown(self, e=None):
+        """
+            Корректное завершение работы приложения.
+            Закрывает сетевые сессии клиента API (пул соединений) и
+            дожидается записи в базу всех данных из очереди.
+
+            Args:
+                e: Событие закрытия страницы (не используется)
+        """
+
+        self.logger.info("Завершение работы приложения")
+        self.monitor.stop_sampler()  # Остановка фоновых замеров производительности
+        self.monitor.stop_loop_watch()  # Остановка замеров задержки цикла событий
+        if self.metrics_server is not None:
+            self.metrics_server.stop()  # Остановка сервера метрик
+            self.metrics_server = None
+        await self.outbox.stop()  # Остановка отправки уведомлений (неотправленные остаются в базе)
+        await self.notification_service.close()  # Закрытие соединений каналов уведомлений
+        await self.api_client.close()  # Закрытие пула соединений с API
+
+        # Сброс очереди фоновой записи в базу (в пуле потоков, чтобы не блокировать цикл событий)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.cache.close)
+
+    async def on_disconnect(self, e=None):
+        """
+            Сброс очереди фоновой записи в базу при отключении сессии,
+            чтобы данные не потерялись, если приложение будет выгружено системой.
+
+            Args:
+                e: Событие отключения страницы (не используется)
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.cache.flush)
 
     async def main(self, page: ft.Page):
         """
@@ -125,33 +601,43 @@ class ChatApp:
 
         AppStyles.set_window_size(page)  # Установка размеров окна приложения
 
+        # Освобождение ресурсов при закрытии сессии. При отключении (сворачивание
+        # на телефоне, обрыв связи) сессия может переподключиться, поэтому фоновые
+        # задачи продолжают работать, а в базу лишь сбрасывается очередь записи
+        page.on_close = self.shutdown
+        page.on_disconnect = self.on_disconnect
+
+        # Замер длительности page.update() и блокирующих шагов обработчиков событий
+        self.monitor.instrument_page(page, self.logger)
+
+        # Замер отрисовки "каркаса" интерфейса (завершается после page.add)
+        shell_start = time.perf_counter()
+
         # Инициализация выпадающего списка для выбора модели AI
-        models = self.api_client.available_models
+        # (из дискового кэша каталога; при холодном старте список заполнится в фоне)
+        models = self.api_client.catalog.models or []
+        self.api_client.available_models = models
         self.model_dropdown = ModelSelector(models)
-        self.model_dropdown.value = models[0] if models else None
+        self.model_dropdown.value = models[0]['id'] if models else None
 
-        await asyncio.sleep(0.2) # Прогрузка интерфейса
+        async def on_telegram_token_blur(e):
+            """
+                Функция сохранения токена telegram-бота в память устройства,
+                чтобы уведомления из очереди отправлялись и после перезапуска.
+            """
 
-        # Пытаемся достать данные из памяти телефона для авторизации в почте
-        try:
-            saved_email_login = await page.client_storage.get_async("email_login") or "" # Получаем логин для почты
-            saved_email_pass = await page.client_storage.get_async("email_pass") or ""   # Получаем пароль для IMAP
-        except Exception as e:
-            # Если возникла непредвиденная ошибка
-            self.logger.error(f"Ошибка загрузки настроек: {e}") # Логируем ошибку
-            saved_email_login = "" # Выставляем пустое значение
-            saved_email_pass = ""  # Выставляем пустое значение
+            await page.client_storage.set_async("telegram_token", self.telegram_token_input.value or "")
 
         # Инициализация поля для ввода токена telegram-бота
         self.telegram_token_input = ft.TextField(
-            visible=False,              # Скрываем поле по умолчанию
-            **AppStyles.TELEGRAM_INPUT  # Применяем стили
+            visible=False,                   # Скрываем поле по умолчанию
+            on_blur=on_telegram_token_blur,  # Сохранение токена при выходе из поля
+            **AppStyles.TELEGRAM_INPUT       # Применяем стили
         )
 
         # Создание поля для ввода логина почты
         self.settings_login_field = ft.TextField(
             label="Yandex Login (без @yandex.ru)",  # Подпись поля
-            value=saved_email_login,                # Значение поля
             **AppStyles.SETTINGS_INPUT_FIELD        # Применяем стиль
         )
 
@@ -159,12 +645,26 @@ class ChatApp:
         self.settings_pass_field = ft.TextField(
             label="Пароль приложения",  # Подпись поля
             password=True,              # Устанавливаем тип поля, как пароль, чтобы спрятать вводимый пароль
-            value=saved_email_pass,     # Значение поля
             can_reveal_password=True,   # Можно посмотреть вводимый пароль
             **AppStyles.SETTINGS_INPUT_FIELD  # Применяем стиль
         )
 
 
+        async def on_response_cache_change(e):
+            """
+                Функция сохранения настройки кэша ответов.
+            """
+
+            await page.client_storage.set_async("response_cache", self.response_cache_switch.value)
+            self.logger.info(f"Кэш ответов {'включен' if self.response_cache_switch.value else 'выключен'}")
+
+        # Переключатель кэша ответов на одинаковые запросы (по умолчанию выключен)
+        self.response_cache_switch = ft.Switch(
+            value=False,                           # Кэш выключен, пока не загружены настройки
+            on_change=on_response_cache_change,    # Сохранение выбора пользователя
+            **AppStyles.RESPONSE_CACHE_SWITCH      # Применяем стиль
+        )
+
         def open_settings(e):
             """
                 Функция для открытия окна настроек.
@@ -258,38 +758,92 @@ class ChatApp:
             elif self.notification_dropdown.value == "email":
                 self.telegram_token_input.visible = False  # Прячем поле для ввода токена
 
-        def show_logs_click(e):
+        async def show_logs_click(e):
             """
-                Функция для открытия диалогового окна с содержимым последнего лог-файла.
+                Функция для открытия диалогового окна с последними строками текущего лог-файла.
+                Файл читается с конца блоками в пуле потоков, кнопка "Раньше"
+                подгружает предыдущие строки. Переключатель "Ошибки за час"
+                показывает ошибки из структурированного лога (поиск по индексу).
             """
-            log_content = "Логи не найдены."
-
-            try:
-                # Задаем путь к папке logs
-                logs_dir = "logs"
-
-                # Если папка существует
-                if os.path.exists(logs_dir):
-                    # Получаем список всех файлов в папке
-                    files = [os.path.join(logs_dir, f) for f in os.listdir(logs_dir) if f.endswith('.log')]
-
-                    if files:
-                        # Находим последний файл по дате изменения
-                        latest_file = max(files, key=os.path.getctime)
-
-                        # Читаем содержимое (последние 100 строк, чтобы не зависло)
-                        with open(latest_file, 'r', encoding='utf-8') as f:
-                            lines = f.readlines() # Читаем содержимое
-                            # Берем последние 200 строк
-                            log_content = "".join(lines[-200:])
+            loop = asyncio.get_running_loop()
+            log_file = None     # Просматриваемый файл
+            log_lines = []      # Показанные строки
+            log_start = None    # Позиция первой показанной строки в файле (0 - начало файла)
+            show_errors = False  # Показаны ошибки за час вместо строк файла
+            error_lines = []    # Найденные ошибки
+
+            def read_page(path, end):
+                """
+                    Чтение страницы строк перед позицией end (в пуле потоков).
+                """
+                if path is None:
+                    self.logger.flush(timeout=1)  # Дожидаемся записи очереди логов
+                    path = latest_log(self.logger.logs_dir)
+                if path is None:
+                    return None, [], 0
+                lines, start = read_tail(path, self.LOG_PAGE_LINES, end)
+                return path, lines, start
+
+            def read_errors():
+                """
+                    Ошибки за последний час из структурированного лога (в пуле потоков).
+                """
+                entries = self.logger.query("ERROR", since=time.time() - self.LOG_ERRORS_WINDOW)
+                return [f"{entry['time']} - {entry['level']} - {entry['message']}" for entry in entries]
 
-                        # Добавляем заголовок с именем файла
-                        log_content = f"--- Файл: {latest_file} ---\n\n{log_content}"
+            def render_logs() -> str:
+                """
+                    Текст окна логов.
+                """
+                if show_errors:
+                    return "\n".join(error_lines) if error_lines else "Ошибок за последний час нет."
+                if log_file is None:
+                    return "Логи не найдены."
+                return f"--- Файл: {log_file} ---\n\n" + "\n".join(log_lines)
 
+            try:
+                log_file, log_lines, log_start = await loop.run_in_executor(None, read_page, None, None)
+                log_content = render_logs()
             except Exception as err:
                 # Если возникло исключение
                 log_content = f"Ошибка чтения логов: {err}"
+            log_text = ft.Text(log_content, **AppStyles.LOG_TEXT_STYLE)
 
+            async def load_older_logs(e):
+                """
+                    Подгрузка предыдущей страницы строк лога.
+                """
+                nonlocal log_lines, log_start
+
+                try:
+                    _, lines, log_start = await loop.run_in_executor(None, read_page, log_file, log_start)
+                except Exception as err:
+                    self.logger.error(f"Ошибка чтения логов: {err}")
+                    return
+                log_lines = lines + log_lines
+                log_text.value = render_logs()
+                older_button.disabled = not log_start
+                page.update()
+
+            older_button = ft.TextButton("Раньше", on_click=load_older_logs, disabled=not log_start)
+
+            async def toggle_errors(e):
+                """
+                    Переключение между последними строками лога и ошибками за час.
+                """
+                nonlocal show_errors, error_lines
+
+                show_errors = errors_switch.value
+                if show_errors:
+                    try:
+                        error_lines = await loop.run_in_executor(None, read_errors)
+                    except Exception as err:
+                        error_lines = [f"Ошибка поиска в логах: {err}"]
+                log_text.value = render_logs()
+                older_button.disabled = show_errors or not log_start
+                page.update()
+
+            errors_switch = ft.Switch(label="Ошибки за час", value=False, on_change=toggle_errors)
 
             def close_logs(e):
                 """
@@ -304,7 +858,7 @@ class ChatApp:
                     Функция копирования логов в буфер обмена.
                 """
 
-                page.set_clipboard(log_content)
+                page.set_clipboard(log_text.value)
                 page.snack_bar = ft.SnackBar(ft.Text("Логи скопированы!"))
                 page.snack_bar.open = True
                 page.update()
@@ -314,14 +868,14 @@ class ChatApp:
                 title=ft.Text("Системные логи", **AppStyles.DIALOG_TITLE),
                 content=ft.Container(
                     content=ft.Column(
-                        [
-                            ft.Text(log_content, **AppStyles.LOG_TEXT_STYLE)
-                        ],
+                        [log_text],
                         scroll=ft.ScrollMode.AUTO,   # Включаем прокрутку
                     ),
                     **AppStyles.LOG_DIALOG_CONTAINER # Применяем стили
                 ),
                 actions=[
+                    errors_switch,
+                    older_button,
                     ft.TextButton("Копировать", on_click=copy_logs),
                     ft.TextButton("Закрыть", on_click=close_logs),
                 ],
@@ -337,105 +891,180 @@ class ChatApp:
             if not self.message_input.value:
                 return
 
-            try:
-                # Визуальная индикация процесса
-                self.message_input.border_color = ft.Colors.BLUE_400
-                page.update()
-
-                # Сохранение данных сообщения
-                start_time = time.time()
-                user_message = self.message_input.value
-                self.message_input.value = ""
-                page.update()
+            # Трассировка хода по этапам (сохраняется в кэш, разбивка - в окне аналитики)
+            trace = Trace("chat_turn")
 
-                # Добавление сообщения пользователя
-                self.chat_history.controls.append(
-                    MessageBubble(message=user_message, is_user=True)
-                )
+            try:
+                self.turn_in_progress = True
+
+                # Возврат к последним сообщениям, если они были выгружены при листании вверх
+                if self.history_newest_id is not None:
+                    with trace.span("history"):
+                        await self.reset_history_window(page)
+
+                with trace.span("input"):
+                    # Визуальная индикация процесса
+                    self.message_input.border_color = ft.Colors.BLUE_400
+                    page.update()
+
+                    # Сохранение данных сообщения
+                    start_time = time.time()
+                    user_message = self.message_input.value
+                    self.message_input.value = ""
+                    page.update()
+
+                    # Добавление сообщения пользователя
+                    self.chat_history.controls.append(
+                        MessageBubble(message=user_message, is_user=True)
+                    )
 
-                # Индикатор загрузки
-                loading = ft.ProgressRing()
-                self.chat_history.controls.append(loading)
-                page.update()
+                    # Индикатор загрузки
+                    loading = ft.ProgressRing()
+                    self.chat_history.controls.append(loading)
+                    page.update()
+
+                # Пузырек ответа AI, который растет по мере поступления фрагментов
+                ai_bubble = MessageBubble(message="", is_user=False)
+                response_text = ""   # Накопленный текст ответа
+                tokens_used = 0      # Использованное количество токенов
+                completion_tokens = None  # Количество токенов ответа
+                ttft = None          # Время до первого фрагмента ответа
+                error = None         # Ошибка API, если возникла
+                last_update = 0.0    # Время последней перерисовки пузырька
+
+                with trace.span("context"):
+                    # Предыдущие реплики, обрезанные под бюджет токенов выбранной модели
+                    model = self.model_dropdown.value
+                    history = self.context.build(self.api_client.get_context_length(model), user_message)
+
+                    # Поиск ответа в кэше ответов (если пользователь его включил)
+                    cache_key = None
+                    cached = None
+                    if self.response_cache_switch.value:
+                        cache_key = self.cache.make_response_key(
+                            model, history + [{"role": "user", "content": user_message}]
+                        )
+                        cached = self.cache.get_cached_response(cache_key)
 
-                # Асинхронная отправка запроса
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
-                    lambda: self.api_client.send_message(
-                        user_message,
-                        self.model_dropdown.value
-                    )
-                )
+                if cached is not None:
+                    # Ответ из кэша: запрос к API не выполняется
+                    self.logger.info(f"Ответ взят из кэша ответов для модели {model}")
+                    events = self._replay_cached_response(cached[0])
+                else:
+                    # Потоковое получение ответа от API (разбор фрагментов - этап "parse")
+                    events = self.api_client.stream_message(user_message, model, history=history, trace=trace)
+
+                # Ожидание фрагментов - этап "api", отрисовка - этап "render"
+                async for event in traced(events, trace, "api"):
+                    if "error" in event:
+                        error = event["error"]
+                        break
+
+                    if "usage" in event:
+                        # Получаем использованное количество токенов
+                        tokens_used = event["usage"].get("total_tokens", 0)
+                        completion_tokens = event["usage"].get("completion_tokens")
+                        continue
+
+                    with trace.span("render"):
+                        delta = event["delta"]
+
+                        # Удаление пробела, если он идет первым
+                        if not response_text and delta.startswith(" "):
+                            delta = delta[1:]
+
+                        # Первый фрагмент: заменяем индикатор загрузки пузырьком ответа
+                        if ttft is None:
+                            ttft = time.time() - start_time
+                        if loading in self.chat_history.controls:
+                            self.chat_history.controls.remove(loading)
+                            self.chat_history.controls.append(ai_bubble)
+
+                        response_text += delta
+                        ai_bubble.append_text(delta)
+
+                        # Перерисовка не чаще, чем раз в STREAM_UPDATE_INTERVAL секунд,
+                        # чтобы не забивать канал обновлений интерфейса
+                        now = time.monotonic()
+                        if now - last_update >= self.STREAM_UPDATE_INTERVAL:
+                            last_update = now
+                            page.update()
+
+                # Время ответа модели (без отправки уведомлений и сохранения)
+                response_time = time.time() - start_time
 
-                # Удаление индикатора загрузки
-                self.chat_history.controls.remove(loading)
+                # Удаление индикатора загрузки (если ответ оказался пустым или пришла ошибка)
+                if loading in self.chat_history.controls:
+                    self.chat_history.controls.remove(loading)
+                    self.chat_history.controls.append(ai_bubble)
 
                 # Обработка ответа
-                if "error" in response:
+                if error is not None:
                     # Если возникла ошибка запоминаем ее
-                    response_text = f"Ошибка: {response['error']}"
+                    response_text = f"Ошибка: {error}"
+                    ai_bubble.set_text(response_text)
 
                     # Сбрасываем использованные токены
                     tokens_used = 0
 
                     # Логируем ошибку
-                    self.logger.error(f"Ошибка API: {response['error']}")
+                    self.logger.error(f"Ошибка API: {error}")
                 else:
-                    # Получение ответа
-                    response_text = response["choices"][0]["message"]["content"]
+                    # Отображаем полный ответ
+                    with trace.span("render"):
+                        page.update()
 
-                    # Удаление пробела, если он идет первым
-                    if response_text.startswith(" "):
-                        response_text = response_text[1:]
+                    with trace.span("save"):
+                        # Добавление реплики в контекст диалога
+                        self.context.add_turn(user_message, response_text)
 
-                    # Получаем использованное количество токенов
-                    tokens_used = response.get("usage", {}).get("total_tokens", 0)
+                        # Сохранение нового ответа в кэш ответов
+                        if cache_key is not None and cached is None:
+                            self.cache.save_cached_response(cache_key, model, response_text, tokens_used)
 
                     if self.notification_dropdown and self.notification_target.value:
-
-                        # Получаем текущий логин и пароль для авторизации на SMTP-сервере
-                        current_login = await page.client_storage.get_async("email_login")
-                        current_pass = await page.client_storage.get_async("email_pass")
-
-                        # Получаем telegram токен
-                        tg_token = self.telegram_token_input.value
-
-                        # Отправка уведомления по выбранному каналу
-                        await self.notification_service.send_notification(
-                            channel=self.notification_dropdown.value,  # Канал для отправки уведомления
-                            recipient=self.notification_target.value,  # Получатель
-                            message=response_text,                     # Текст для отправки
-                            token=tg_token,                            # Телеграм токен для отправки через telegram-бота
-                            email_login=current_login,                 # Логин для авторизации в почте
-                            email_pass=current_pass                    # Пароль для авторизации в почте
-                        )
+                        with trace.span("notify"):
+                            # Постановка уведомления в очередь: отправка идет в фоне
+                            # и не задерживает ход чата (см. NotificationOutbox)
+                            self.outbox.enqueue(
+                                channel=self.notification_dropdown.value,  # Канал для отправки уведомления
+                                recipient=self.notification_target.value,  # Получатель
+                                message=response_text                      # Текст для отправки
+                            )
 
                 # Сохранение в кэш
-                self.cache.save_message(
-                    model=self.model_dropdown.value,
-                    user_message=user_message,
-                    ai_response=response_text,
-                    tokens_used=tokens_used
-                )
-
-                # Добавление ответа в чат
-                self.chat_history.controls.append(
-                    MessageBubble(message=response_text, is_user=False)
-                )
+                with trace.span("save"):
+                    self.cache.save_message(
+                        model=model,
+                        user_message=user_message,
+                        ai_response=response_text,
+                        tokens_used=tokens_used
+                    )
 
                 # Обновление аналитики
-                response_time = time.time() - start_time
-                self.analytics.track_message(
-                    model=self.model_dropdown.value,
-                    message_length=len(user_message),
-                    response_time=response_time,
-                    tokens_used=tokens_used
-                )
+                with trace.span("analytics"):
+                    self.analytics.track_message(
+                        model=model,
+                        message_length=len(user_message),
+                        response_time=response_time,
+                        tokens_used=tokens_used,
+                        cache_hit=cached is not None,                     # Ответ из кэша ответов
+                        saved_tokens=cached[1] if cached is not None else 0,  # Сэкономленные токены
+                        ttft=ttft if error is None else None,               # Время до первого токена
+                        completion_tokens=completion_tokens if error is None else None,  # Токены ответа
+                        failed=error is not None                            # Ошибка API - без гистограмм задержек
+                    )
 
                 # Логирование метрик
-                self.monitor.log_metrics(self.logger)
-                page.update()
+                with trace.span("monitor"):
+                    self.monitor.log_metrics(self.logger)
+                with trace.span("render"):
+                    page.update()
+
+                # Сохранение этапов хода
+                trace.finish()
+                self.cache.save_trace(trace, model)
+                self.logger.debug(f"Этапы хода: {trace.format()}")
 
             except Exception as e:
                 self.logger.error(f"Ошибка отправки сообщения: {e}")
@@ -454,6 +1083,61 @@ class ChatApp:
                 page.overlay.append(snack)
                 snack.open = True
                 page.update()
+            finally:
+                self.turn_in_progress = False
+
+        async def on_history_scroll(e: ft.OnScrollEvent):
+            """
+                Функция подгрузки истории при прокрутке ленты к верхнему или нижнему краю.
+            """
+
+            if e.pixels - e.min_scroll_extent <= self.HISTORY_SCROLL_THRESHOLD:
+                await self.load_older_history(page)
+            elif e.max_scroll_extent - e.pixels <= self.HISTORY_SCROLL_THRESHOLD:
+                await self.load_newer_history(page)
+
+        async def search_history(e):
+            """
+                Функция поиска по истории чата и показа результатов.
+            """
+
+            query = (self.history_search_field.value or "").strip()
+            if not query:
+                return
+
+            try:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(None, self.cache.search, query)
+            except Exception as err:
+                self.logger.error(f"Ошибка поиска по истории: {err}")
+                show_error_snack(page, f"Ошибка поиска: {str(err)}")
+                return
+
+            async def open_result(e):
+                """
+                    Функция перехода к найденному сообщению.
+                """
+
+                page.close(search_dialog)
+                await self.jump_to_message(page, e.control.data)
+
+            # Создаем диалог с результатами
+            search_dialog = ft.AlertDialog(
+                title=ft.Text(f"Поиск: {query}", **AppStyles.DIALOG_TITLE),
+                content=ft.Container(
+                    content=ft.ListView(
+                        controls=[SearchResult(result, on_click=open_result) for result in results]
+                        or [ft.Text("Ничего не найдено.")],
+                        spacing=10
+                    ),
+                    **AppStyles.SEARCH_RESULTS_CONTAINER  # Применяем стили
+                ),
+                actions=[
+                    ft.TextButton("Закрыть", on_click=lambda e: page.close(search_dialog)),
+                ],
+            )
+
+            page.open(search_dialog)
 
         def show_error_snack(page, message: str):
             """
@@ -483,6 +1167,71 @@ class ChatApp:
 
             stats = self.analytics.get_statistics()  # Получение статистики
 
+            # График использования за выбранный период (по умолчанию - за день)
+            chart_container = ft.Container(**AppStyles.USAGE_CHART_CONTAINER)
+            try:
+                chart_container.content = await self.load_usage_chart("day")
+            except Exception as err:
+                self.logger.error(f"Ошибка построения графика аналитики: {err}")
+                chart_container.content = ft.Text("График недоступен")
+
+            async def on_window_change(e):
+                """
+                    Функция перестроения графика при смене периода.
+                """
+
+                window = next(iter(e.control.selected))
+                try:
+                    chart_container.content = await self.load_usage_chart(window)
+                except Exception as err:
+                    self.logger.error(f"Ошибка построения графика аналитики: {err}")
+                    chart_container.content = ft.Text("График недоступен")
+                page.update()
+
+            window_selector = ft.SegmentedButton(
+                segments=[
+                    ft.Segment(value=key, label=ft.Text(label))
+                    for key, (label, _, _) in self.ANALYTICS_WINDOWS.items()
+                ],
+                selected={"day"},
+                on_change=on_window_change,
+            )
+
+            def format_quantiles(q: dict, unit: str, precision: int = 2) -> str:
+                """
+                    Форматирование перцентилей одной метрики.
+                """
+                if not q or not q['count']:
+                    return "н/д"
+                return "/".join(f"{q[p]:.{precision}f}" for p in ('p50', 'p90', 'p99')) + f" {unit}"
+
+            # Перцентили задержек по моделям (p50/p90/p99)
+            latency_rows = []
+            for model, metrics in sorted(stats['latency'].items()):
+                latency_rows.append(ft.Text(model, weight=ft.FontWeight.BOLD))
+                latency_rows.append(ft.Text(
+                    f"  Ответ: {format_quantiles(metrics.get('response_time'), 'с')}\n"
+                    f"  Первый токен: {format_quantiles(metrics.get('ttft'), 'с')}\n"
+                    f"  Скорость: {format_quantiles(metrics.get('tokens_per_second'), 'ток/с', 0)}",
+                    size=13
+                ))
+
+            # Разбивка времени хода по этапам за последние ходы
+            loop = asyncio.get_running_loop()
+            turns, avg_total, stages = await loop.run_in_executor(
+                None, self.cache.get_trace_breakdown, self.TRACE_BREAKDOWN_TURNS
+            )
+            outbox_counts = await loop.run_in_executor(None, self.outbox.counts)
+            trace_rows = [
+                ft.Text(
+                    f"{self.TRACE_STAGES.get(stage, stage)}: {avg:.3f} с "
+                    f"({avg / avg_total * 100 if avg_total else 0:.0f}%, макс {max_duration:.3f} с"
+                    + (f", в {count} из {turns} ходов)" if count < turns else ")"),
+                    size=13
+                )
+                for stage, avg, max_duration, count in stages
+            ]
+
             # Создание диалога статистики
             dialog = ft.AlertDialog(
                 title=ft.Text("Аналитика"),
@@ -490,8 +1239,35 @@ class ChatApp:
                     ft.Text(f"Всего сообщений: {stats['total_messages']}"),
                     ft.Text(f"Всего токенов: {stats['total_tokens']}"),
                     ft.Text(f"Среднее токенов/сообщение: {stats['tokens_per_message']:.2f}"),
-                    ft.Text(f"Сообщений в минуту: {stats['messages_per_minute']:.2f}")
-                ]),
+                    ft.Text(f"Сообщений в минуту: {stats['messages_per_minute']:.2f}"),
+                    ft.Text(f"Сообщений за сессию: {stats['session_messages']}"),
+                    ft.Text(f"Среднее время ответа за сессию: {stats['avg_response_time']:.2f} с"),
+                    ft.Text(f"Ответов из кэша: {stats['cache_hits']} ({stats['cache_hit_rate'] * 100:.1f}%)"),
+                    ft.Text(f"Сэкономлено токенов: {stats['saved_tokens']}"),
+                    ft.Divider(),
+                    ft.Text("Сообщения по времени", weight=ft.FontWeight.BOLD),
+                    window_selector,
+                    chart_container,
+                    ft.Divider(),
+                    ft.Text("Задержки по моделям (p50/p90/p99)", weight=ft.FontWeight.BOLD),
+                    *latency_rows,
+                    ft.Divider(),
+                    ft.Text(
+                        f"Этапы хода (среднее за {turns} последних: {avg_total:.2f} с)" if turns else "Этапы хода: нет данных",
+                        weight=ft.FontWeight.BOLD
+                    ),
+                    *trace_rows,
+                    ft.Divider(),
+                    ft.Text("Уведомления", weight=ft.FontWeight.BOLD),
+                    ft.Text(
+                        f"Доставлено: {outbox_counts.get('sent', 0)}, "
+                        f"в очереди: {outbox_counts.get('pending', 0)}, "
+                        f"не доставлено: {outbox_counts.get('dead', 0)}",
+                        size=13
+                    )
+                ],
+                scroll=ft.ScrollMode.AUTO  # Прокрутка при большом числе моделей
+                ),
                 actions=[
                     ft.TextButton("Закрыть", on_click=lambda e: close_dialog(dialog)),
                 ],
@@ -508,8 +1284,15 @@ class ChatApp:
 
             try:
                 self.logger.info("Пользователь очистил историю чата.") # Логируем очистку
-                self.cache.clear_history()  # Очистка кэша
+                # Очистка кэша (ждет записи очереди - в пуле потоков, чтобы не блокировать интерфейс)
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self.cache.clear_history)
                 self.analytics.clear_data()  # Очистка аналитики
+                self.context.clear()  # Очистка контекста диалога
+                self.history_oldest_id = None  # Сброс окна истории
+                self.history_newest_id = None
+                self.history_has_older = False
+                self.cache.clear_response_cache()  # Очистка кэша ответов
                 self.chat_history.controls.clear()  # Очистка истории чата
 
             except Exception as e:
@@ -566,8 +1349,9 @@ class ChatApp:
             """
 
             try:
-                # Получение истории из кэша
-                history = self.cache.get_chat_history()
+                # Получение истории из кэша (в пуле потоков: чтение ждет записи очереди)
+                loop = asyncio.get_running_loop()
+                history = await loop.run_in_executor(None, self.cache.get_chat_history)
 
                 # Форматирование данных для сохранения
                 dialog_data = []
@@ -612,8 +1396,10 @@ class ChatApp:
                 show_error_snack(page, f"Ошибка сохранения: {str(e)}")
 
         # Создание компонентов интерфейса
+        self.history_search_field = ft.TextField(on_submit=search_history, **AppStyles.HISTORY_SEARCH_FIELD)  # Поиск по истории
         self.message_input = ft.TextField(expand=True, **AppStyles.MESSAGE_INPUT)  # Поле ввода
         self.chat_history = ft.ListView(**AppStyles.CHAT_HISTORY)     # История чата
+        self.chat_history.on_scroll = on_history_scroll               # Подгрузка страниц истории при прокрутке
         self.notification_target = ft.TextField(expand=True, **AppStyles.RECIPIENT_INPUT)  # Поле для ввода получателя
 
         recipient_row = ft.Row(
@@ -624,9 +1410,6 @@ class ChatApp:
             **AppStyles.RECIPIENT_ROW      # Применение стилей
         )
 
-        # Загрузка существующей истории
-        self.load_chat_history()
-
         # Создание кнопок управления
         save_button = ft.ElevatedButton(
             on_click=save_dialog,  # Привязка функции сохранения
@@ -696,7 +1479,8 @@ class ChatApp:
         model_selection = ft.Column(
             controls=[  # Размещение элементов выбора модели
                 self.model_dropdown.search_field,
-                self.model_dropdown
+                self.model_dropdown,
+                self.history_search_field
             ],
             **AppStyles.MODEL_SELECTION_COLUMN  # Применение стилей к колонке
         )
@@ -713,7 +1497,8 @@ class ChatApp:
                     content=recipient_row,
                     margin=ft.margin.only(top=10)  # Отступ сверху 10 пикселей
                 ),
-                balance_container
+                balance_container,
+                self.response_cache_switch
             ],
             **AppStyles.MODEL_SELECTION_COLUMN  # Применение стилей к колонке
         )
@@ -735,8 +1520,24 @@ class ChatApp:
         # Добавление основной колонки на страницу
         page.add(self.main_column)
 
-        # Запуск монитора
-        self.monitor.get_metrics()
+        self.monitor.startup_stages["shell"] = time.perf_counter() - shell_start
+
+        # Параллельная фоновая загрузка данных: баланс, история, аналитика, каталог моделей
+        page.run_task(self.run_startup, page)
+
+        # Запуск фоновых замеров производительности и задержки цикла событий
+        self.monitor.start_sampler()
+        page.run_task(self.monitor.watch_event_loop)
+
+        # Фоновая отправка уведомлений из очереди (с повторами при ошибках)
+        page.run_task(
+            self.outbox.run,
+            lambda channel: self.notification_credentials(page, channel),
+            lambda notification, error: show_error_snack(page, f"Уведомление не доставлено: {error}")
+        )
+
+        # Локальный endpoint метрик (если задан METRICS_PORT)
+        self.start_metrics_server()
 
         # Логирование запуска
         self.logger.info("Приложение запущено")
\ No newline at end of file
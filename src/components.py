@@ -15,12 +15,19 @@ class MessageBubble(ft.Container):
     Args:
         message (str): Текст сообщения для отображения
         is_user (bool): Флаг, указывающий, является ли это сообщением пользователя
+        row_id (int): ID строки в таблице messages (для сообщений, загруженных из истории)
     """
 
-    def __init__(self, message: str, is_user: bool):
+    def __init__(self, message: str, is_user: bool, row_id: int = None):
         # Инициализация родительского класса Container
         super().__init__()
 
+        # ID строки истории: используется как курсор при подгрузке страниц,
+        # а ключ - для прокрутки к сообщению
+        self.data = row_id
+        if row_id is not None:
+            self.key = f"msg-{row_id}-{'user' if is_user else 'ai'}"
+
         # Настройка отступов внутри пузырька
         self.padding = 10
 
@@ -48,19 +55,98 @@ class MessageBubble(ft.Container):
             bottom=5  # Отступ снизу
         )
 
+        # Текст сообщения с настройками отображения
+        self.text = ft.Text(
+            value=message,  # Текст сообщения
+            color=ft.Colors.WHITE,  # Белый цвет текста
+            size=16,  # Размер шрифта
+            selectable=True,  # Возможность выделения текста
+            weight=ft.FontWeight.W_400  # Нормальная толщина шрифта
+        )
+
         # Создание содержимого пузырька
+        self.content = ft.Column(
+            controls=[self.text],
+            tight=True  # Плотное расположение элементов в колонке
+        )
+
+    def append_text(self, fragment: str):
+        """
+        Дописывание фрагмента текста в конец сообщения.
+
+        Используется при потоковом получении ответа, чтобы пузырек
+        рос по мере поступления новых токенов.
+
+        Args:
+            fragment (str): Новый фрагмент текста
+        """
+        self.text.value = (self.text.value or "") + fragment
+
+    def set_text(self, message: str):
+        """
+        Замена текста сообщения целиком.
+
+        Args:
+            message (str): Новый текст сообщения
+        """
+        self.text.value = message
+
+
+def highlight_spans(snippet: str) -> list:
+    """
+    Разбиение сниппета результата поиска на фрагменты текста
+    с выделением совпадений (см. ChatCache.search).
+
+    Args:
+        snippet (str): Сниппет с маркерами совпадений
+
+    Returns:
+        list: Список ft.TextSpan
+    """
+    spans = []
+    for i, part in enumerate(snippet.split(ChatCache.SEARCH_MATCH_START)):
+        if i == 0:
+            match, rest = "", part
+        else:
+            match, _, rest = part.partition(ChatCache.SEARCH_MATCH_END)
+        if match:
+            spans.append(ft.TextSpan(match, style=AppStyles.SEARCH_MATCH_STYLE))
+        if rest:
+            spans.append(ft.TextSpan(rest))
+    return spans
+
+
+class SearchResult(ft.Container):
+    """
+    Компонент результата поиска по истории чата.
+
+    Отображает модель и время сообщения, а также фрагменты вопроса
+    и ответа с выделенными совпадениями.
+
+    Args:
+        result (dict): Результат ChatCache.search
+        on_click: Обработчик нажатия на результат
+    """
+
+    def __init__(self, result: dict, on_click=None):
+        # Инициализация родительского класса Container
+        super().__init__()
+
+        self.data = result["id"]        # ID сообщения для перехода к нему
+        self.on_click = on_click        # Переход к сообщению
+        self.padding = 10               # Внутренние отступы
+        self.border_radius = 10         # Скругление углов
+        self.bgcolor = ft.Colors.GREY_800
+        self.ink = True                 # Эффект нажатия
+
         self.content = ft.Column(
             controls=[
-                # Текст сообщения с настройками отображения
-                ft.Text(
-                    value=message,  # Текст сообщения
-                    color=ft.Colors.WHITE,  # Белый цвет текста
-                    size=16,  # Размер шрифта
-                    selectable=True,  # Возможность выделения текста
-                    weight=ft.FontWeight.W_400  # Нормальная толщина шрифта
-                )
+                ft.Text(f"{result['model']} · {str(result['timestamp'])[:16]}", size=12, color=ft.Colors.GREY_400),
+                ft.Text(spans=highlight_spans(result["user_snippet"] or ""), color=ft.Colors.BLUE_200),
+                ft.Text(spans=highlight_spans(result["ai_snippet"] or ""), color=ft.Colors.WHITE),
             ],
-            tight=True  # Плотное расположение элементов в колонке
+            tight=True,  # Плотное расположение элементов в колонке
+            spacing=4
         )
 
 
@@ -109,6 +195,33 @@ class ModelSelector(ft.Dropdown):
             **AppStyles.MODEL_SEARCH_FIELD  # Применение стилей из конфигурации
         )
 
+    def set_models(self, models: list):
+        """
+        Замена списка моделей (например, после фонового обновления каталога).
+
+        Текущий выбор сохраняется, если выбранная модель есть в новом списке.
+
+        Args:
+            models (list): Новый список моделей в формате:
+                          [{"id": "model-id", "name": "Model Name"}, ...]
+        """
+        # Создание нового списка опций
+        self.all_options = [
+            ft.dropdown.Option(key=model['id'], text=model['name'])
+            for model in models
+        ]
+
+        # Повторное применение текущего фильтра поиска
+        search_text = self.search_field.value.lower() if self.search_field.value else ""
+        self.options = [
+            opt for opt in self.all_options
+            if not search_text or search_text in opt.text.lower() or search_text in opt.key.lower()
+        ]
+
+        # Сохранение выбора, если модель осталась в каталоге
+        if not any(opt.key == self.value for opt in self.all_options):
+            self.value = models[0]['id'] if models else None
+
     def filter_options(self, e):
         """
         Фильтрация списка моделей на основе введенного текста поиска.
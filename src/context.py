@@ -0,0 +1,157 @@
+# Импорт необходимых библиотек
+from collections import deque  # Двусторонняя очередь для скользящего окна диалога
+
+
+def estimate_tokens(text: str) -> int:
+    """
+        Быстрая локальная оценка количества токенов в тексте.
+
+        Используется приближение "~4 байта UTF-8 на токен": для латиницы это
+        около 4 символов на токен, для кириллицы (2 байта на символ) - около 2.
+        Точный токенизатор модели для обрезки контекста не нужен.
+
+        Args:
+            text (str): Текст сообщения
+
+        Returns:
+            int: Оценка количества токенов
+    """
+    return len(text.encode("utf-8")) // 4 + 1
+
+
+class ConversationContext:
+    """
+        Класс для сборки контекста диалога (предыдущих реплик) для запроса к модели.
+
+        Обеспечивает:
+            - Скользящее окно последних реплик в памяти с заранее подсчитанными токенами
+            - Обрезку контекста под бюджет токенов конкретной модели
+            - Добавление новой реплики за O(1) без перечитывания истории из базы
+    """
+
+    # Служебные токены на каждое сообщение (роль, разделители)
+    MESSAGE_OVERHEAD = 4
+
+    def __init__(self, max_tokens: int = 4000, response_reserve: int = 1024, max_turns: int = 200):
+        """
+            Инициализация контекста диалога.
+
+            Args:
+                max_tokens (int): Максимальный бюджет контекста в токенах для любой модели
+                response_reserve (int): Сколько токенов окна модели оставить под ответ
+                max_turns (int): Максимальное число реплик в скользящем окне
+        """
+        self.max_tokens = max_tokens              # Верхняя граница бюджета контекста
+        self.response_reserve = response_reserve  # Резерв под ответ модели
+        self.max_turns = max_turns                # Ограничение окна по числу реплик
+
+        self.turns = deque()   # Реплики: (user_message, ai_response, tokens)
+        self.window_tokens = 0 # Сумма токенов всех реплик в окне
+
+    def budget(self, context_length: int = None) -> int:
+        """
+            Бюджет токенов на историю для модели.
+
+            Args:
+                context_length (int): Размер окна контекста модели (если известен)
+
+            Returns:
+                int: Количество токенов, доступных для предыдущих реплик
+        """
+        if not context_length:
+            return self.max_tokens
+        return max(0, min(self.max_tokens, context_length - self.response_reserve))
+
+    def add_turn(self, user_message: str, ai_response: str):
+        """
+            Добавление новой реплики в конец окна.
+
+            Токены считаются один раз при добавлении; самые старые реплики
+            вытесняются, когда окно превышает max_tokens или max_turns.
+
+            Args:
+                user_message (str): Сообщение пользователя
+                ai_response (str): Ответ модели
+        """
+        tokens = (
+            estimate_tokens(user_message) + estimate_tokens(ai_response)
+            + 2 * self.MESSAGE_OVERHEAD
+        )
+        self.turns.append((user_message, ai_response, tokens))
+        self.window_tokens += tokens
+
+        # Вытеснение самых старых реплик
+        while self.turns and (self.window_tokens > self.max_tokens or len(self.turns) > self.max_turns):
+            _, _, old_tokens = self.turns.popleft()
+            self.window_tokens -= old_tokens
+
+    def seed(self, history):
+        """
+            Заполнение окна из истории чата в базе.
+
+            История загружается в фоне, поэтому реплики, добавленные через
+            add_turn до окончания загрузки, не теряются: они остаются после
+            реплик из истории (кроме тех, что уже попали в прочитанные строки).
+
+            Args:
+                history (list): Строки таблицы messages, новые сначала
+                    (формат ChatCache.get_chat_history)
+        """
+        live = [(user_message, ai_response) for user_message, ai_response, _ in self.turns]
+        self.clear()
+
+        loaded = []
+        for _, _, user_message, ai_response, _, _ in reversed(history):
+            # Ответы с ошибкой API в контекст не попадают
+            if ai_response is None or ai_response.startswith("Ошибка: "):
+                continue
+            loaded.append((user_message, ai_response))
+            self.add_turn(user_message, ai_response)
+
+        # Живые реплики, сохраненные в базу до ее чтения, уже есть среди последних строк
+        recent = set(loaded[-len(live):]) if live else set()
+        for user_message, ai_response in live:
+            if (user_message, ai_response) not in recent:
+                self.add_turn(user_message, ai_response)
+
+    def build(self, context_length: int = None, prompt: str = None) -> list:
+        """
+            Сборка предыдущих реплик для запроса к модели.
+
+            Реплики берутся от новых к старым, пока помещаются в бюджет модели.
+            Токены заранее подсчитаны, поэтому стоимость ограничена размером окна
+            и не зависит от объема всей истории в базе.
+
+            Args:
+                context_length (int): Размер окна контекста модели (если известен)
+                prompt (str): Текущее сообщение пользователя - его токены
+                    вычитаются из бюджета, чтобы запрос поместился в окно модели
+
+            Returns:
+                list: Сообщения в формате API в хронологическом порядке:
+                    [{"role": "user", "content": ...}, {"role": "assistant", "content": ...}, ...]
+        """
+        budget = self.budget(context_length)
+        if prompt:
+            budget -= estimate_tokens(prompt) + self.MESSAGE_OVERHEAD
+        selected = []
+        used = 0
+
+        for user_message, ai_response, tokens in reversed(self.turns):
+            if used + tokens > budget:
+                break
+            used += tokens
+            selected.append((user_message, ai_response))
+
+        messages = []
+        for user_message, ai_response in reversed(selected):
+            messages.append({"role": "user", "content": user_message})
+            messages.append({"role": "assistant", "content": ai_response})
+        return messages
+
+    def clear(self):
+        """
+            Очистка окна контекста (например, после очистки истории чата).
+        """
+        self.turns.clear()
+        self.window_tokens = 0
@@ -1,4 +1,9 @@
 # Импорт необходимых библиотек
+import asyncio                         # Отправка в отдельном потоке без блокировки цикла событий
+import os                              # Настройки SMTP-сервера из переменных окружения
+import select                          # Проверка, не закрыл ли сервер простаивающее соединение
+import time                            # Время простоя соединения
+from concurrent.futures import ThreadPoolExecutor  # Отдельный поток для SMTP-соединения
 from email.message import EmailMessage # Модуль для работы с почтой
 from logger import AppLogger           # Импорт собственного логгера для отслеживания работы
 import smtplib                         # Библиотека для подключения к SMTP серверу для отправки письма (email)
@@ -6,26 +11,60 @@ import smtplib                         # Библиотека для подкл
 
 class EmailNotificationSender:
 
-    def __init__(self):
+    # Соединение, простаивавшее дольше, перед отправкой проверяется командой NOOP
+    NOOP_AFTER = 10.0
+    # Соединение, простаивавшее дольше, закрывается и открывается заново
+    IDLE_TIMEOUT = 300.0
+
+    def __init__(self, host: str = None, port: int = None, use_ssl: bool = None, timeout: float = 30.0,
+                 require_tls: bool = True):
         """
         Инициализация отправки уведомлений по почте.
 
         Настраивает:
             - Систему логирования
-            - SMTP-сервер
-            - Логин для входа на почту
-            - Пароль для отправки уведомления
+            - SMTP-сервер (по умолчанию - по домену почты, либо SMTP_HOST/SMTP_PORT/SMTP_SSL из .env)
+            - Поток отправки с одним переиспользуемым соединением
+
+        Args:
+            host: Адрес SMTP-сервера. По умолчанию: SMTP_HOST или сервер домена почты
+            port: Порт SMTP-сервера. По умолчанию: SMTP_PORT, иначе 465 для SSL и 587 для STARTTLS
+            use_ssl: Подключение по SSL (иначе - по STARTTLS).
+                По умолчанию: SMTP_SSL или True
+            timeout: Таймаут сетевых операций в секундах
+            require_tls: Без SSL отказываться от сервера, не поддерживающего STARTTLS,
+                чтобы не передавать пароль открытым текстом. False - только для
+                локального сервера (например, заглушки в бенчмарке)
         """
         # Инициализация логгера для отслеживания работы клиента
         self.logger = AppLogger()
 
+        # Настройки SMTP-сервера
+        self.host = host or os.getenv("SMTP_HOST") or None
+        if use_ssl is None:
+            use_ssl = os.getenv("SMTP_SSL", "true").lower() not in ("0", "false", "no")
+        self.use_ssl = use_ssl
+        self.port = port or int(os.getenv("SMTP_PORT") or (465 if use_ssl else 587))
+        self.timeout = timeout
+        self.require_tls = require_tls
+
+        # smtplib не потокобезопасен: соединением владеет один поток,
+        # письма отправляются по очереди через одно авторизованное соединение
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+        self.connection = None       # Открытое авторизованное соединение
+        self.connection_key = None   # (сервер, порт, логин, пароль) открытого соединения
+        self.last_used = 0.0         # Время последней команды соединения
+
         # Логирование успешной инициализации SMTP-серера
         self.logger.info("EmailNotificationSender initialized successfully")
 
-    def send_notification(self, email_to: str, text: str, login: str, password: str, mail_domain: str = "yandex.ru"):
+    async def send_notification(self, email_to: str, text: str, login: str, password: str, mail_domain: str = "yandex.ru"):
         """
         Метод для отправки уведомления на почту.
 
+        Отправка выполняется в отдельном потоке, поэтому подключение, TLS
+        и авторизация не блокируют цикл событий приложения.
+
         Args:
             email_to: Адрес получателя
             text: Текст уведомления
@@ -33,6 +72,18 @@ class EmailNotificationSender:
             password: Пароль для авторизации в IMAP
             mail_domain: Домен для отправки уведомления. По умолчанию: yandex.ru
 
+        Returns:
+            str | None: Текст ошибки или None при успешной отправке
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self._send, email_to, text, login, password, mail_domain
+        )
+
+    def _send(self, email_to: str, text: str, login: str, password: str, mail_domain: str):
+        """
+        Отправка письма (в потоке SMTP).
+
         Raises:
             SMTPAuthenticationError: Не правильный логин/пароль в .env файле
         """
@@ -53,27 +104,113 @@ class EmailNotificationSender:
             message["Subject"] = "Уведомление"                   # Заголовок письма
             message.set_content(text, charset="utf-8")           # Тело письма (текст)
 
-            # Подключаемся к SMTP-серверу, указывая хост и порт
+            # Сервер из настроек (SMTP_HOST) или по домену почты
+            if self.host:
+                smtp_server = self.host
             # Если в домене есть упоминание про yandex
-            if "yandex" in mail_domain:
+            elif "yandex" in mail_domain:
                 smtp_server = "smtp.yandex.ru" # Устанавливаем сервер как smtp.yandex.ru
             else:
                 smtp_server = "smtp.gmail.com" # Иначе используем smtp.gmail.com
 
-            with smtplib.SMTP_SSL(smtp_server, 465) as server:
-                server.login(login, password) # Логин и пароль для входа
-                server.send_message(message) # Отправка сообщения
+            key = (smtp_server, self.port, login, password)
+            try:
+                connection = self._connection(key)
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError) as e:
+                # Соединение не удалось открыть или проверить - одна повторная попытка
+                self.logger.warning(f"SMTP-соединение потеряно ({e}), переподключение")
+                self._disconnect()
+                connection = self._connection(key)
+
+            # Письмо отправляется без повтора: после начала отправки сервер мог уже
+            # принять письмо, и повтор отправил бы его дважды (повторяет очередь уведомлений)
+            connection.send_message(message) # Отправка сообщения
+            self.last_used = time.monotonic()
 
             # Логируем удачную отправку сообщения через почту
             self.logger.info(f"Уведомление отправлено на почту {email_to}")
 
         except smtplib.SMTPAuthenticationError:
+            self._disconnect()
             # Логируем ошибку аутентификации
             self.logger.error("SMTP аутентификация не удалась. Проверьте пароли приложений в почте.")
             # Возвращаем ошибку
             return "Не удалось авторизоваться по введенному логину и паролю. Проверьте пароли приложений на почте"
         except Exception as e:
+            self._disconnect()
             # Логируем ошибку при отправке email
             self.logger.error(f"Ошибка при отправке email: {e}")
             # Возвращаем ошибку
             return f"Ошибка при отправке email {e}"
+
+    def _connection(self, key: tuple):
+        """
+        Авторизованное соединение для (сервер, порт, логин, пароль).
+
+        Открытое соединение переиспользуется; если сервер его уже закрыл
+        (или прислал 421), оно открывается заново. После простоя дольше
+        NOOP_AFTER соединение проверяется командой NOOP, после IDLE_TIMEOUT -
+        открывается заново.
+        """
+        if self.connection is not None:
+            idle = time.monotonic() - self.last_used
+            if self.connection_key != key or idle >= self.IDLE_TIMEOUT:
+                self._disconnect()
+            elif select.select([self.connection.sock], [], [], 0)[0]:
+                # Простаивающему соединению сервер ничего не присылает, кроме
+                # закрытия или 421 - такое соединение уже не годится
+                self._disconnect()
+            elif idle >= self.NOOP_AFTER:
+                try:
+                    alive = self.connection.noop()[0] == 250
+                except (smtplib.SMTPException, OSError):
+                    alive = False
+                if not alive:
+                    self._disconnect()
+
+        if self.connection is None:
+            host, port, login, password = key
+            # Подключаемся к SMTP-серверу, указывая хост и порт
+            if self.use_ssl:
+                server = smtplib.SMTP_SSL(host, port, timeout=self.timeout)
+            else:
+                server = smtplib.SMTP(host, port, timeout=self.timeout)
+                server.ehlo()
+                if server.has_extn("starttls"):
+                    server.starttls()
+                    server.ehlo()
+                elif self.require_tls:
+                    # Без шифрования логин и пароль ушли бы открытым текстом
+                    server.close()
+                    raise smtplib.SMTPNotSupportedError(
+                        f"SMTP-сервер {host}:{port} не поддерживает STARTTLS, вход без шифрования отключен"
+                    )
+            try:
+                server.login(login, password) # Логин и пароль для входа
+            except Exception:
+                server.close()
+                raise
+            self.connection = server
+            self.connection_key = key
+        self.last_used = time.monotonic()
+        return self.connection
+
+    def _disconnect(self):
+        """
+        Закрытие SMTP-соединения (в потоке SMTP).
+        """
+        if self.connection is None:
+            return
+        try:
+            self.connection.quit()
+        except (smtplib.SMTPException, OSError):
+            self.connection.close()
+        self.connection = None
+        self.connection_key = None
+
+    async def close(self):
+        """
+        Закрытие SMTP-соединения. Следующее письмо откроет новое.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._disconnect)
@@ -0,0 +1,140 @@
+# Импорт необходимых библиотек
+import math  # Логарифмы для расчета номера корзины
+
+
+class LatencyHistogram:
+    """
+        Гистограмма с логарифмическими корзинами для оценки перцентилей
+        (в духе HDR Histogram / DDSketch).
+
+        Корзины растут в геометрической прогрессии, поэтому любое значение
+        из диапазона [MIN_VALUE, MAX_VALUE] восстанавливается с относительной
+        ошибкой не более RELATIVE_ACCURACY. Число корзин ограничено (~470),
+        хранятся только непустые.
+
+        Обеспечивает:
+            - Добавление значения за O(1)
+            - Объединение гистограмм сложением счетчиков корзин
+            - Оценку любого перцентиля за O(число корзин)
+    """
+
+    RELATIVE_ACCURACY = 0.02  # Относительная ошибка оценки значения (2%)
+    MIN_VALUE = 1e-3          # Меньшие значения попадают в первую корзину
+    MAX_VALUE = 1e5           # Большие значения попадают в последнюю корзину
+
+    # Коэффициент роста границ корзин
+    GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    LOG_GAMMA = math.log(GAMMA)
+    MAX_INDEX = math.ceil(math.log(MAX_VALUE / MIN_VALUE) / LOG_GAMMA)
+
+    def __init__(self):
+        """
+            Инициализация пустой гистограммы.
+        """
+        self.counts = {}  # Номер корзины -> количество значений
+        self.count = 0    # Общее количество значений
+
+    @classmethod
+    def bucket_index(cls, value: float) -> int:
+        """
+            Номер корзины для значения.
+
+            Args:
+                value (float): Значение (секунды, токены/с и т.п.)
+        """
+        if value <= cls.MIN_VALUE:
+            return 0
+        index = math.ceil(math.log(value / cls.MIN_VALUE) / cls.LOG_GAMMA)
+        return min(index, cls.MAX_INDEX)
+
+    @classmethod
+    def bucket_value(cls, index: int) -> float:
+        """
+            Представительное значение корзины (с ошибкой не более RELATIVE_ACCURACY).
+
+            Args:
+                index (int): Номер корзины
+        """
+        if index <= 0:
+            return cls.MIN_VALUE
+        return cls.MIN_VALUE * 2 * cls.GAMMA ** index / (cls.GAMMA + 1)
+
+    def record(self, value: float) -> int:
+        """
+            Добавление значения.
+
+            Args:
+                value (float): Значение
+
+            Returns:
+                int: Номер корзины, в которую попало значение
+        """
+        index = self.bucket_index(value)
+        self.add_bucket(index)
+        return index
+
+    def add_bucket(self, index: int, count: int = 1):
+        """
+            Увеличение счетчика корзины (при загрузке из базы и объединении).
+
+            Args:
+                index (int): Номер корзины
+                count (int): Количество значений
+        """
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+
+    def merge(self, other: "LatencyHistogram"):
+        """
+            Объединение с другой гистограммой.
+
+            Args:
+                other (LatencyHistogram): Гистограмма с теми же параметрами корзин
+        """
+        for index, count in other.counts.items():
+            self.add_bucket(index, count)
+
+    def quantile(self, q: float):
+        """
+            Оценка перцентиля.
+
+            Args:
+                q (float): Доля от 0 до 1 (0.5 - медиана)
+
+            Returns:
+                float | None: Оценка значения или None, если значений нет
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen > rank:
+                return self.bucket_value(index)
+        return self.bucket_value(max(self.counts))
+
+    def quantiles(self, qs=(0.5, 0.9, 0.99)) -> dict:
+        """
+            Оценка нескольких перцентилей за один проход по корзинам.
+
+            Args:
+                qs (tuple): Доли от 0 до 1
+
+            Returns:
+                dict: {'p50': ..., 'p90': ..., 'p99': ..., 'count': ...}
+        """
+        result = {f"p{round(q * 100):g}": None for q in qs}
+        result['count'] = self.count
+        if not self.count:
+            return result
+
+        pending = sorted(qs)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            while pending and seen > pending[0] * (self.count - 1):
+                result[f"p{round(pending.pop(0) * 100):g}"] = self.bucket_value(index)
+            if not pending:
+                break
+        return result
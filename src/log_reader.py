@@ -0,0 +1,294 @@
+# Импорт необходимых библиотек
+import gzip                    # Чтение сжатых частей лога
+import json                    # Записи структурированного лога
+import logging                 # Номера уровней лога
+import re                      # Разбор имен файлов лога
+from bisect import bisect_right  # Поиск конца минуты по индексу
+from collections import deque  # Последние limit найденных записей
+from datetime import datetime, timedelta  # Границы периода поиска
+from pathlib import Path       # Библиотека для работы с системными путями
+
+# Размер блока чтения с конца файла
+BLOCK_SIZE = 64 * 1024
+
+# Активный (несжатый) файл лога: chat_app_YYYY-MM-DD.log
+LOG_FILE_PATTERN = re.compile(r"^chat_app_\d{4}-\d{2}-\d{2}\.log$")
+
+# Часть структурированного лога: chat_app_YYYY-MM-DD[.N].jsonl[.gz|.rotating]
+JSON_FILE_PATTERN = re.compile(r"^chat_app_(\d{4}-\d{2}-\d{2})(?:\.(\d+))?\.jsonl(\.gz|\.rotating)?$")
+
+
+def latest_log(logs_dir) -> Path:
+    """
+        Самый новый активный файл лога.
+
+        Имя содержит дату, поэтому последний по имени файл - текущий;
+        сжатые после ротации части (.log.gz) не рассматриваются.
+
+        Args:
+            logs_dir (Path): Папка логов (AppLogger.logs_dir)
+
+        Returns:
+            Path | None: Путь к файлу или None, если логов нет
+    """
+    logs_dir = Path(logs_dir)
+    if not logs_dir.is_dir():
+        return None
+    files = sorted(p for p in logs_dir.iterdir() if LOG_FILE_PATTERN.match(p.name))
+    return files[-1] if files else None
+
+
+def read_tail(path, count: int = 200, end: int = None):
+    """
+        Последние count строк файла до позиции end.
+
+        Файл читается блоками от конца к началу, пока не наберется
+        нужное число строк, поэтому объем чтения пропорционален размеру
+        результата, а не размеру файла.
+
+        Args:
+            path (Path): Путь к файлу лога
+            count (int): Количество строк
+            end (int): Позиция (в байтах), до которой читать.
+                По умолчанию - конец файла. Для следующей страницы
+                передается start предыдущей.
+
+        Returns:
+            tuple: (список строк без переводов строки, start - позиция
+                первой возвращенной строки; 0 - достигнуто начало файла)
+    """
+    with open(path, "rb") as f:
+        if end is None:
+            f.seek(0, 2)
+            end = f.tell()
+
+        blocks = []   # Прочитанные блоки от конца к началу
+        position = end
+        newlines = 0
+        trailing = 0  # Завершающий перевод строки не отделяет еще одну строку
+
+        # Нужно count переводов строки перед хвостом (граница первой строки),
+        # либо начало файла
+        while position > 0:
+            size = min(BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            block = f.read(size)
+            if not blocks:
+                trailing = int(block.endswith(b"\n"))
+            blocks.append(block)
+            newlines += block.count(b"\n")
+            if newlines - trailing >= count:
+                break
+
+    data = b"".join(reversed(blocks))
+
+    # Поиск начала count-й строки с конца
+    index = len(data) - trailing
+    for _ in range(count):
+        index = data.rfind(b"\n", 0, index)
+        if index < 0:
+            break
+    start = index + 1  # 0, если дошли до начала файла
+
+    body = data[start:len(data) - trailing]
+    lines = body.decode("utf-8", errors="replace").split("\n") if body else []
+    return lines, position + start
+
+
+def load_index(path):
+    """
+        Чтение индекса структурированного лога (chat_app_....jsonl.idx).
+
+        Строки индекса:
+            M <минута> <смещение>            - первая запись минуты
+            L <уровень> <минута> <смещение>  - первая запись уровня в минуте
+        Минута - время Unix, кратное 60; смещение - позиция строки в файле в байтах.
+
+        Args:
+            path (Path): Путь к индексу
+
+        Returns:
+            tuple: (список (минута, смещение), словарь уровень -> список (минута, смещение));
+                пустые, если индекса нет
+    """
+    minutes, levels = [], {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                try:
+                    if len(parts) == 3 and parts[0] == "M":
+                        minutes.append((int(parts[1]), int(parts[2])))
+                    elif len(parts) == 4 and parts[0] == "L":
+                        levels.setdefault(parts[1], []).append((int(parts[2]), int(parts[3])))
+                except ValueError:
+                    pass  # Недописанная строка
+    except FileNotFoundError:
+        pass
+    return minutes, levels
+
+
+def _timestamp(value):
+    """
+        Время Unix из datetime или числа (None - без ограничения).
+    """
+    if value is None:
+        return None
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+def _level_number(level) -> int:
+    """
+        Номер уровня лога по имени или номеру (неизвестные уровни - 0).
+    """
+    if isinstance(level, int):
+        return level
+    number = logging.getLevelName(str(level).upper())
+    return number if isinstance(number, int) else 0
+
+
+def _log_parts(logs_dir) -> list:
+    """
+        Части структурированного лога от старых к новым: (дата, путь, путь индекса).
+    """
+    parts = {}
+    for path in Path(logs_dir).iterdir():
+        match = JSON_FILE_PATTERN.match(path.name)
+        if not match:
+            continue
+        date, number, suffix = match.groups()
+        name = path.name[:-len(suffix)] if suffix else path.name  # chat_app_....jsonl
+        # Активный файл дня - после всех его сжатых частей
+        key = (date, int(number) if number else float("inf"))
+        parts.setdefault(key, (date, path, path.with_name(name + ".idx")))
+    return [parts[key] for key in sorted(parts)]
+
+
+def _open_part(path: Path):
+    """
+        Открытие части лога; файл, сжатый за время поиска, читается из архива.
+    """
+    try:
+        return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+    except FileNotFoundError:
+        if path.suffix != ".gz":
+            return gzip.open(path.with_suffix(".gz"), "rb")
+        raise
+
+
+def _spans(minutes: list, levels: dict, level: int, since: float, until: float) -> list:
+    """
+        Участки файла для чтения по индексу: (начало, конец) в байтах,
+        конец None - до конца файла.
+
+        С уровнем - минуты, где есть записи этого уровня или выше, от первой
+        такой записи до начала следующей минуты. Без уровня - один участок
+        от первой минуты периода до первой минуты после него.
+    """
+    first = int(since // 60) * 60 if since is not None else None
+    bounds = [offset for _, offset in minutes]  # Начала минут в порядке записи
+
+    def in_period(minute):
+        return (first is None or minute >= first) and (until is None or minute <= until)
+
+    def minute_end(offset):
+        index = bisect_right(bounds, offset)
+        return bounds[index] if index < len(bounds) else None
+
+    if level:
+        return sorted(
+            (offset, minute_end(offset))
+            for name, entries in levels.items() if _level_number(name) >= level
+            for minute, offset in entries if in_period(minute)
+        )
+
+    start = next((i for i, (minute, _) in enumerate(minutes) if first is None or minute >= first), None)
+    if start is None:
+        return []
+    end = next((offset for minute, offset in minutes[start:] if until is not None and minute > until), None)
+    return [(minutes[start][1], end)]
+
+
+def _match(line: bytes, level: int, since: float, until: float, needle: str):
+    """
+        Запись из строки лога, если она подходит под условия поиска, иначе None.
+    """
+    try:
+        entry = json.loads(line)
+        ts = entry['ts']
+    except (ValueError, KeyError, TypeError):
+        return None  # Поврежденная строка
+    if since is not None and ts < since:
+        return None
+    if until is not None and ts > until:
+        return None
+    if level and _level_number(entry.get('level')) < level:
+        return None
+    if needle and needle not in str(entry.get('message', '')).lower():
+        return None
+    return entry
+
+
+def query_logs(logs_dir, level=None, since=None, until=None, contains: str = None, limit: int = 500) -> list:
+    """
+        Поиск записей в структурированном логе (chat_app_*.jsonl и сжатые части).
+
+        Части за пределами периода пропускаются по дате в имени, а внутри
+        части индекс указывает смещения нужных минут и уровней, поэтому
+        читаются только они. Части без индекса просматриваются целиком.
+
+        Args:
+            logs_dir (Path): Папка логов (AppLogger.logs_dir)
+            level (str | int): Минимальный уровень
+            since (datetime | float): Начало периода
+            until (datetime | float): Конец периода
+            contains (str): Подстрока сообщения (без учета регистра)
+            limit (int): Максимальное количество записей (последние)
+
+        Returns:
+            list: Записи по времени - словари с ключами ts, time, level, message
+    """
+    level = _level_number(level) if level is not None else 0
+    since, until = _timestamp(since), _timestamp(until)
+    needle = contains.lower() if contains else None
+    found = deque(maxlen=limit)
+    if not Path(logs_dir).is_dir():
+        return []
+
+    for date, path, index_path in _log_parts(logs_dir):
+        day_start = datetime.strptime(date, "%Y-%m-%d")
+        if until is not None and day_start.timestamp() > until:
+            continue
+        if since is not None and (day_start + timedelta(days=1)).timestamp() <= since:
+            continue
+
+        minutes, levels = load_index(index_path)
+        spans = _spans(minutes, levels, level, since, until) if minutes else [(0, None)]
+        markers = [
+            f'"level": "{name}"'.encode("utf-8")  # Как записывает logger.JsonFormatter
+            for name in levels if _level_number(name) >= level
+        ] if level and minutes else None
+        try:
+            f = _open_part(path)
+        except OSError:
+            continue  # Часть удалена при ротации
+        with f:
+            position = 0  # Прочитано до этой позиции
+            for start, end in spans:
+                if start < position:
+                    start = position  # Начало участка уже прочитано
+                    if end is not None and start >= end:
+                        continue
+                f.seek(start)
+                position = start
+                for line in f:
+                    position += len(line)
+                    # Строки других уровней отсеиваются без разбора JSON
+                    if not markers or any(marker in line for marker in markers):
+                        entry = _match(line, level, since, until, needle)
+                        if entry is not None:
+                            found.append(entry)
+                    if end is not None and position >= end:
+                        break
+    return list(found)
@@ -1,8 +1,442 @@
 # Импорт необходимых библиотек
+import atexit                  # Гарантированная запись очереди логов при выходе
+import gzip                    # Сжатие файлов лога после ротации
+import json                    # Структурированный лог (JSON lines)
 import logging                 # Стандартная библиотека Python для логирования
+import logging.handlers        # QueueHandler / QueueListener для записи в фоне
 import os                      # Библиотека для работы с операционной системой и файлами
-from datetime import datetime  # Библиотека для работы с датой и временем
+import queue                   # Очередь записей лога между потоками
+import re                      # Разбор имен файлов лога
+import shutil                  # Копирование файла в сжатый поток
+import threading               # Ожидание записи очереди (flush)
+import time                    # Возраст файлов лога
+from datetime import datetime, timedelta  # Библиотека для работы с датой и временем
 from pathlib import Path       # Библиотека для работы с системными путями
+from log_reader import load_index, query_logs  # Индекс и поиск по структурированному логу
+
+
+class BatchFileHandler(logging.FileHandler):
+    """
+        Файловый обработчик без сброса буфера после каждой записи.
+
+        Сбросом управляет BatchQueueListener: буфер файла сбрасывается,
+        когда очередь опустела или накопилось batch_size записей.
+    """
+
+    def flush(self):
+        pass  # Сброс после каждой записи отключен, см. flush_batch
+
+    def flush_batch(self):
+        """
+            Запись накопленного буфера в файл.
+        """
+        self._flush_stream()
+
+    def _flush_stream(self):
+        super().flush()
+
+    def close(self):
+        self._flush_stream()
+        super().close()
+
+
+class RotatingLogFileHandler(BatchFileHandler):
+    """
+        Файл лога по дням с ротацией по размеру, сжатием и ограничением места.
+
+        Запись идет в chat_app_YYYY-MM-DD.log. Файл закрывается и сжимается
+        в фоне в chat_app_YYYY-MM-DD.N.log.gz, когда:
+            - его размер превысил max_bytes (проверяется при сбросе пакета)
+            - наступили следующие сутки (запись продолжается в файл новой даты)
+
+        После сжатия удаляются сжатые файлы старше max_age_days и самые
+        старые из них, пока логи вместе занимают больше max_total_bytes.
+    """
+
+    PREFIX = "chat_app_"
+    EXTENSION = ".log"            # Расширение файлов (архивы - EXTENSION + .gz)
+    ROTATED_SUFFIX = ".rotating"  # Закрытый файл, ожидающий сжатия
+
+    def __init__(self, logs_dir, max_bytes: int, max_total_bytes: int, max_age_days: int):
+        """
+            Args:
+                logs_dir (Path): Папка логов
+                max_bytes (int): Максимальный размер одного файла лога
+                max_total_bytes (int): Максимальный общий размер папки логов
+                max_age_days (int): Сколько дней хранить сжатые файлы
+        """
+        self.logs_dir = Path(logs_dir)
+        self.max_bytes = max_bytes
+        self.max_total_bytes = max_total_bytes
+        self.max_age_days = max_age_days
+        self.compress_lock = threading.Lock()  # Сжатие и очистка - по одному потоку за раз
+
+        self.current_date = datetime.now().strftime("%Y-%m-%d")
+        self.rollover_at = self._next_midnight()
+        super().__init__(str(self._active_path(self.current_date)), encoding='utf-8')
+
+        # Файлы прошлых дней и несжатые остатки прошлого запуска
+        active_pattern = re.compile(rf"^{self.PREFIX}(\d{{4}}-\d{{2}}-\d{{2}}){re.escape(self.EXTENSION)}$")
+        pending = list(self.logs_dir.glob(f"{self.PREFIX}*{self.EXTENSION}{self.ROTATED_SUFFIX}"))
+        for path in self.logs_dir.glob(f"{self.PREFIX}*{self.EXTENSION}"):
+            match = active_pattern.match(path.name)
+            if match and match.group(1) != self.current_date:
+                pending.append(self._retire(path, match.group(1)))
+        for path in self.logs_dir.glob(f"{self.PREFIX}*{self.EXTENSION}.gz.tmp"):
+            path.unlink(missing_ok=True)  # Недописанный архив прерванного сжатия
+        self._compress_in_background(pending)
+
+    def _active_path(self, date: str) -> Path:
+        return self.logs_dir / f"{self.PREFIX}{date}{self.EXTENSION}"
+
+    @staticmethod
+    def _next_midnight() -> float:
+        tomorrow = datetime.now().date() + timedelta(days=1)
+        return datetime.combine(tomorrow, datetime.min.time()).timestamp()
+
+    def _retire(self, path: Path, date: str) -> Path:
+        """
+            Переименование закрытого файла лога в следующий по номеру файл,
+            ожидающий сжатия.
+        """
+        part = re.compile(rf"^{self.PREFIX}{date}\.(\d+){re.escape(self.EXTENSION)}")
+        numbers = [int(m.group(1)) for m in (part.match(p.name) for p in self.logs_dir.iterdir()) if m]
+        target = self.logs_dir / f"{self.PREFIX}{date}.{max(numbers, default=0) + 1}{self.EXTENSION}{self.ROTATED_SUFFIX}"
+        path.rename(target)
+        return target
+
+    def emit(self, record):
+        # Смена суток: запись продолжается в файл новой даты
+        if record.created >= self.rollover_at:
+            self.rollover()
+        super().emit(record)
+
+    def flush_batch(self):
+        super().flush_batch()
+        # Размер проверяется после сброса пакета, а не на каждой записи
+        if self.stream is not None and os.fstat(self.stream.fileno()).st_size >= self.max_bytes:
+            self.rollover()
+
+    def rollover(self):
+        """
+            Закрытие текущего файла, сжатие его в фоне и переход к файлу текущей даты.
+        """
+        self.acquire()
+        try:
+            if self.stream is not None:
+                self.stream.flush()
+                self.stream.close()
+                self.stream = None
+
+            current = Path(self.baseFilename)
+            if current.exists() and current.stat().st_size:
+                self._compress_in_background([self._retire(current, self.current_date)])
+
+            self.current_date = datetime.now().strftime("%Y-%m-%d")
+            self.rollover_at = self._next_midnight()
+            self.baseFilename = os.path.abspath(self._active_path(self.current_date))
+            self.stream = self._open()
+        finally:
+            self.release()
+
+    def _compress_in_background(self, paths: list):
+        """
+            Сжатие файлов и применение ограничений в фоновом потоке.
+        """
+        threading.Thread(target=self._compress, args=(paths,), name="log-compress", daemon=True).start()
+
+    def _compress(self, paths: list):
+        """
+            Сжатие закрытых файлов в архивы .gz и удаление старых архивов.
+            Архив пишется во временный файл, поэтому прерванное сжатие
+            не оставляет поврежденных архивов.
+        """
+        with self.compress_lock:
+            for path in paths:
+                archive = path.with_suffix(".gz")  # ....N.log.rotating -> ....N.log.gz
+                partial = archive.with_name(archive.name + ".tmp")
+                try:
+                    with open(path, "rb") as source, gzip.open(partial, "wb") as target:
+                        shutil.copyfileobj(source, target)
+                    partial.replace(archive)
+                    path.unlink()
+                except OSError:
+                    partial.unlink(missing_ok=True)  # Попробуем снова при следующем запуске
+            self.apply_retention()
+
+    def apply_retention(self):
+        """
+            Удаление архивов старше max_age_days и самых старых архивов,
+            пока логи занимают больше max_total_bytes.
+        """
+        archives = []
+        for path in self.logs_dir.glob(f"{self.PREFIX}*{self.EXTENSION}.gz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            archives.append((stat.st_mtime, stat.st_size, path))
+        archives.sort()  # От старых к новым
+
+        try:
+            total = sum(p.stat().st_size for p in self.logs_dir.glob(f"{self.PREFIX}*") if p.is_file())
+        except OSError:
+            return
+        oldest_allowed = time.time() - self.max_age_days * 86400
+
+        for mtime, size, path in archives:
+            if mtime >= oldest_allowed and total <= self.max_total_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+            else:
+                self._archive_removed(path)
+
+    def _archive_removed(self, archive: Path):
+        """
+            Вызывается после удаления архива (для удаления связанных файлов).
+        """
+
+
+class JsonFormatter(logging.Formatter):
+    """
+        Запись лога одной строкой JSON: время, уровень и сообщение.
+    """
+
+    def format(self, record) -> str:
+        entry = {
+            'ts': round(record.created, 3),                               # Время (Unix)
+            'time': self.formatTime(record, '%Y-%m-%d %H:%M:%S'),         # Время для чтения
+            'level': record.levelname,                                    # Уровень
+            'message': record.getMessage(),                               # Сообщение
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)          # Стек вызовов
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class JsonLinesFileHandler(RotatingLogFileHandler):
+    """
+        Структурированный лог chat_app_YYYY-MM-DD.jsonl (запись JSON на строку)
+        с индексом по времени и уровням.
+
+        Рядом с файлом ведется индекс chat_app_YYYY-MM-DD.jsonl.idx: смещения
+        в байтах первой записи каждой минуты и первой записи каждого уровня
+        внутри минуты (формат - см. log_reader.load_index). Индекс дописывается
+        вместе с пакетом записей, а при ротации переименовывается вместе
+        с частью лога (chat_app_YYYY-MM-DD.N.jsonl.idx), поэтому поиск
+        (log_reader.query_logs) переходит сразу к нужным минутам.
+    """
+
+    EXTENSION = ".jsonl"
+    INDEX_SUFFIX = ".idx"
+
+    def __init__(self, *args, **kwargs):
+        self.index = None          # Файл индекса текущей части лога
+        self.index_minute = None   # Минута последней записи
+        self.index_levels = set()  # Уровни, уже отмеченные в этой минуте
+        super().__init__(*args, **kwargs)
+        self._open_index()
+
+    def _open(self):
+        # Двоичный режим: позиция файла - точное смещение записи в байтах
+        return open(self.baseFilename, "ab")
+
+    def _index_path(self, path) -> Path:
+        """
+            Путь индекса для файла лога (chat_app_....jsonl -> chat_app_....jsonl.idx).
+        """
+        path = Path(path)
+        return path.with_name(path.name + self.INDEX_SUFFIX)
+
+    def _open_index(self):
+        """
+            Открытие индекса текущего файла на дозапись. Если индекса нет,
+            а файл не пуст (например, индекс был удален), он строится заново.
+        """
+        path = self._index_path(self.baseFilename)
+        data = Path(self.baseFilename)
+        self.index_minute, self.index_levels = None, set()
+
+        if not path.exists() and data.exists() and data.stat().st_size:
+            self._rebuild_index(data, path)
+        else:
+            # Продолжение минуты, на которой остановилась прошлая запись
+            minutes, levels = load_index(path)
+            if minutes:
+                self.index_minute, offset = minutes[-1]
+                self.index_levels = {
+                    level for level, entries in levels.items() if entries and entries[-1][1] >= offset
+                }
+        self.index = open(path, "a", encoding="utf-8")
+
+    def _rebuild_index(self, data: Path, path: Path):
+        """
+            Построение индекса по содержимому файла лога.
+        """
+        with open(data, "rb") as source, open(path, "w", encoding="utf-8") as self.index:
+            offset = 0
+            for line in source:
+                try:
+                    entry = json.loads(line)
+                    self._mark(entry['ts'], entry['level'], offset)
+                except (ValueError, KeyError, TypeError):
+                    pass  # Поврежденная строка (например, после аварийного завершения)
+                offset += len(line)
+
+    def _close_index(self):
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+
+    def _mark(self, created: float, level: str, offset: int):
+        """
+            Отметка записи в индексе, если с нее начинается минута
+            или первый в этой минуте уровень.
+        """
+        minute = int(created // 60) * 60
+        if minute != self.index_minute:
+            self.index_minute, self.index_levels = minute, set()
+            self.index.write(f"M {minute} {offset}\n")
+        if level not in self.index_levels:
+            self.index_levels.add(level)
+            self.index.write(f"L {level} {minute} {offset}\n")
+
+    def emit(self, record):
+        try:
+            if record.created >= self.rollover_at:
+                self.rollover()
+            if self.stream is None:
+                self.stream = self._open()
+            data = (self.format(record) + "\n").encode("utf-8")
+            self._mark(record.created, record.levelname, self.stream.tell())
+            self.stream.write(data)
+        except Exception:
+            self.handleError(record)
+
+    def _flush_stream(self):
+        super()._flush_stream()
+        # Индекс сбрасывается после данных: смещения не указывают за конец файла
+        if self.index is not None:
+            self.index.flush()
+
+    def _retire(self, path: Path, date: str) -> Path:
+        target = super()._retire(path, date)
+        index = self._index_path(path)
+        if index.exists():
+            # chat_app_....jsonl.idx -> chat_app_....N.jsonl.idx
+            index.replace(self._index_path(target.with_suffix("")))
+        return target
+
+    def rollover(self):
+        self.acquire()
+        try:
+            self._close_index()
+            super().rollover()
+            self._open_index()
+        finally:
+            self.release()
+
+    def _archive_removed(self, archive: Path):
+        self._index_path(archive.with_suffix("")).unlink(missing_ok=True)
+
+    def close(self):
+        super().close()
+        self._close_index()
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+        Постановка записей в очередь без форматирования в вызывающем потоке.
+
+        Стандартный QueueHandler форматирует и копирует каждую запись.
+        Сообщения приложения - уже готовые строки, поэтому запись передается
+        как есть; подготовка нужна только при аргументах форматирования
+        и исключениях (стек вызовов форматируется сразу, пока он доступен).
+    """
+
+    def prepare(self, record):
+        if record.args or record.exc_info:
+            return super().prepare(record)
+        return record
+
+
+class BatchQueueListener(logging.handlers.QueueListener):
+    """
+        Фоновая запись логов из очереди с пакетным сбросом в файл.
+    """
+
+    def __init__(self, log_queue, *handlers, batch_size: int = 500):
+        """
+            Args:
+                log_queue: Очередь записей лога
+                *handlers: Обработчики, которым передаются записи
+                batch_size (int): Максимальное число записей между сбросами в файл
+        """
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.unflushed = 0  # Записей с последнего сброса
+
+    def dequeue(self, block):
+        """
+            Получение следующей записи. Если очередь опустела, перед
+            ожиданием накопленный пакет сбрасывается в файл.
+        """
+        try:
+            return self.queue.get(block=False)
+        except queue.Empty:
+            if not block:
+                raise
+        self.flush_handlers()
+        return self.queue.get(block=True)
+
+    def handle(self, record):
+        # Запрос AppLogger.flush: все записи до него уже обработаны
+        if isinstance(record, threading.Event):
+            self.unflushed = max(self.unflushed, 1)
+            self.flush_handlers()
+            record.set()
+            return
+
+        super().handle(record)
+        self.unflushed += 1
+        if self.unflushed >= self.batch_size:
+            self.flush_handlers()
+
+    def flush_handlers(self):
+        """
+            Сброс буферов всех обработчиков.
+        """
+        if not self.unflushed:
+            return
+        self.unflushed = 0
+        for handler in self.handlers:
+            if isinstance(handler, BatchFileHandler):
+                handler.flush_batch()
+            else:
+                handler.flush()
+
+    @property
+    def running(self) -> bool:
+        """
+            Запущен ли фоновый поток записи.
+        """
+        return self._thread is not None
+
+    def stop(self):
+        """
+            Запись оставшихся в очереди записей и остановка потока.
+        """
+        if not self.running:
+            return
+        super().stop()
+        self.unflushed = max(self.unflushed, 1)
+        self.flush_handlers()
+
+
 class AppLogger:
     """
         Класс для логирования работы приложения.
@@ -12,7 +446,17 @@ class AppLogger:
             - Вывод логов в консоль
             - Различные уровни логирования (debug, info, warning, error)
             - Форматирование сообщений с временными метками
+            - Запись в файл и консоль в фоновом потоке (вызов лога не ждет диска)
+            - Структурированный лог (JSON lines) с индексом и поиск по нему (query)
     """
+
+    # Фоновая запись логов (общая для всех экземпляров, как и логгер "my_app")
+    listener = None
+
+    # Ротация и ограничение места на диске
+    MAX_FILE_BYTES = 10 * 1024 * 1024     # Размер файла, после которого он сжимается
+    MAX_TOTAL_BYTES = 100 * 1024 * 1024   # Общий размер папки логов
+    MAX_AGE_DAYS = 14                     # Сколько дней хранить сжатые логи
     
     def __init__(self):
         """
@@ -33,11 +477,6 @@ class AppLogger:
         self.logs_dir = base_dir / "logs"
         self.logs_dir.mkdir(parents=True, exist_ok=True) # Создаем папку, если нет
             
-        # Формирование имени файла лога с текущей датой
-        # Формат: chat_app_YYYY-MM-DD.log
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        log_file = str(self.logs_dir / f"chat_app_{current_date}.log")
-
         self.logger = logging.getLogger("my_app")  # Создание логгера с именем
         self.logger.setLevel(logging.DEBUG)     # Установка уровня логирования
 
@@ -51,19 +490,37 @@ class AppLogger:
             )
 
             # Создание и настройка обработчика для записи в файл
-            file_handler = logging.FileHandler(
-                log_file,           # Путь к файлу лога
-                encoding='utf-8'    # Кодировка для поддержки Unicode
+            # Формат имени: chat_app_YYYY-MM-DD.log, после ротации - chat_app_YYYY-MM-DD.N.log.gz
+            file_handler = RotatingLogFileHandler(
+                self.logs_dir,          # Папка логов
+                self.MAX_FILE_BYTES,    # Ротация по размеру
+                self.MAX_TOTAL_BYTES,   # Ограничение общего размера
+                self.MAX_AGE_DAYS       # Ограничение возраста архивов
             )
             file_handler.setFormatter(formatter)  # Установка форматирования
 
+            # Структурированный лог с индексом для поиска (AppLogger.query)
+            # Формат имени: chat_app_YYYY-MM-DD.jsonl и индекс chat_app_YYYY-MM-DD.jsonl.idx
+            json_handler = JsonLinesFileHandler(
+                self.logs_dir,
+                self.MAX_FILE_BYTES,
+                self.MAX_TOTAL_BYTES,
+                self.MAX_AGE_DAYS
+            )
+            json_handler.setFormatter(JsonFormatter())
+
             # Создание и настройка обработчика для вывода в консоль
             console_handler = logging.StreamHandler()
             console_handler.setFormatter(formatter)  # Установка того же форматирования
 
+            # Файл и консоль обслуживает фоновый поток, логгер только ставит записи в очередь
+            log_queue = queue.SimpleQueue()
+            AppLogger.listener = BatchQueueListener(log_queue, file_handler, json_handler, console_handler)
+            AppLogger.listener.start()
+            atexit.register(AppLogger.listener.stop)  # Запись оставшихся логов при выходе
+
             # Настройка основного логгера приложения
-            self.logger.addHandler(file_handler)        # Добавление файлового обработчика
-            self.logger.addHandler(console_handler)     # Добавление консольного обработчика
+            self.logger.addHandler(LazyQueueHandler(log_queue))  # Добавление обработчика очереди
             self.logger.propagate = False               # Блокировка отправки логов к root
     
     def info(self, message: str):
@@ -123,3 +580,40 @@ class AppLogger:
                 message (str): Текст предупреждения
         """
         self.logger.warning(message)
+
+    def flush(self, timeout: float = None):
+        """
+            Ожидание записи в файл всех поставленных в очередь сообщений
+            (например, перед чтением файла лога).
+
+            Args:
+                timeout (float): Максимальное время ожидания в секундах
+        """
+        listener = AppLogger.listener
+        if listener is None or not listener.running:
+            return
+        done = threading.Event()
+        listener.queue.put(done)
+        done.wait(timeout)
+
+    def query(self, level=None, since=None, until=None, contains: str = None, limit: int = 500) -> list:
+        """
+            Поиск записей структурированного лога по уровню, времени и тексту.
+
+            Индекс позволяет читать только минуты, где есть записи нужного
+            уровня, поэтому, например, ошибки за последний час находятся без
+            просмотра всего файла. Вызов читает диск - из интерфейса его
+            следует выполнять в пуле потоков.
+
+            Args:
+                level (str | int): Минимальный уровень ("ERROR", logging.WARNING и т.д.)
+                since (datetime | float): Начало периода
+                until (datetime | float): Конец периода
+                contains (str): Подстрока сообщения (без учета регистра)
+                limit (int): Максимальное количество записей (последние)
+
+            Returns:
+                list: Записи по времени - словари с ключами ts, time, level, message
+        """
+        self.flush(timeout=1)  # Дожидаемся записи очереди логов
+        return query_logs(self.logs_dir, level, since, until, contains, limit)
@@ -0,0 +1,304 @@
+# Импорт необходимых библиотек
+import threading                                                  # Фоновый поток HTTP-сервера
+import time                                                       # Время работы приложения
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Локальный HTTP-сервер метрик
+from histogram import LatencyHistogram                            # Гистограммы задержек приложения
+
+# Границы корзин гистограмм Prometheus (le) по умолчанию - для времени в секундах
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Границы корзин для скорости генерации (токенов в секунду)
+RATE_BUCKETS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 200.0, 500.0)
+
+# Формат ответа: текстовый формат Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    """
+        Экранирование значения метки.
+    """
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict) -> str:
+    """
+        Метки в формате {name="value",...} (пустая строка без меток).
+    """
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value) -> str:
+    """
+        Число в формате Prometheus.
+    """
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+        Реестр метрик в текстовом формате Prometheus.
+
+        Значения не копятся в реестре, а собираются при запросе: каждый
+        сборщик читает уже существующие счетчики и гистограммы приложения
+        (Analytics, PerformanceMonitor, WriteBehindWriter и т.д.).
+        Поэтому отправка сообщения ничего не платит за экспорт метрик.
+
+        Сборщик - функция без аргументов, возвращающая список семейств
+        метрик (name, type, help, samples):
+            - для counter и gauge samples - список (метки, значение)
+            - для histogram samples - список (метки, LatencyHistogram, границы корзин)
+    """
+
+    def __init__(self):
+        """
+            Инициализация пустого реестра.
+        """
+        self.collectors = []  # Функции сбора метрик
+
+    def register(self, collector):
+        """
+            Добавление сборщика метрик.
+
+            Args:
+                collector: Функция без аргументов, возвращающая список семейств метрик
+        """
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        """
+            Сбор всех метрик в текстовом формате Prometheus.
+        """
+        lines = []
+        for collector in self.collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "histogram":
+                    for labels, histogram, bounds in samples:
+                        lines.extend(self._histogram_lines(name, labels, histogram, bounds))
+                else:
+                    for labels, value in samples:
+                        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _histogram_lines(name: str, labels: dict, histogram: LatencyHistogram, bounds: tuple) -> list:
+        """
+            Строки гистограммы Prometheus из логарифмических корзин LatencyHistogram.
+
+            Корзина попадает под границу le по своему представительному значению,
+            поэтому счетчики и сумма точны с ошибкой RELATIVE_ACCURACY.
+        """
+        cumulative = [0] * len(bounds)
+        total = 0.0
+        for index, count in histogram.counts.items():
+            value = histogram.bucket_value(index)
+            total += value * count
+            for i, bound in enumerate(bounds):
+                if value <= bound:
+                    cumulative[i] += count
+
+        lines = [
+            f"{name}_bucket{_labels({**labels, 'le': _number(float(bound))})} {cumulative[i]}"
+            for i, bound in enumerate(bounds)
+        ]
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        return lines
+
+
+def _copy(histogram: LatencyHistogram) -> LatencyHistogram:
+    """
+        Копия гистограммы (снимается под блокировкой владельца).
+    """
+    result = LatencyHistogram()
+    result.merge(histogram)
+    return result
+
+
+def analytics_collector(analytics):
+    """
+        Сборщик метрик аналитики: запросы и токены по моделям, гистограммы задержек.
+
+        Args:
+            analytics (Analytics): Система аналитики приложения
+    """
+    def collect():
+        with analytics.lock:
+            usage = {model: dict(data) for model, data in analytics.model_usage.items()}
+            cache_stats = dict(analytics.cache_stats)
+            latency = {
+                model: {metric: _copy(histogram) for metric, histogram in metrics.items()}
+                for model, metrics in analytics.latency.items()
+            }
+
+        def histograms(metric, bounds):
+            return [
+                ({'model': model}, metrics[metric], bounds)
+                for model, metrics in sorted(latency.items()) if metric in metrics
+            ]
+
+        return [
+            ("chat_requests_total", "counter", "Requests to models (cache hits excluded)",
+             [({'model': model}, data['count']) for model, data in sorted(usage.items())]),
+            ("chat_tokens_total", "counter", "Tokens used by model",
+             [({'model': model}, data['tokens']) for model, data in sorted(usage.items())]),
+            ("chat_response_cache_hits_total", "counter", "Answers served from the response cache",
+             [({}, cache_stats['hits'])]),
+            ("chat_response_cache_saved_tokens_total", "counter", "Tokens saved by the response cache",
+             [({}, cache_stats['saved_tokens'])]),
+            ("chat_response_time_seconds", "histogram", "Full response time by model",
+             histograms('response_time', SECONDS_BUCKETS)),
+            ("chat_ttft_seconds", "histogram", "Time to first token by model",
+             histograms('ttft', SECONDS_BUCKETS)),
+            ("chat_tokens_per_second", "histogram", "Generation speed by model",
+             histograms('tokens_per_second', RATE_BUCKETS)),
+        ]
+    return collect
+
+
+def monitor_collector(monitor):
+    """
+        Сборщик метрик монитора: ресурсы процесса, задержка цикла событий, обновления UI.
+
+        Args:
+            monitor (PerformanceMonitor): Монитор производительности
+    """
+    def collect():
+        with monitor.lock:
+            sample = monitor.history.latest() or {}
+            loop_lag = _copy(monitor.loop_lag)
+            ui_updates = _copy(monitor.ui_updates)
+            slow_callbacks = len(monitor.slow_callbacks)
+
+        families = [
+            ("process_uptime_seconds", "gauge", "Application uptime",
+             [({}, time.time() - monitor.start_time)]),
+            ("event_loop_lag_seconds", "histogram", "Event loop scheduling lag",
+             [({}, loop_lag, SECONDS_BUCKETS)]),
+            ("ui_update_seconds", "histogram", "Duration of page.update() calls",
+             [({}, ui_updates, SECONDS_BUCKETS)]),
+            ("event_loop_slow_callbacks", "gauge", "Recent handler steps that blocked the event loop",
+             [({}, slow_callbacks)]),
+        ]
+        if sample:
+            families += [
+                ("process_cpu_percent", "gauge", "Process CPU usage", [({}, sample['cpu_percent'])]),
+                ("process_memory_percent", "gauge", "Process memory usage", [({}, sample['memory_percent'])]),
+                ("process_threads", "gauge", "Process thread count", [({}, sample['thread_count'])]),
+            ]
+        return families
+    return collect
+
+
+def writer_collector(writer):
+    """
+        Сборщик метрик фоновой записи в базу.
+
+        Args:
+            writer (WriteBehindWriter): Фоновая запись ChatCache
+    """
+    def collect():
+        with writer.stats_lock:
+            latency = _copy(writer.batch_latency)
+            written, failed = writer.written, writer.failed
+        return [
+            ("db_write_batch_seconds", "histogram", "Write-behind batch commit time",
+             [({}, latency, SECONDS_BUCKETS)]),
+            ("db_writes_total", "counter", "Write operations by outcome",
+             [({'outcome': 'ok'}, written), ({'outcome': 'error'}, failed)]),
+            ("db_write_queue", "gauge", "Operations waiting in the write-behind queue",
+             [({}, writer.queue.qsize())]),
+        ]
+    return collect
+
+
+def notifications_collector(service, outbox=None):
+    """
+        Сборщик итогов отправки уведомлений.
+
+        Args:
+            service (NotificationService): Сервис уведомлений
+            outbox (NotificationOutbox): Очередь уведомлений
+    """
+    def collect():
+        outcomes = dict(service.outcomes)
+        families = [
+            ("notifications_total", "counter", "Notification attempts by channel and outcome",
+             [({'channel': channel, 'outcome': outcome}, count)
+              for (channel, outcome), count in sorted(outcomes.items())]),
+        ]
+        if outbox is not None:
+            families.append(
+                ("notifications_outbox_pending", "gauge", "Notifications queued or being sent",
+                 [({}, outbox.pending)])
+            )
+        return families
+    return collect
+
+
+class MetricsServer:
+    """
+        Локальный HTTP-сервер метрик (GET /metrics) в фоновом потоке.
+
+        Слушает только localhost: метрики предназначены для сборщика
+        на той же машине и не должны быть доступны из сети.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = "127.0.0.1"):
+        """
+            Args:
+                registry (MetricsRegistry): Реестр метрик
+                port (int): Порт сервера (0 - выбрать свободный)
+                host (str): Адрес сервера. По умолчанию: 127.0.0.1
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """
+            Запуск сервера в фоновом потоке.
+        """
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Запросы сборщика не засоряют журнал
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]  # Фактический порт (если был 0)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+            Остановка сервера.
+        """
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.server = None
+        self.thread = None
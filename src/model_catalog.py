@@ -0,0 +1,133 @@
+# Импорт необходимых библиотек
+import json                    # Библиотека для работы с JSON форматом
+import os                      # Библиотека для работы с системой
+import time                    # Библиотека для работы с временными метками
+from pathlib import Path       # Библиотека для работы с системными путями
+from logger import AppLogger   # Импорт собственного логгера для отслеживания работы
+
+
+class ModelCatalogCache:
+    """
+        Класс для хранения каталога моделей OpenRouter на диске.
+
+        Обеспечивает:
+            - Мгновенную загрузку списка моделей при старте из файла
+            - Проверку свежести по времени жизни (TTL)
+            - Хранение валидаторов (ETag/Last-Modified) для условных запросов
+            - Атомарную запись файла, чтобы не получить "битый" кэш
+    """
+
+    def __init__(self, ttl: float = 6 * 60 * 60):
+        """
+            Инициализация кэша каталога моделей.
+
+            Args:
+                ttl (float): Время жизни кэша в секундах. По умолчанию: 6 часов
+        """
+        # Инициализация логгера для отслеживания работы кэша
+        self.logger = AppLogger()
+
+        # Получаем путь до хранилища (файл лежит рядом с chat_cache.db)
+        storage_path = os.getenv("FLET_APP_STORAGE_DATA")
+        base_dir = Path(storage_path) if storage_path else Path(".")
+
+        self.path = base_dir / "models_cache.json"  # Путь к файлу кэша
+        self.ttl = ttl                               # Время жизни кэша
+
+        self.models = None         # Список моделей из кэша
+        self.etag = None           # Валидатор ETag последнего ответа
+        self.last_modified = None  # Валидатор Last-Modified последнего ответа
+        self.fetched_at = 0.0      # Время последней успешной проверки каталога
+
+        # Загрузка кэша с диска при инициализации
+        self.load()
+
+    def load(self):
+        """
+            Загрузка каталога моделей из файла.
+
+            Returns:
+                list | None: Список моделей или None, если кэша нет или он поврежден
+        """
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.models = data["models"]
+            self.etag = data.get("etag")
+            self.last_modified = data.get("last_modified")
+            self.fetched_at = float(data.get("fetched_at", 0.0))
+            self.logger.debug(f"Loaded {len(self.models)} models from catalog cache")
+        except FileNotFoundError:
+            self.models = None
+        except Exception as e:
+            # Поврежденный кэш просто игнорируется - каталог будет загружен заново
+            self.logger.warning(f"Не удалось прочитать кэш моделей: {e}")
+            self.models = None
+        return self.models
+
+    def is_fresh(self) -> bool:
+        """
+            Проверка свежести кэша.
+
+            Returns:
+                bool: True, если кэш есть и его TTL не истек
+        """
+        return bool(self.models) and (time.time() - self.fetched_at) < self.ttl
+
+    def validators(self) -> dict:
+        """
+            Заголовки для условного запроса каталога.
+
+            Returns:
+                dict: Заголовки If-None-Match / If-Modified-Since (если известны)
+        """
+        headers = {}
+        # Без сохраненного списка ответ 304 бесполезен
+        if not self.models:
+            return headers
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def save(self, models: list, etag: str = None, last_modified: str = None):
+        """
+            Сохранение нового каталога моделей.
+
+            Args:
+                models (list): Список моделей
+                etag (str): Значение заголовка ETag ответа
+                last_modified (str): Значение заголовка Last-Modified ответа
+        """
+        self.models = models
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.time()
+        self._write()
+
+    def touch(self):
+        """
+            Продление срока жизни кэша после ответа 304 Not Modified.
+        """
+        self.fetched_at = time.time()
+        self._write()
+
+    def _write(self):
+        """
+            Атомарная запись кэша на диск (через временный файл).
+        """
+        try:
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(
+                json.dumps({
+                    "fetched_at": self.fetched_at,        # Время проверки
+                    "etag": self.etag,                    # Валидатор ETag
+                    "last_modified": self.last_modified,  # Валидатор Last-Modified
+                    "models": self.models                 # Список моделей
+                }, ensure_ascii=False),
+                encoding="utf-8"
+            )
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            # Ошибка записи кэша не должна ломать работу приложения
+            self.logger.warning(f"Не удалось сохранить кэш моделей: {e}")
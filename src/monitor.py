@@ -1,8 +1,15 @@
 # Импорт необходимых библиотек
 import time        # Библиотека для работы с временными метками и измерения интервалов
+import asyncio     # Замер задержки цикла событий
+import types       # Генераторная сопрограмма для пошагового замера обработчиков
 from datetime import datetime  # Библиотека для работы с датой и временем
 import threading   # Библиотека для работы с потоками
 import sys
+from array import array                # Предвыделенные массивы кольцевого буфера
+from collections import deque          # Монотонная очередь для максимума в окне
+from contextlib import contextmanager  # Декоратор для создания контекстных менеджеров
+from histogram import LatencyHistogram # Перцентили задержек цикла событий и обновлений UI
+from logger import AppLogger           # Импорт собственного логгера для отслеживания работы
 
 # Безопасный импорт psutil
 try:
@@ -11,6 +18,113 @@ try:
 except ImportError:
     PSUTIL_AVAILABLE = False
 
+
+class MetricsRing:
+    """
+    Кольцевой буфер замеров метрик фиксированного размера.
+
+    Каждое поле хранится в предвыделенном массиве, новый замер
+    перезаписывает самый старый. Для окна буфера поддерживаются
+    текущие суммы (среднее за O(1)) и монотонные очереди (максимум
+    за O(1) амортизированно).
+    """
+
+    FIELDS = ('cpu_percent', 'memory_percent', 'thread_count')
+
+    def __init__(self, capacity: int = 1000, fields: tuple = None):
+        """
+        Args:
+            capacity (int): Максимальное количество хранимых замеров
+            fields (tuple): Названия полей замера. По умолчанию: FIELDS
+        """
+        if fields is not None:
+            self.FIELDS = fields
+        self.capacity = capacity
+        self.timestamps = array('d', [0.0]) * capacity                     # Время замера (epoch)
+        self.values = {name: array('d', [0.0]) * capacity for name in self.FIELDS}
+        self.sums = {name: 0.0 for name in self.FIELDS}                   # Текущие суммы по окну
+        self.maxima = {name: deque() for name in self.FIELDS}             # (номер замера, значение)
+        self.head = 0    # Индекс следующей записи
+        self.size = 0    # Количество замеров в буфере
+        self.total = 0   # Количество замеров за все время (номер следующего замера)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, timestamp: float, **values):
+        """
+        Запись замера поверх самого старого.
+
+        Args:
+            timestamp (float): Время замера (epoch)
+            **values: Значения полей FIELDS
+        """
+        for name in self.FIELDS:
+            value = float(values.get(name, 0.0))
+            column = self.values[name]
+
+            # Обновление текущей суммы: вычитаем вытесняемое значение
+            if self.size == self.capacity:
+                self.sums[name] -= column[self.head]
+            self.sums[name] += value
+            column[self.head] = value
+
+            # Монотонная очередь: убираем меньшие значения и вышедшие из окна
+            maxima = self.maxima[name]
+            while maxima and maxima[-1][1] <= value:
+                maxima.pop()
+            maxima.append((self.total, value))
+            while maxima[0][0] <= self.total - self.capacity:
+                maxima.popleft()
+
+        self.timestamps[self.head] = timestamp
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.total += 1
+
+        # Периодический пересчет сумм, чтобы не копилась ошибка округления
+        if self.total % self.capacity == 0:
+            for name in self.FIELDS:
+                self.sums[name] = sum(self.values[name][:self.size])
+
+    def average(self, name: str) -> float:
+        """
+        Среднее значение поля по окну буфера за O(1).
+        """
+        return self.sums[name] / self.size if self.size else 0.0
+
+    def maximum(self, name: str) -> float:
+        """
+        Максимум поля по окну буфера за O(1).
+        """
+        return self.maxima[name][0][1] if self.maxima[name] else 0.0
+
+    def latest(self) -> dict:
+        """
+        Последний замер или None, если замеров нет.
+        """
+        if not self.size:
+            return None
+        index = (self.head - 1) % self.capacity
+        sample = {name: self.values[name][index] for name in self.FIELDS}
+        sample['timestamp'] = self.timestamps[index]
+        return sample
+
+    def items(self):
+        """
+        Замеры от старых к новым.
+
+        Yields:
+            dict: timestamp (epoch) и значения полей
+        """
+        start = (self.head - self.size) % self.capacity
+        for offset in range(self.size):
+            index = (start + offset) % self.capacity
+            sample = {name: self.values[name][index] for name in self.FIELDS}
+            sample['timestamp'] = self.timestamps[index]
+            yield sample
+
+
 class PerformanceMonitor:
     """
     Класс для мониторинга производительности приложения.
@@ -22,8 +136,11 @@ class PerformanceMonitor:
     - Время работы приложения
     - Общее состояние системы
     """
+
+    # Ошибки фоновых замеров пишутся в лог не чаще раза в столько секунд
+    SAMPLER_ERROR_LOG_INTERVAL = 60.0
     
-    def __init__(self):
+    def __init__(self, sample_interval: float = 5.0, history_size: int = 1000):
         """
         Инициализация системы мониторинга производительности.
         
@@ -32,9 +149,41 @@ class PerformanceMonitor:
         - Хранилище истории метрик
         - Отслеживание текущего процесса
         - Пороговые значения для метрик
+
+        Args:
+            sample_interval (float): Интервал фоновых замеров в секундах
+            history_size (int): Количество хранимых замеров (размер кольцевого буфера)
         """
+        self.logger = AppLogger()  # Логгер ошибок фоновых замеров
         self.start_time = time.time()  # Сохранение времени запуска для расчета uptime
-        self.metrics_history = []      # Список для хранения истории метрик
+        self.history = MetricsRing(history_size)  # Кольцевой буфер истории метрик
+
+        # Фоновые замеры с фиксированным интервалом
+        self.sample_interval = sample_interval
+        self.sampler_thread = None
+        self.sampler_stop = threading.Event()
+        self.sampler_errors = 0          # Ошибок замера, не попавших в лог
+        self.sampler_error_logged = None # Время последней записи ошибки замера в лог (monotonic)
+        self.lock = threading.Lock()  # Замер и чтение истории из разных потоков
+
+        # Затраты на сами замеры
+        self.sampling_stats = {
+            'samples': 0,        # Количество замеров
+            'total_cost': 0.0,   # Суммарное время замеров (секунды)
+            'max_cost': 0.0,     # Самый долгий замер (секунды)
+            'started': None      # Начало фоновых замеров (perf_counter)
+        }
+
+        # Отзывчивость цикла событий и интерфейса
+        self.loop_lag = LatencyHistogram()     # Задержка запланированного вызова (секунды)
+        self.ui_updates = LatencyHistogram()   # Длительность page.update() (секунды)
+        self.responsiveness = {
+            'loop_lag': MetricsRing(120, fields=('loop_lag',)),        # Последние замеры задержки цикла
+            'page_update': MetricsRing(200, fields=('page_update',)),  # Последние обновления страницы
+        }
+        self.slow_callbacks = deque(maxlen=50)  # (время, обработчик, длительность шага)
+        self.loop_watch_interval = 0.5          # Интервал замера задержки цикла в секундах
+        self.loop_watch_running = False
 
         # Получаем процесс только если библиотека доступна
         if PSUTIL_AVAILABLE:
@@ -42,16 +191,27 @@ class PerformanceMonitor:
         else:
             self.process = None
 
+        # Длительность этапов запуска приложения (в секундах)
+        self.startup_started = time.perf_counter()  # Момент начала запуска
+        self.startup_stages = {}                    # Название этапа -> длительность
+
         # Пороговые значения для определения проблем с производительностью
         self.thresholds = {
             'cpu_percent': 80.0,    # Максимально допустимый процент использования CPU
             'memory_percent': 75.0,  # Максимально допустимый процент использования памяти
-            'thread_count': 50      # Максимально допустимое количество потоков
+            'thread_count': 50,     # Максимально допустимое количество потоков
+            'loop_lag': 0.25,       # Максимально допустимая задержка цикла событий (секунды)
+            'page_update': 0.1,     # Максимально допустимое среднее время page.update() (секунды)
+            'slow_callback': 0.1,   # Шаг обработчика дольше этого блокирует цикл событий (секунды)
+            'slow_callback_window': 60  # За сколько секунд учитывать медленные обработчики
         }
 
     def get_metrics(self) -> dict:
         """
         Получение текущих метрик производительности.
+
+        Если работают фоновые замеры, возвращается последний замер
+        (без обращения к системе), иначе замер выполняется сейчас.
         
         Returns:
             dict: Словарь с текущими метриками:
@@ -77,24 +237,23 @@ class PerformanceMonitor:
             }
 
         try:
-            # Сбор текущих метрик производительности
-            metrics = {
-                'timestamp': datetime.now(),              # Время замера
-                'cpu_percent': self.process.cpu_percent(),    # Загрузка CPU
-                'memory_percent': self.process.memory_percent(),  # Использование памяти
-                'thread_count': len(self.process.threads()),  # Количество потоков
+            if self.sampler_running:
+                with self.lock:
+                    sample = self.history.latest()
+            else:
+                sample = self.sample()
+
+            if sample is None:
+                sample = self.sample()
+
+            return {
+                'timestamp': datetime.fromtimestamp(sample['timestamp']),  # Время замера
+                'cpu_percent': sample['cpu_percent'],        # Загрузка CPU
+                'memory_percent': sample['memory_percent'],  # Использование памяти
+                'thread_count': int(sample['thread_count']), # Количество потоков
                 'uptime': time.time() - self.start_time      # Время работы
             }
             
-            # Сохранение метрик в историю
-            self.metrics_history.append(metrics)
-            
-            # Ограничение размера истории последними 1000 записями
-            if len(self.metrics_history) > 1000:
-                self.metrics_history.pop(0)  # Удаление самой старой записи
-                
-            return metrics
-            
         except Exception as e:
             # Возврат информации об ошибке при сборе метрик
             return {
@@ -102,6 +261,308 @@ class PerformanceMonitor:
                 'timestamp': datetime.now()
             }
 
+    def sample(self) -> dict:
+        """
+        Замер метрик процесса и запись в кольцевой буфер.
+        Учитывает время, затраченное на сам замер.
+
+        Returns:
+            dict: Замер (timestamp в секундах от эпохи)
+        """
+        started = time.perf_counter()
+        sample = {
+            'timestamp': time.time(),
+            'cpu_percent': self.process.cpu_percent(),        # Загрузка CPU с прошлого замера
+            'memory_percent': self.process.memory_percent(),  # Использование памяти
+            'thread_count': self.process.num_threads(),       # Количество потоков
+        }
+        with self.lock:
+            self.history.append(**sample)
+            cost = time.perf_counter() - started
+            self.sampling_stats['samples'] += 1
+            self.sampling_stats['total_cost'] += cost
+            self.sampling_stats['max_cost'] = max(self.sampling_stats['max_cost'], cost)
+        return sample
+
+    @property
+    def sampler_running(self) -> bool:
+        """
+        Работают ли фоновые замеры.
+        """
+        return self.sampler_thread is not None and self.sampler_thread.is_alive()
+
+    def start_sampler(self, interval: float = None) -> bool:
+        """
+        Запуск фоновых замеров с фиксированным интервалом.
+
+        Args:
+            interval (float): Интервал замеров в секундах. По умолчанию: sample_interval
+
+        Returns:
+            bool: True, если замеры запущены (False без psutil)
+        """
+        if not PSUTIL_AVAILABLE or not self.process:
+            return False
+        if self.sampler_running:
+            return True
+        if interval is not None:
+            self.sample_interval = interval
+
+        self.sampler_stop.clear()
+        self.sampling_stats['started'] = time.perf_counter()
+        self.sampler_thread = threading.Thread(target=self._sampler_loop, name="metrics-sampler", daemon=True)
+        self.sampler_thread.start()
+        return True
+
+    def stop_sampler(self):
+        """
+        Остановка фоновых замеров.
+        """
+        if self.sampler_thread is None:
+            return
+        self.sampler_stop.set()
+        self.sampler_thread.join()
+        self.sampler_thread = None
+
+    def _sampler_loop(self):
+        """
+        Цикл фонового потока замеров.
+        Следующий замер планируется от времени предыдущего, поэтому
+        затраты на замер не сдвигают интервал.
+        """
+        next_time = time.monotonic()
+        while not self.sampler_stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                # Процесс мог быть недоступен в момент замера, пробуем в следующий раз.
+                # В лог пишется первая ошибка, затем не чаще раза в SAMPLER_ERROR_LOG_INTERVAL
+                self.sampler_errors += 1
+                now = time.monotonic()
+                if self.sampler_error_logged is None or now - self.sampler_error_logged >= self.SAMPLER_ERROR_LOG_INTERVAL:
+                    self.logger.warning(f"Ошибка фонового замера метрик (ошибок с прошлой записи: {self.sampler_errors}): {e}")
+                    self.sampler_errors = 0
+                    self.sampler_error_logged = now
+            next_time += self.sample_interval
+            self.sampler_stop.wait(max(0.0, next_time - time.monotonic()))
+
+    def get_sampling_stats(self) -> dict:
+        """
+        Затраты на замеры метрик.
+
+        Returns:
+            dict: Словарь:
+                - samples: количество замеров
+                - avg_cost_ms: среднее время замера в миллисекундах
+                - max_cost_ms: максимальное время замера в миллисекундах
+                - overhead_percent: доля времени на замеры от времени работы фоновых замеров
+        """
+        with self.lock:
+            stats = dict(self.sampling_stats)
+        elapsed = time.perf_counter() - stats['started'] if stats['started'] else 0.0
+        return {
+            'samples': stats['samples'],
+            'avg_cost_ms': stats['total_cost'] / stats['samples'] * 1000 if stats['samples'] else 0.0,
+            'max_cost_ms': stats['max_cost'] * 1000,
+            'overhead_percent': stats['total_cost'] / elapsed * 100 if elapsed > 0 else 0.0
+        }
+
+    async def watch_event_loop(self, interval: float = None):
+        """
+        Замер задержки цикла событий: насколько позже запланированного
+        просыпается sleep. Задержка означает, что цикл был занят
+        синхронной работой (запросы к базе, отрисовка и т.п.).
+
+        Работает до вызова stop_loop_watch.
+
+        Args:
+            interval (float): Интервал замеров в секундах. По умолчанию: loop_watch_interval
+        """
+        if interval is not None:
+            self.loop_watch_interval = interval
+        loop = asyncio.get_running_loop()
+        self.loop_watch_running = True
+        while self.loop_watch_running:
+            started = loop.time()
+            await asyncio.sleep(self.loop_watch_interval)
+            lag = max(0.0, loop.time() - started - self.loop_watch_interval)
+            with self.lock:
+                self.loop_lag.record(lag)
+                self.responsiveness['loop_lag'].append(time.time(), loop_lag=lag)
+
+    def stop_loop_watch(self):
+        """
+        Остановка замеров задержки цикла событий (после ближайшего замера).
+        """
+        self.loop_watch_running = False
+
+    def record_ui_update(self, duration: float):
+        """
+        Учет длительности одного обновления страницы.
+
+        Args:
+            duration (float): Длительность page.update() в секундах
+        """
+        with self.lock:
+            self.ui_updates.record(duration)
+            self.responsiveness['page_update'].append(time.time(), page_update=duration)
+
+    def record_callback_step(self, name: str, duration: float, logger=None):
+        """
+        Учет шага обработчика события между точками await.
+        Шаги дольше порога считаются блокирующими цикл событий.
+
+        Args:
+            name (str): Имя обработчика
+            duration (float): Длительность шага в секундах
+            logger: Объект логгера для записи предупреждения (необязательно)
+        """
+        if duration < self.thresholds['slow_callback']:
+            return
+        with self.lock:
+            self.slow_callbacks.append((time.time(), name, duration))
+        if logger:
+            logger.warning(f"Slow callback: {name} blocked event loop for {duration * 1000:.0f}ms")
+
+    @types.coroutine
+    def timed_steps(self, coro, name: str, logger=None):
+        """
+        Выполнение сопрограммы с замером каждого шага между точками await.
+
+        Общее время обработчика включает ожидание сети и не говорит
+        о блокировке цикла, поэтому замеряются только отрезки синхронного
+        выполнения (coro.send/throw).
+
+        Args:
+            coro: Сопрограмма обработчика
+            name (str): Имя обработчика для журнала
+            logger: Объект логгера для записи медленных шагов
+        """
+        value, error = None, None
+        while True:
+            started = time.perf_counter()
+            try:
+                if error is None:
+                    future = coro.send(value)
+                else:
+                    future = coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.record_callback_step(name, time.perf_counter() - started, logger)
+
+            try:
+                value, error = (yield future), None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as e:
+                value, error = None, e  # Отмена и ошибки передаются в обработчик
+
+    def instrument_page(self, page, logger=None):
+        """
+        Подключение замеров к странице Flet:
+        - длительность каждого page.update() (в т.ч. через control.update())
+        - блокирующие шаги асинхронных обработчиков событий
+
+        Синхронные обработчики Flet выполняет в пуле потоков,
+        они цикл событий не блокируют.
+
+        Args:
+            page (ft.Page): Страница приложения
+            logger: Объект логгера для записи медленных обработчиков
+        """
+        update = page.update
+        on_event_async = page.on_event_async
+
+        def timed_update(*controls):
+            started = time.perf_counter()
+            try:
+                update(*controls)
+            finally:
+                self.record_ui_update(time.perf_counter() - started)
+
+        async def timed_on_event_async(e):
+            # Имя обработчика события для журнала
+            control = page.get_control(e.target)
+            handler = control.event_handlers.get(e.name) if control else None
+            name = getattr(handler, "__qualname__", None) or f"{e.target}.{e.name}"
+            return await self.timed_steps(on_event_async(e), name, logger)
+
+        page.update = timed_update
+        page.on_event_async = timed_on_event_async
+
+    def get_responsiveness(self) -> dict:
+        """
+        Показатели отзывчивости цикла событий и интерфейса.
+
+        Returns:
+            dict: Словарь:
+                - loop_lag: перцентили задержки цикла (секунды) и max за последние замеры
+                - page_update: перцентили длительности page.update() и среднее за последние обновления
+                - slow_callbacks: медленные обработчики за окно slow_callback_window
+                  в виде (имя, длительность)
+        """
+        with self.lock:
+            since = time.time() - self.thresholds['slow_callback_window']
+            loop_lag = self.loop_lag.quantiles()
+            loop_lag['recent_max'] = self.responsiveness['loop_lag'].maximum('loop_lag')
+            page_update = self.ui_updates.quantiles()
+            page_update['recent_avg'] = self.responsiveness['page_update'].average('page_update')
+            slow_callbacks = [(name, duration) for at, name, duration in self.slow_callbacks if at >= since]
+        return {'loop_lag': loop_lag, 'page_update': page_update, 'slow_callbacks': slow_callbacks}
+
+    @contextmanager
+    def measure_stage(self, name: str):
+        """
+        Контекстный менеджер для замера длительности этапа запуска.
+
+        Пример:
+            with monitor.measure_stage("history"):
+                ...
+
+        Args:
+            name (str): Название этапа
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_stages[name] = time.perf_counter() - start
+
+    async def run_stage(self, name: str, coro):
+        """
+        Выполнение асинхронного этапа запуска с замером длительности.
+
+        Ошибка этапа не прерывает остальные этапы: она возвращается
+        как результат, чтобы asyncio.gather дождался всех задач.
+
+        Args:
+            name (str): Название этапа
+            coro: Корутина этапа
+
+        Returns:
+            Результат корутины или исключение, если этап завершился ошибкой
+        """
+        with self.measure_stage(name):
+            try:
+                return await coro
+            except Exception as e:
+                return e
+
+    def log_startup(self, logger) -> None:
+        """
+        Логирование длительности этапов запуска.
+
+        Args:
+            logger: Объект логгера для записи информации
+        """
+        total = time.perf_counter() - self.startup_started
+        stages = ", ".join(
+            f"{name}: {duration * 1000:.0f}ms" for name, duration in self.startup_stages.items()
+        )
+        logger.info(f"Startup stages - {stages}; total: {total * 1000:.0f}ms")
+
     def check_health(self) -> dict:
         """
         Проверка состояния системы на основе пороговых значений.
@@ -148,34 +609,60 @@ class PerformanceMonitor:
                 f"High thread count: {metrics['thread_count']}"
             )
             health_status['status'] = 'warning'
+
+        # Проверка отзывчивости цикла событий и интерфейса
+        responsiveness = self.get_responsiveness()
+        if responsiveness['loop_lag']['recent_max'] > self.thresholds['loop_lag']:
+            health_status['warnings'].append(
+                f"High event loop lag: {responsiveness['loop_lag']['recent_max'] * 1000:.0f}ms"
+            )
+            health_status['status'] = 'warning'
+
+        if responsiveness['page_update']['recent_avg'] > self.thresholds['page_update']:
+            health_status['warnings'].append(
+                f"Slow UI updates: {responsiveness['page_update']['recent_avg'] * 1000:.0f}ms on average"
+            )
+            health_status['status'] = 'warning'
+
+        if responsiveness['slow_callbacks']:
+            name, duration = max(responsiveness['slow_callbacks'], key=lambda item: item[1])
+            health_status['warnings'].append(
+                f"Slow callbacks: {len(responsiveness['slow_callbacks'])}, "
+                f"slowest {name} ({duration * 1000:.0f}ms)"
+            )
+            health_status['status'] = 'warning'
             
         return health_status
 
     def get_average_metrics(self) -> dict:
         """
-        Расчет средних показателей за всю историю наблюдений.
+        Расчет средних и максимальных показателей за окно истории наблюдений.
         
         Вычисляет средние значения для:
         - Использования CPU
         - Использования памяти
         - Количества потоков
+
+        Значения берутся из текущих сумм кольцевого буфера за O(1).
         
         Returns:
             dict: Словарь со средними значениями метрик или сообщением об ошибке
         """
-        # Проверка наличия данных для анализа
-        if not self.metrics_history:
-            return {"error": "No metrics available"}
-            
-        # Расчет средних значений по всей истории метрик
-        avg_metrics = {
-            'avg_cpu': sum(m['cpu_percent'] for m in self.metrics_history) / len(self.metrics_history),
-            'avg_memory': sum(m['memory_percent'] for m in self.metrics_history) / len(self.metrics_history),
-            'avg_threads': sum(m['thread_count'] for m in self.metrics_history) / len(self.metrics_history),
-            'samples_count': len(self.metrics_history)  # Количество проанализированных замеров
-        }
-        
-        return avg_metrics
+        with self.lock:
+            # Проверка наличия данных для анализа
+            if not len(self.history):
+                return {"error": "No metrics available"}
+
+            history = self.history
+            return {
+                'avg_cpu': history.average('cpu_percent'),
+                'avg_memory': history.average('memory_percent'),
+                'avg_threads': history.average('thread_count'),
+                'max_cpu': history.maximum('cpu_percent'),
+                'max_memory': history.maximum('memory_percent'),
+                'max_threads': history.maximum('thread_count'),
+                'samples_count': len(history)  # Количество проанализированных замеров
+            }
 
     def log_metrics(self, logger) -> None:
         """
@@ -200,6 +687,25 @@ class PerformanceMonitor:
                 f"Threads: {metrics['thread_count']}, "
                 f"Uptime: {metrics['uptime']:.0f}s"
             )
+
+        # Логирование отзывчивости цикла событий и интерфейса
+        responsiveness = self.get_responsiveness()
+        loop_lag, page_update = responsiveness['loop_lag'], responsiveness['page_update']
+        if loop_lag['count'] or page_update['count']:
+            logger.info(
+                f"Responsiveness - "
+                f"loop lag p50/p99: {(loop_lag['p50'] or 0) * 1000:.1f}/{(loop_lag['p99'] or 0) * 1000:.1f}ms, "
+                f"page.update p50/p99: {(page_update['p50'] or 0) * 1000:.1f}/{(page_update['p99'] or 0) * 1000:.1f}ms"
+            )
+
+        # Логирование затрат на фоновые замеры
+        if self.sampler_running:
+            sampling = self.get_sampling_stats()
+            logger.debug(
+                f"Sampling overhead - samples: {sampling['samples']}, "
+                f"avg: {sampling['avg_cost_ms']:.2f}ms, max: {sampling['max_cost_ms']:.2f}ms, "
+                f"overhead: {sampling['overhead_percent']:.3f}%"
+            )
             
         # Логирование предупреждений при проблемах с производительностью
         if health['status'] == 'warning':
@@ -17,6 +17,9 @@ class NotificationService:
         # Атрибут для отправки уведомления через Telegram
         self.telegram_sender = TelegramNotificationSender()
 
+        # Итоги отправки: (канал, "sent" | "error") -> количество
+        self.outcomes = {}
+
     async def send_notification(self, channel: str, recipient: str, message: str, token: str = None, email_login: str = None, email_pass: str = None):
         """
         Метод для отправки уведомления по переданному каналу.
@@ -28,6 +31,30 @@ class NotificationService:
             token: Токен для отправки уведомления через telegram-бота. По умолчанию: None
             email_login: Логин для авторизации в почте. По умолчанию: None
             email_pass: Пароль для авторизации в IMAP. По умолчанию: None
+
+        Returns:
+            str | None: Текст ошибки отправки или None при успехе
+        """
+
+        try:
+            error = await self._send(channel, recipient, message, token, email_login, email_pass)
+        except Exception:
+            self._count(channel, "error")
+            raise
+        self._count(channel, "error" if error else "sent")
+        return error
+
+    @staticmethod
+    def validate(channel: str, recipient: str):
+        """
+        Проверка канала и получателя уведомления.
+
+        Args:
+            channel: Канал для отправки уведомления
+            recipient: Получатель уведомления
+
+        Raises:
+            ValueError: Неподдерживаемый канал или неверный получатель
         """
 
         if channel == "email":
@@ -35,25 +62,56 @@ class NotificationService:
             if recipient.count("@") == 0:
                 raise ValueError("Проверьте валидность введенной почты")
 
-            # email - синхронная отправка
-            self.email_sender.send_notification(
-                email_to=recipient, # Получатель
-                text=message,       # Текст уведомления
-                login=email_login,  # Логин почты
-                password=email_pass # Пароль для авторизации IMAP
-            )
-
         elif channel == "telegram":
             # Валидация Telegram ID
             if not recipient.isdigit():
                 raise ValueError("Telegram chat_id должен быть числом")
 
-            # telegram - асинхронна отправка
-            await self.telegram_sender.send_notification(
-                target_chat_id=int(recipient), # Получатель
-                message=message,               # Текст уведомления
-                token=token                    # Токен telegram-бота
-            )
-
         else:
             raise ValueError(f"Unsupported notification channel: {channel}")
+
+    async def close(self):
+        """
+        Закрытие соединений каналов уведомлений.
+        Вызывается при завершении работы приложения.
+        """
+
+        await self.email_sender.close()
+        await self.telegram_sender.close()
+
+    def _count(self, channel: str, outcome: str):
+        """
+        Учет итога отправки уведомления.
+
+        Args:
+            channel: Канал уведомления
+            outcome: "sent" или "error"
+        """
+        key = (channel, outcome)
+        self.outcomes[key] = self.outcomes.get(key, 0) + 1
+
+    async def _send(self, channel: str, recipient: str, message: str, token: str, email_login: str, email_pass: str):
+        """
+        Отправка уведомления по каналу.
+
+        Returns:
+            str | None: Текст ошибки, который вернул канал, или None при успехе
+        """
+
+        self.validate(channel, recipient)
+
+        if channel == "email":
+            # email - отправка в отдельном потоке через переиспользуемое соединение
+            return await self.email_sender.send_notification(
+                email_to=recipient, # Получатель
+                text=message,       # Текст уведомления
+                login=email_login,  # Логин почты
+                password=email_pass # Пароль для авторизации IMAP
+            )
+
+        # telegram - асинхронна отправка
+        return await self.telegram_sender.send_notification(
+            target_chat_id=int(recipient), # Получатель
+            message=message,               # Текст уведомления
+            token=token                    # Токен telegram-бота
+        )
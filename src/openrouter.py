@@ -1,6 +1,10 @@
 # Импорт необходимых библиотек
+import json  # Библиотека для разбора JSON-фрагментов потокового ответа
+from contextlib import nullcontext  # Пустой контекст, если трассировка не ведется
 import requests  # Библиотека для выполнения HTTP-запросов к API
+import aiohttp  # Библиотека для асинхронных HTTP-запросов с пулом соединений
 from logger import AppLogger  # Импорт собственного логгера для отслеживания работы
+from model_catalog import ModelCatalogCache  # Дисковый кэш каталога моделей
 
 
 class OpenRouterClient:
@@ -11,7 +15,16 @@ class OpenRouterClient:
         языковым моделям (GPT, Claude и др.) через единый API интерфейс.
     """
 
-    def __init__(self, api_key):
+    # Модели по умолчанию на случай недоступности API
+    DEFAULT_MODELS = [
+        {"id": "deepseek-coder", "name": "DeepSeek"},
+        {"id": "claude-3-sonnet", "name": "Claude 3.5 Sonnet"},
+        {"id": "gpt-3.5-turbo", "name": "GPT-3.5 Turbo"}
+    ]
+
+    def __init__(self, api_key, base_url: str = "https://openrouter.ai/api/v1",
+                 connector_limit: int = 10, connector_limit_per_host: int = 10,
+                 keepalive_timeout: float = 30.0, preload_models: bool = True):
         """
             Инициализация клиента OpenRouter.
         
@@ -23,6 +36,11 @@ class OpenRouterClient:
 
             Args:
                 api_key: Переданный API ключ от OpenRouter.ai
+                base_url: Базовый URL API. По умолчанию: https://openrouter.ai/api/v1
+                connector_limit: Максимальное число одновременных соединений в пуле
+                connector_limit_per_host: Максимальное число соединений к одному хосту
+                keepalive_timeout: Сколько секунд держать простаивающее соединение открытым
+                preload_models: Загружать ли список моделей при инициализации
 
             Raises:
                 ValueError: Если API ключ не найден в переменных окружения
@@ -32,7 +50,7 @@ class OpenRouterClient:
 
         # Получение необходимых параметров из переменных окружения
         self.api_key = api_key  # API ключ для авторизации
-        self.base_url = "https://openrouter.ai/api/v1"  # Базовый URL API
+        self.base_url = base_url.rstrip("/")  # Базовый URL API
 
         # Проверка наличия API ключа
         if not self.api_key:
@@ -49,59 +67,195 @@ class OpenRouterClient:
             "Content-Type": "application/json"  # Указание формата данных
         }
 
+        # Синхронная сессия requests: переиспользует TCP+TLS соединения между вызовами
+        self.http = requests.Session()
+        self.http.headers.update(self.headers)
+
+        # Настройки пула соединений асинхронной сессии
+        self.connector_limit = connector_limit                    # Общий лимит соединений
+        self.connector_limit_per_host = connector_limit_per_host  # Лимит соединений на хост
+        self.keepalive_timeout = keepalive_timeout                # Время жизни простаивающего соединения
+
+        # Долгоживущая aiohttp-сессия. Создается лениво, так как
+        # должна принадлежать уже запущенному event loop
+        self._session = None
+
         # Логирование успешной инициализации клиента
         self.logger.info("OpenRouterClient initialized successfully")
 
+        # Дисковый кэш каталога моделей
+        self.catalog = ModelCatalogCache()
+
         # Загрузка списка доступных моделей при инициализации
-        self.available_models = self.get_models()
+        self.available_models = self.load_models() if preload_models else []
 
         # Загрузка списка доступных форматов уведомлений при инициализации
         self.available_notifications = self.get_notifications_list()
 
+    def load_models(self):
+        """
+            Быстрая загрузка списка моделей для старта приложения.
+
+            Если на диске есть кэш каталога - он возвращается сразу, даже если
+            устарел (stale-while-revalidate): обновить его можно позже в фоне
+            через refresh_models(). Сетевой запрос выполняется только при
+            "холодном" старте, когда кэша еще нет.
+
+            Returns:
+                list: Список словарей с информацией о моделях
+        """
+        if self.catalog.models:
+            self.logger.debug("Using cached model catalog")
+            return self.catalog.models
+
+        # Холодный старт - кэша нет, загружаем каталог синхронно
+        return self.get_models()
+
+    @property
+    def models_need_refresh(self) -> bool:
+        """
+            Признак того, что каталог моделей устарел и его стоит обновить в фоне.
+        """
+        return not self.catalog.is_fresh()
+
+    async def refresh_models(self):
+        """
+            Фоновое обновление каталога моделей (условным запросом).
+
+            Returns:
+                list: Актуальный список моделей
+        """
+        self.available_models = await self.get_models_async()
+        return self.available_models
+
+    @property
+    def available_models(self):
+        """
+            Список доступных моделей.
+        """
+        return self._available_models
+
+    @available_models.setter
+    def available_models(self, models):
+        """
+            Замена списка моделей с перестроением индекса размеров контекста.
+        """
+        self._available_models = models
+        self._context_lengths = {model["id"]: model.get("context_length") for model in models}
+
+    def get_context_length(self, model: str):
+        """
+            Размер окна контекста модели.
+
+            Args:
+                model (str): Идентификатор модели
+
+            Returns:
+                int | None: Размер окна в токенах или None, если неизвестен
+        """
+        return self._context_lengths.get(model)
+
     def get_models(self):
         """
             Получение списка доступных языковых моделей.
 
+            Запрос выполняется условно (If-None-Match / If-Modified-Since):
+            если каталог не изменился, сервер отвечает 304 и используется кэш.
+
             Returns:
                 list: Список словарей с информацией о моделях:
                      [{"id": "model-id", "name": "Model Name"}, ...]
 
             Note:
-                При ошибке запроса возвращает список базовых моделей по умолчанию
+                При ошибке запроса возвращает закэшированный список,
+                а если его нет - список базовых моделей по умолчанию
         """
         # Логирование начала запроса списка моделей
         self.logger.debug("Fetching available models")
 
         try:
             # Выполнение GET запроса к API для получения списка моделей
-            response = requests.get(
-                f"{self.base_url}/models",
-                headers=self.headers
-            )
+            response = self.http.get(f"{self.base_url}/models", headers=self.catalog.validators())
+
+            # Каталог не изменился - продлеваем срок жизни кэша
+            if response.status_code == 304:
+                self.logger.info("Model catalog not modified, using cache")
+                self.catalog.touch()
+                return self.catalog.models
+
             # Преобразование ответа из JSON в словарь Python
-            models_data = response.json()
+            models = self._parse_models(response.json())
+            self.catalog.save(models, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return models
+        except Exception as e:
+            return self._fallback_models(e)
+
+    async def get_models_async(self):
+        """
+            Асинхронное получение списка доступных языковых моделей
+            через общую сессию с пулом соединений.
 
-            # Логирование успешного получения списка моделей
-            self.logger.info(f"Retrieved {len(models_data['data'])} models")
+            Returns:
+                list: Список словарей с информацией о моделях (см. get_models)
+        """
+        # Логирование начала запроса списка моделей
+        self.logger.debug("Fetching available models (async)")
 
-            # Преобразование данных в нужный формат
-            return [
-                {
-                    "id": model["id"],  # Идентификатор модели для API
-                    "name": model["name"]  # Человекочитаемое название модели
-                }
-                for model in models_data["data"]
-            ]
+        try:
+            session = await self.get_session()
+            async with session.get(f"{self.base_url}/models", headers=self.catalog.validators()) as response:
+                # Каталог не изменился - продлеваем срок жизни кэша
+                if response.status == 304:
+                    self.logger.info("Model catalog not modified, using cache")
+                    self.catalog.touch()
+                    return self.catalog.models
+
+                models = self._parse_models(await response.json())
+                self.catalog.save(models, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                return models
         except Exception as e:
-            # Список моделей по умолчанию при ошибке API
-            models_default = [
-                {"id": "deepseek-coder", "name": "DeepSeek"},
-                {"id": "claude-3-sonnet", "name": "Claude 3.5 Sonnet"},
-                {"id": "gpt-3.5-turbo", "name": "GPT-3.5 Turbo"}
-            ]
-            # Логирование ошибки и возврата списка по умолчанию
-            self.logger.info(f"Retrieved {len(models_default)} models with Error: {e}")
-            return models_default
+            return self._fallback_models(e)
+
+    def _fallback_models(self, error):
+        """
+            Список моделей на случай ошибки запроса каталога.
+
+            Args:
+                error: Возникшее исключение
+
+            Returns:
+                list: Закэшированный список моделей или список по умолчанию
+        """
+        if self.catalog.models:
+            self.logger.info(f"Retrieved {len(self.catalog.models)} cached models with Error: {error}")
+            return self.catalog.models
+
+        # Логирование ошибки и возврата списка по умолчанию
+        self.logger.info(f"Retrieved {len(self.DEFAULT_MODELS)} models with Error: {error}")
+        return list(self.DEFAULT_MODELS)
+
+    def _parse_models(self, models_data):
+        """
+            Преобразование ответа /models в список моделей.
+
+            Args:
+                models_data (dict): Разобранный JSON-ответ API
+
+            Returns:
+                list: [{"id": "model-id", "name": "Model Name", "context_length": 8192}, ...]
+        """
+        # Логирование успешного получения списка моделей
+        self.logger.info(f"Retrieved {len(models_data['data'])} models")
+
+        # Преобразование данных в нужный формат
+        return [
+            {
+                "id": model["id"],  # Идентификатор модели для API
+                "name": model["name"],  # Человекочитаемое название модели
+                "context_length": model.get("context_length")  # Размер окна контекста в токенах
+            }
+            for model in models_data["data"]
+        ]
 
     def get_notifications_list(self):
         """
@@ -142,13 +296,14 @@ class OpenRouterClient:
             for notification in notifications["data"]
         ]
 
-    def send_message(self, message: str, model: str):
+    def send_message(self, message: str, model: str, history: list = None):
         """
             Отправка сообщения выбранной языковой модели.
 
             Args:
                 message (str): Текст сообщения для отправки
                 model (str): Идентификатор выбранной модели
+                history (list): Предыдущие реплики диалога в формате API (см. ConversationContext.build)
 
             Returns:
                 dict: Ответ от API, содержащий либо ответ модели, либо информацию об ошибке
@@ -159,7 +314,7 @@ class OpenRouterClient:
         # Формирование данных для отправки в API
         data = {
             "model": model,  # Идентификатор выбранной модели
-            "messages": [{"role": "user", "content": message}]  # Сообщение в формате API
+            "messages": (history or []) + [{"role": "user", "content": message}]  # Сообщение в формате API
         }
 
         try:
@@ -167,9 +322,8 @@ class OpenRouterClient:
             self.logger.debug("Making API request")
 
             # Отправка POST запроса к API
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/chat/completions",  # Эндпоинт для чата
-                headers=self.headers,  # Заголовки с авторизацией
                 json=data  # Данные запроса
             )
 
@@ -190,6 +344,136 @@ class OpenRouterClient:
             # Возврат сообщения об ошибке в формате ответа API
             return {"error": str(e)}
 
+    async def send_message_async(self, message: str, model: str, history: list = None):
+        """
+            Асинхронная отправка сообщения выбранной языковой модели
+            без потоковой передачи ответа.
+
+            Args:
+                message (str): Текст сообщения для отправки
+                model (str): Идентификатор выбранной модели
+                history (list): Предыдущие реплики диалога в формате API (см. ConversationContext.build)
+
+            Returns:
+                dict: Ответ от API, содержащий либо ответ модели, либо информацию об ошибке
+        """
+        # Логирование отправки сообщения
+        self.logger.debug(f"Sending message to model: {model}")
+
+        # Формирование данных для отправки в API
+        data = {
+            "model": model,  # Идентификатор выбранной модели
+            "messages": (history or []) + [{"role": "user", "content": message}]  # Сообщение в формате API
+        }
+
+        try:
+            session = await self.get_session()
+            async with session.post(f"{self.base_url}/chat/completions", json=data) as response:
+                # Проверка на ошибки HTTP
+                response.raise_for_status()
+
+                # Логирование успешного получения ответа
+                self.logger.info("Successfully received response from API")
+
+                # Возврат данных ответа
+                return await response.json()
+
+        except Exception as e:
+            # Формирование информативного сообщения об ошибке
+            error_msg = f"API request failed: {str(e)}"
+            # Логирование ошибки с полным стектрейсом для отладки
+            self.logger.error(error_msg, exc_info=True)
+            # Возврат сообщения об ошибке в формате ответа API
+            return {"error": str(e)}
+
+    async def stream_message(self, message: str, model: str, history: list = None, trace=None):
+        """
+            Потоковая отправка сообщения выбранной языковой модели.
+
+            Запрос выполняется с параметром stream=True, ответ приходит
+            в формате server-sent events (строки вида "data: {...}") и
+            разбирается по мере поступления фрагментов.
+
+            Args:
+                message (str): Текст сообщения для отправки
+                model (str): Идентификатор выбранной модели
+                history (list): Предыдущие реплики диалога в формате API (см. ConversationContext.build)
+                trace (Trace): Трассировка хода для замера разбора фрагментов (этап "parse")
+
+            Yields:
+                dict: Очередное событие потока:
+                    - {"delta": str} - новый фрагмент текста ответа
+                    - {"usage": dict} - статистика токенов (обычно в последнем фрагменте)
+                    - {"error": str} - информация об ошибке (поток после нее завершается)
+        """
+        # Логирование отправки сообщения
+        self.logger.debug(f"Streaming message to model: {model}")
+
+        # Формирование данных для отправки в API
+        data = {
+            "model": model,  # Идентификатор выбранной модели
+            "messages": (history or []) + [{"role": "user", "content": message}],  # Сообщение в формате API
+            "stream": True,  # Включение потоковой передачи ответа
+            "usage": {"include": True}  # Запрос статистики токенов в конце потока
+        }
+
+        try:
+            # Логирование начала выполнения запроса
+            self.logger.debug("Making streaming API request")
+
+            session = await self.get_session()
+            async with session.post(f"{self.base_url}/chat/completions", json=data) as response:
+                # Проверка на ошибки HTTP
+                if response.status >= 400:
+                    error_text = await response.text()
+                    self.logger.error(f"API request failed: {response.status} {error_text}")
+                    yield {"error": f"{response.status} {response.reason}: {error_text}"}
+                    return
+
+                # Чтение потока построчно: каждое событие - строка "data: ..."
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8").strip()
+
+                    # Пустые строки разделяют события, строки с ":" - комментарии (keep-alive)
+                    if not line or line.startswith(":") or not line.startswith("data:"):
+                        continue
+
+                    payload = line[len("data:"):].strip()
+
+                    # Маркер окончания потока
+                    if payload == "[DONE]":
+                        break
+
+                    with trace.span("parse") if trace else nullcontext():
+                        chunk = json.loads(payload)
+
+                    # Ошибка может прийти прямо внутри потока
+                    if "error" in chunk:
+                        error = chunk["error"]
+                        yield {"error": error.get("message", str(error)) if isinstance(error, dict) else str(error)}
+                        return
+
+                    # Извлечение нового фрагмента текста
+                    for choice in chunk.get("choices", []):
+                        content = choice.get("delta", {}).get("content")
+                        if content:
+                            yield {"delta": content}
+
+                    # Статистика токенов
+                    if chunk.get("usage"):
+                        yield {"usage": chunk["usage"]}
+
+            # Логирование успешного получения ответа
+            self.logger.info("Successfully received streamed response from API")
+
+        except Exception as e:
+            # Формирование информативного сообщения об ошибке
+            error_msg = f"API request failed: {str(e)}"
+            # Логирование ошибки с полным стектрейсом для отладки
+            self.logger.error(error_msg, exc_info=True)
+            # Возврат сообщения об ошибке в формате события потока
+            yield {"error": str(e)}
+
     def get_balance(self):
         """
             Получение текущего баланса аккаунта.
@@ -199,21 +483,29 @@ class OpenRouterClient:
         """
         try:
             # Запрос баланса через API
-            response = requests.get(
-                f"{self.base_url}/credits",  # Эндпоинт для проверки баланса
-                headers=self.headers  # Заголовки с авторизацией
-            )
+            response = self.http.get(f"{self.base_url}/credits")  # Эндпоинт для проверки баланса
             # Получение данных из ответа
-            data = response.json()
-            if data:
-                data = data.get('data')
-                if data is not None:
-                    # Вычисление доступного баланса (всего кредитов минус использовано)
-                    return f"${(data.get('total_credits', 0) - data.get('total_usage', 0)):.2f}"
-                else:
-                    self.logger.error("Не удалось получить данные по балансу. Возможно введен не верный ключ.")
-                    return "Проверьте введенный ключ"
+            return self._format_balance(response.json())
+        except Exception as e:
+            # Формирование сообщения об ошибке
+            error_msg = f"API request failed: {str(e)}"
+            # Логирование ошибки с полным стектрейсом
+            self.logger.error(error_msg, exc_info=True)
+            # Возврат сообщения об ошибке
             return "Ошибка"
+
+    async def get_balance_async(self):
+        """
+            Асинхронное получение текущего баланса аккаунта
+            через общую сессию с пулом соединений.
+
+            Returns:
+                str: Строка с балансом в формате '$X.XX' или 'Ошибка' при неудаче
+        """
+        try:
+            session = await self.get_session()
+            async with session.get(f"{self.base_url}/credits") as response:
+                return self._format_balance(await response.json())
         except Exception as e:
             # Формирование сообщения об ошибке
             error_msg = f"API request failed: {str(e)}"
@@ -221,3 +513,64 @@ class OpenRouterClient:
             self.logger.error(error_msg, exc_info=True)
             # Возврат сообщения об ошибке
             return "Ошибка"
+
+    def _format_balance(self, data):
+        """
+            Форматирование ответа /credits в строку баланса.
+
+            Args:
+                data (dict): Разобранный JSON-ответ API
+
+            Returns:
+                str: Строка с балансом в формате '$X.XX' или текст ошибки
+        """
+        if data:
+            data = data.get('data')
+            if data is not None:
+                # Вычисление доступного баланса (всего кредитов минус использовано)
+                return f"${(data.get('total_credits', 0) - data.get('total_usage', 0)):.2f}"
+            else:
+                self.logger.error("Не удалось получить данные по балансу. Возможно введен не верный ключ.")
+                return "Проверьте введенный ключ"
+        return "Ошибка"
+
+    async def get_session(self):
+        """
+            Получение долгоживущей aiohttp-сессии.
+
+            Сессия создается при первом обращении и переиспользуется всеми
+            асинхронными запросами: соединения держатся открытыми (keep-alive),
+            поэтому TCP+TLS рукопожатие выполняется один раз, а не на каждый запрос.
+
+            Returns:
+                aiohttp.ClientSession: Общая сессия клиента
+        """
+        if self._session is None or self._session.closed:
+            # Пул соединений с ограничениями и keep-alive
+            connector = aiohttp.TCPConnector(
+                limit=self.connector_limit,                    # Общий лимит соединений
+                limit_per_host=self.connector_limit_per_host,  # Лимит соединений на хост
+                keepalive_timeout=self.keepalive_timeout,      # Время жизни простаивающего соединения
+                ttl_dns_cache=300                              # Кэширование DNS на 5 минут
+            )
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,  # Заголовки с авторизацией для всех запросов
+                connector=connector,
+                # Общего таймаута нет, так как потоковый ответ может идти долго
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=15, sock_read=120)
+            )
+            self.logger.debug("Created pooled aiohttp session")
+        return self._session
+
+    async def close(self):
+        """
+            Закрытие сетевых сессий клиента.
+
+            Вызывается при завершении работы приложения, чтобы корректно
+            закрыть все соединения из пула.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self.http.close()
+        self.logger.info("OpenRouterClient sessions closed")
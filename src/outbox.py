@@ -0,0 +1,266 @@
+# Импорт необходимых библиотек
+import asyncio                 # Фоновая отправка в цикле событий
+import heapq                   # Очередь уведомлений по времени следующей попытки
+import random                  # Случайный разброс задержки повтора
+import time                    # Время попыток отправки
+import uuid                    # Идентификаторы уведомлений
+from logger import AppLogger   # Импорт собственного логгера для отслеживания работы
+
+
+class NotificationOutbox:
+    """
+        Очередь уведомлений с фоновой отправкой и повторами (outbox).
+
+        Обеспечивает:
+            - Постановку уведомления в очередь за O(1): ход чата не ждет отправки
+            - Сохранение очереди в SQLite (notification_outbox): уведомления,
+              не отправленные до закрытия приложения, отправляются при следующем запуске
+            - Ограничение числа одновременных отправок
+            - Повторы с экспоненциальной задержкой и пометку dead после max_attempts
+            - Ожидание настроек канала (токен, логин и пароль) без расхода попыток
+            - Статус доставки по идентификатору (status) и сводку по статусам (counts)
+
+        Все изменения пишутся через фоновую запись ChatCache, поэтому
+        статус никогда не обгоняет постановку в очередь. Планирование
+        попыток идет в памяти (куча по времени попытки), база читается
+        только при запуске.
+
+        Сохранность: запись о новом уведомлении попадает в базу с задержкой
+        до flush_interval фоновой записи (0.5 с). Уведомление, поставленное
+        в очередь меньше чем за это время до аварийного завершения процесса,
+        теряется; при обычном закрытии очередь записи сбрасывается. Ошибка
+        другой записи того же пакета уведомление не теряет - пакет
+        повторяется по одной операции.
+    """
+
+    def __init__(self, cache, service, concurrency: int = 2, max_attempts: int = 5,
+                 base_delay: float = 2.0, max_delay: float = 300.0, keep_sent_days: int = 7):
+        """
+            Args:
+                cache (ChatCache): Хранилище очереди
+                service (NotificationService): Отправка уведомлений по каналам
+                concurrency (int): Максимальное число одновременных отправок
+                max_attempts (int): Попыток до пометки уведомления как недоставленного
+                base_delay (float): Задержка перед первым повтором в секундах
+                max_delay (float): Максимальная задержка между повторами в секундах
+                keep_sent_days (int): Сколько дней хранить доставленные уведомления
+        """
+        # Инициализация логгера для отслеживания работы
+        self.logger = AppLogger()
+
+        self.cache = cache
+        self.service = service
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.keep_sent_days = keep_sent_days
+
+        self.queue = []          # Куча (время попытки, номер, уведомление)
+        self.sequence = 0        # Порядок постановки при равном времени попытки
+        self.sending = set()     # Задачи текущих отправок
+        self.wakeup = None       # Событие: новое уведомление или освободилось место
+        self.task = None         # Задача фоновой отправки (run)
+
+    def enqueue(self, channel: str, recipient: str, message: str) -> str:
+        """
+            Постановка уведомления в очередь отправки.
+
+            Канал и получатель проверяются сразу, чтобы ошибка ввода
+            была видна пользователю, а не терялась в фоне.
+
+            Args:
+                channel (str): Канал уведомления (email, telegram)
+                recipient (str): Получатель
+                message (str): Текст уведомления
+
+            Returns:
+                str: Идентификатор уведомления для запроса статуса
+
+            Raises:
+                ValueError: Неподдерживаемый канал или неверный получатель
+        """
+        self.service.validate(channel, recipient)
+
+        notification = {
+            'id': uuid.uuid4().hex,
+            'channel': channel,
+            'recipient': recipient,
+            'message': message,
+            'attempts': 0,
+        }
+        now = time.time()
+        self.cache.save_notification(notification['id'], channel, recipient, message, now)
+        self._schedule(now, notification)
+        return notification['id']
+
+    def _schedule(self, when: float, notification: dict):
+        """
+            Добавление уведомления в очередь попыток.
+        """
+        self.sequence += 1
+        heapq.heappush(self.queue, (when, self.sequence, notification))
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    def status(self, notification_id: str):
+        """
+            Статус доставки уведомления (читает базу - из интерфейса
+            вызывается в пуле потоков).
+
+            Returns:
+                tuple | None: (status, attempts, last_error, updated)
+        """
+        return self.cache.get_notification(notification_id)
+
+    def counts(self) -> dict:
+        """
+            Количество уведомлений по статусам: pending, sent, dead
+            (читает базу - из интерфейса вызывается в пуле потоков).
+        """
+        return self.cache.get_outbox_counts()
+
+    @property
+    def pending(self) -> int:
+        """
+            Уведомлений в очереди и в процессе отправки.
+        """
+        return len(self.queue) + len(self.sending)
+
+    async def run(self, credentials, on_dead=None):
+        """
+            Фоновая отправка уведомлений (запускается в цикле событий страницы).
+
+            Args:
+                credentials: Асинхронная функция channel -> dict с аргументами
+                    token, email_login, email_pass. Данные для входа берутся
+                    в момент отправки и в базе не хранятся.
+                on_dead: Функция (уведомление, ошибка), вызываемая, когда
+                    уведомление не удалось доставить за max_attempts попыток
+        """
+        self.task = asyncio.current_task()
+        self.wakeup = asyncio.Event()
+
+        # Уведомления, оставшиеся с прошлого запуска
+        loop = asyncio.get_running_loop()
+        try:
+            rows = await loop.run_in_executor(None, self.cache.get_pending_notifications)
+        except Exception as e:
+            self.logger.error(f"Не удалось загрузить очередь уведомлений: {e}")
+            rows = []
+        queued = {notification['id'] for _, _, notification in self.queue}  # Поставленные во время загрузки
+        for notification_id, channel, recipient, message, attempts, next_attempt in rows:
+            if notification_id in queued:
+                continue
+            self._schedule(next_attempt, {
+                'id': notification_id,
+                'channel': channel,
+                'recipient': recipient,
+                'message': message,
+                'attempts': attempts,
+            })
+        if rows:
+            self.logger.info(f"Уведомлений в очереди с прошлого запуска: {len(rows)}")
+        self.cache.prune_notifications(self.keep_sent_days)
+
+        try:
+            while True:
+                timeout = None
+                while self.queue and len(self.sending) < self.concurrency:
+                    delay = self.queue[0][0] - time.time()
+                    if delay > 0:
+                        timeout = delay  # Ближайшая попытка еще не наступила
+                        break
+                    _, _, notification = heapq.heappop(self.queue)
+                    task = asyncio.create_task(self._deliver(notification, credentials, on_dead))
+                    self.sending.add(task)
+
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # Прерванные отправки остаются pending в базе
+            tasks = list(self.sending)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _deliver(self, notification: dict, credentials, on_dead):
+        """
+            Одна попытка отправки уведомления и сохранение ее итога.
+        """
+        channel = notification['channel']
+        permanent = False  # Ошибка, которую повтор не исправит
+
+        try:
+            login = await credentials(channel)
+        except Exception as e:
+            self.logger.warning(f"Не удалось получить данные для входа в канал {channel}: {e}")
+            login = None
+        if not login or not all(login.values()):
+            # Данные для входа еще не загружены или не введены - это не попытка
+            # отправки: уведомление ждет настроек, не расходуя max_attempts
+            self.sending.discard(asyncio.current_task())
+            self.wakeup.set()
+            self._defer(notification, "Не настроены данные для входа в канал уведомлений")
+            return
+
+        try:
+            notification['attempts'] += 1
+            error = await self.service.send_notification(
+                channel=channel,
+                recipient=notification['recipient'],
+                message=notification['message'],
+                **login
+            )
+        except ValueError as e:
+            error, permanent = str(e), True  # Неверные данные уведомления
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            self.sending.discard(asyncio.current_task())
+            self.wakeup.set()
+
+        attempts = notification['attempts']
+        if error is None:
+            self.cache.update_notification(notification['id'], "sent", attempts)
+        elif permanent or attempts >= self.max_attempts:
+            self.cache.update_notification(notification['id'], "dead", attempts, error=error)
+            self.logger.error(f"Уведомление {channel} не доставлено после {attempts} попыток: {error}")
+            if on_dead is not None:
+                on_dead(notification, error)
+        else:
+            # Экспоненциальная задержка с разбросом, чтобы повторы не шли пачкой
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+            next_attempt = time.time() + delay
+            self.cache.update_notification(notification['id'], "pending", attempts, next_attempt, error)
+            self.logger.warning(f"Уведомление {channel} не отправлено (попытка {attempts}), повтор через {delay:.1f} с: {error}")
+            self._schedule(next_attempt, notification)
+
+    def _defer(self, notification: dict, reason: str):
+        """
+            Откладывание уведомления без расхода попытки (канал не настроен).
+            Задержка растет так же, как между повторами, до max_delay.
+        """
+        deferrals = notification['deferrals'] = notification.get('deferrals', 0) + 1
+        delay = min(self.max_delay, self.base_delay * 2 ** (deferrals - 1))
+        next_attempt = time.time() + delay
+        self.cache.update_notification(notification['id'], "pending", notification['attempts'], next_attempt, reason)
+        self.logger.warning(f"Уведомление {notification['channel']} отложено на {delay:.1f} с: {reason}")
+        self._schedule(next_attempt, notification)
+
+    async def stop(self):
+        """
+            Остановка фоновой отправки. Неотправленные уведомления
+            остаются в базе и будут отправлены при следующем запуске.
+        """
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
@@ -0,0 +1,235 @@
+# Импорт необходимых библиотек
+from array import array        # Компактные типизированные массивы
+from bisect import bisect_left # Двоичный поиск по отсортированным временным меткам
+from datetime import datetime  # Библиотека для работы с датой и временем
+
+# Безопасный импорт numpy (необязательная зависимость для векторных расчетов)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class SessionStore:
+    """
+        Колоночное хранилище записей о сообщениях сессии.
+
+        Вместо словаря на каждую запись данные хранятся в типизированных
+        массивах (по массиву на поле), а идентификаторы моделей - как индексы
+        в таблице строк. Запись занимает ~36 байт вместо сотен байт.
+
+        Обеспечивает:
+            - Добавление записи за O(1) с обновлением итогов
+            - Итоги и разбивку по моделям за O(число моделей)
+            - Выборку за период двоичным поиском по времени
+            - Векторные расчеты через numpy (если установлен)
+            - Ленивый перебор записей в прежнем формате словарей
+    """
+
+    def __init__(self):
+        """
+            Инициализация пустого хранилища.
+        """
+        # Колонки записей
+        self.timestamps = array('d')      # Время сообщения (epoch, секунды)
+        self.model_ids = array('I')       # Индекс модели в self.models
+        self.message_lengths = array('q') # Длина сообщения
+        self.response_times = array('d')  # Время ответа в секундах
+        self.tokens = array('q')          # Использовано токенов
+
+        # Таблица моделей (интернирование строк)
+        self.models = []       # Индекс -> идентификатор модели
+        self.model_index = {}  # Идентификатор модели -> индекс
+
+        # Итоги по моделям (индекс массива = индекс модели)
+        self.model_counts = array('q')
+        self.model_tokens = array('q')
+        self.model_response_times = array('d')
+
+        # Общие итоги
+        self.total_message_length = 0
+        self.total_response_time = 0.0
+        self.total_tokens = 0
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def _model_id(self, model: str) -> int:
+        """
+            Индекс модели в таблице моделей (новая модель добавляется).
+        """
+        model_id = self.model_index.get(model)
+        if model_id is None:
+            model_id = len(self.models)
+            self.model_index[model] = model_id
+            self.models.append(model)
+            self.model_counts.append(0)
+            self.model_tokens.append(0)
+            self.model_response_times.append(0.0)
+        return model_id
+
+    def append(self, timestamp, model: str, message_length: int, response_time: float, tokens_used: int):
+        """
+            Добавление записи о сообщении.
+
+            Args:
+                timestamp (datetime | float): Время сообщения
+                model (str): Идентификатор использованной модели
+                message_length (int): Длина сообщения
+                response_time (float): Время ответа в секундах
+                tokens_used (int): Количество использованных токенов
+        """
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        model_id = self._model_id(model)
+
+        self.timestamps.append(timestamp)
+        self.model_ids.append(model_id)
+        self.message_lengths.append(message_length)
+        self.response_times.append(response_time)
+        self.tokens.append(tokens_used)
+
+        # Обновление итогов
+        self.model_counts[model_id] += 1
+        self.model_tokens[model_id] += tokens_used
+        self.model_response_times[model_id] += response_time
+        self.total_message_length += message_length
+        self.total_response_time += response_time
+        self.total_tokens += tokens_used
+
+    def totals(self) -> dict:
+        """
+            Общие итоги сессии за O(1).
+
+            Returns:
+                dict: count, tokens, message_length, response_time (суммы)
+                    и avg_response_time
+        """
+        count = len(self)
+        return {
+            'count': count,
+            'tokens': self.total_tokens,
+            'message_length': self.total_message_length,
+            'response_time': self.total_response_time,
+            'avg_response_time': self.total_response_time / count if count else 0.0
+        }
+
+    def breakdown(self, since: float = None) -> dict:
+        """
+            Разбивка по моделям.
+
+            Без границы периода берется из итогов за O(число моделей),
+            с границей - считается по хвосту колонок (векторно при наличии numpy).
+
+            Args:
+                since (float): Учитывать записи не раньше этого времени (epoch)
+
+            Returns:
+                dict: {модель: {'count', 'tokens', 'avg_response_time'}}
+        """
+        if since is None:
+            counts, tokens, response_times = self.model_counts, self.model_tokens, self.model_response_times
+        else:
+            counts, tokens, response_times = self._window_breakdown(self.index_since(since))
+
+        return {
+            model: {
+                'count': int(counts[i]),
+                'tokens': int(tokens[i]),
+                'avg_response_time': float(response_times[i]) / counts[i] if counts[i] else 0.0
+            }
+            for i, model in enumerate(self.models)
+            if counts[i]
+        }
+
+    def _window_breakdown(self, start: int):
+        """
+            Суммы по моделям для записей, начиная с индекса start.
+
+            Returns:
+                tuple: (количество, токены, сумма времени ответа) по индексам моделей
+        """
+        size = len(self.models)
+        if NUMPY_AVAILABLE:
+            # Представления колонок без копирования
+            ids = self._view('model_ids')[start:]
+            return (
+                np.bincount(ids, minlength=size),
+                np.bincount(ids, weights=self._view('tokens')[start:], minlength=size),
+                np.bincount(ids, weights=self._view('response_times')[start:], minlength=size),
+            )
+
+        counts = [0] * size
+        tokens = [0] * size
+        response_times = [0.0] * size
+        for i in range(start, len(self)):
+            model_id = self.model_ids[i]
+            counts[model_id] += 1
+            tokens[model_id] += self.tokens[i]
+            response_times[model_id] += self.response_times[i]
+        return counts, tokens, response_times
+
+    def index_since(self, since: float) -> int:
+        """
+            Индекс первой записи не раньше указанного времени.
+
+            Записи добавляются в порядке времени, поэтому используется
+            двоичный поиск за O(log n).
+
+            Args:
+                since (float): Время (epoch)
+        """
+        return bisect_left(self.timestamps, since)
+
+    def count_since(self, since: float) -> int:
+        """
+            Количество записей не раньше указанного времени.
+        """
+        return len(self) - self.index_since(since)
+
+    def _view(self, name: str):
+        """
+            numpy-представление колонки без копирования.
+
+            Представление держит буфер массива, поэтому его нельзя хранить:
+            пока оно существует, добавление записей в колонку невозможно.
+
+            Args:
+                name (str): timestamps, model_ids, message_lengths, response_times или tokens
+        """
+        data = getattr(self, name)
+        if not len(data):
+            return np.array([], dtype=data.typecode)
+        return np.frombuffer(data, dtype=data.typecode)
+
+    def records(self):
+        """
+            Ленивый перебор записей в формате словарей.
+
+            Yields:
+                dict: timestamp (datetime), model, message_length, response_time, tokens_used
+        """
+        for i in range(len(self)):
+            yield {
+                'timestamp': datetime.fromtimestamp(self.timestamps[i]),
+                'model': self.models[self.model_ids[i]],
+                'message_length': self.message_lengths[i],
+                'response_time': self.response_times[i],
+                'tokens_used': self.tokens[i]
+            }
+
+    def nbytes(self) -> int:
+        """
+            Объем памяти, занятый колонками записей (в байтах).
+        """
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.timestamps, self.model_ids, self.message_lengths, self.response_times, self.tokens)
+        )
+
+    def clear(self):
+        """
+            Удаление всех записей и итогов.
+        """
+        self.__init__()
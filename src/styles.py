@@ -29,6 +29,7 @@ class AppStyles:
         "height": 400,        # Фиксированная высота области чата
         "auto_scroll": True,  # Автоматическая прокрутка к новым сообщениям
         "padding": 20,        # Внутренние отступы области чата
+        "on_scroll_interval": 100,  # Не чаще одного события прокрутки в 100 мс
     }
 
     # Настройки поля ввода сообщений
@@ -285,6 +286,47 @@ class AppStyles:
         "height": 40,                           # Высота кнопки
     }
 
+    # Переключатель кэша ответов
+    RESPONSE_CACHE_SWITCH = {
+        "label": "Кэш ответов",                          # Подпись переключателя
+        "tooltip": "Повторять ответ на одинаковый запрос без обращения к API", # Подсказка
+        "active_color": ft.Colors.BLUE_400,              # Цвет во включенном состоянии
+    }
+
+    # Поле поиска по истории чата
+    HISTORY_SEARCH_FIELD = {
+        **MODEL_SEARCH_FIELD,                # Оформление как у поиска модели
+        "hint_text": "Поиск по истории",     # Текст-подсказка
+        "tooltip": "Enter - найти. Слово со * на конце ищется по началу", # Подсказка
+    }
+
+    # Настройки контейнера внутри диалогового окна результатов поиска
+    SEARCH_RESULTS_CONTAINER = {
+        "width": 600,   # Ширина окна
+        "height": 400,  # Высота окна
+        "padding": 10,  # Внутренний отступ
+    }
+
+    # Выделение совпадений в результатах поиска
+    SEARCH_MATCH_STYLE = ft.TextStyle(
+        color=ft.Colors.YELLOW_300,   # Цвет совпадения
+        weight=ft.FontWeight.BOLD,    # Жирный шрифт
+    )
+
+    # График использования в окне аналитики
+    USAGE_CHART = {
+        "bgcolor": ft.Colors.GREY_900,         # Цвет фона графика
+        "tooltip_bgcolor": ft.Colors.GREY_800, # Цвет фона подсказки
+        "horizontal_grid_lines": ft.ChartGridLines(color=ft.Colors.GREY_800, width=1), # Сетка
+    }
+
+    # Контейнер графика использования
+    USAGE_CHART_CONTAINER = {
+        "width": 500,   # Ширина графика
+        "height": 220,  # Высота графика
+        "padding": 10,  # Внутренний отступ
+    }
+
     # Стиль текста внутри окна логов
     LOG_TEXT_STYLE = {
         "font_family": "monospace",   # Шрифт
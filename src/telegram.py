@@ -1,27 +1,142 @@
+import asyncio                          # Ожидание очереди отправки и паузы RetryAfter
 import os                               # Библиотека для работы с операционной системой и переменными окружения
+import time                             # Время простоя ботов и интервалы отправки
 from logger import AppLogger            # Импорт собственного логгера для отслеживания работы
 from aiogram import Bot                 # Библиотека для отправки Telegram сообщения
-from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError  # Библиотека для работы с исключениями
+from aiogram.client.session.aiohttp import AiohttpSession  # HTTP-сессия бота (для своего адреса Bot API)
+from aiogram.client.telegram import TelegramAPIServer     # Адрес сервера Bot API
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter  # Библиотека для работы с исключениями
+
+
+class TelegramRateLimiter:
+    """
+        Ограничение частоты отправки под лимиты Telegram Bot API.
+
+        Telegram допускает около одного сообщения в секунду в личный чат,
+        20 сообщений в минуту в группу и около 30 сообщений в секунду
+        на бота в целом; превышение возвращает 429 (TelegramRetryAfter).
+        Сообщения сверх лимита не отклоняются, а ждут своей очереди.
+    """
+
+    def __init__(self, global_rate: float = 30.0, chat_interval: float = 1.0, group_interval: float = 3.0):
+        """
+            Args:
+                global_rate (float): Сообщений в секунду на бота
+                chat_interval (float): Интервал между сообщениями в личный чат (секунды)
+                group_interval (float): Интервал между сообщениями в группу (секунды)
+        """
+        self.global_interval = 1.0 / global_rate
+        self.chat_interval = chat_interval
+        self.group_interval = group_interval
+        self.chat_next = {}           # chat_id -> время, с которого можно писать в чат
+        self.global_next = 0.0        # Время, с которого можно отправлять следующее сообщение
+        self.global_lock = None       # Очередь за общим лимитом (создается в цикле событий)
+
+    async def acquire(self, chat_id: int):
+        """
+            Ожидание возможности отправить сообщение в чат.
+        """
+        # Место в очереди чата резервируется сразу: сообщения в один чат идут по порядку
+        now = time.monotonic()
+        slot = max(now, self.chat_next.get(chat_id, 0.0))
+        self.chat_next[chat_id] = slot + (self.group_interval if chat_id < 0 else self.chat_interval)
+        if len(self.chat_next) > 10000:
+            # Чаты, в которые давно не писали, больше не ограничены
+            self.chat_next = {chat: ready for chat, ready in self.chat_next.items() if ready > now}
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+        # Общий лимит бота: сообщения разных чатов проходят по одному с интервалом
+        if self.global_lock is None:
+            self.global_lock = asyncio.Lock()
+        async with self.global_lock:
+            delay = self.global_next - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.global_next = time.monotonic() + self.global_interval
+
+    def defer(self, chat_id: int, retry_after: float):
+        """
+            Пауза после ответа 429: чат и бот не используются retry_after секунд.
+        """
+        ready = time.monotonic() + retry_after
+        self.chat_next[chat_id] = max(self.chat_next.get(chat_id, 0.0), ready)
+        self.global_next = max(self.global_next, ready)
+
 
 class TelegramNotificationSender:
 
-    def __init__(self):
+    # Бот (и его HTTP-сессия), не использовавшийся дольше, закрывается
+    IDLE_TIMEOUT = 600.0
+    # Сколько раз повторять отправку после ответа 429
+    MAX_RETRIES = 3
+    # Лимиты Telegram: сообщений в секунду на бота, интервалы для личного чата и группы (секунды)
+    GLOBAL_RATE = 30.0
+    CHAT_INTERVAL = 1.0
+    GROUP_INTERVAL = 3.0
+
+    def __init__(self, api_base: str = None):
         """
         Инициализация отправки уведомлений в Telegram.
 
         Настраивает:
             - Систему логирования
-            - Инициализация бота
+            - Адрес Bot API (TELEGRAM_API_BASE из .env, по умолчанию - api.telegram.org)
+            - Кэш ботов по токену и ограничение частоты отправки
 
-        Raises:
-            ValueError: Если забыли передать BOT_TOKEN в .env
+        Args:
+            api_base: Адрес сервера Bot API (например, локальный telegram-bot-api).
+                По умолчанию: TELEGRAM_API_BASE или сервер Telegram
         """
         # Инициализация логгера для отслеживания работы клиента
         self.logger = AppLogger()
 
+        self.api_base = api_base or os.getenv("TELEGRAM_API_BASE") or None
+
+        # Бот и его пул соединений создаются один раз на токен: token -> (бот, ограничитель)
+        self.bots = {}
+        self.last_used = {}  # token -> время последней отправки
+
         # Логирование успешной инициализации бота
         self.logger.info("TelegramNotificationSender initialized successfully")
 
+    async def _bot(self, token: str):
+        """
+        Бот и ограничитель частоты для токена (создаются при первой отправке).
+        Заодно закрываются боты, простаивавшие дольше IDLE_TIMEOUT.
+        """
+        now = time.monotonic()
+        for idle_token in [t for t, used in self.last_used.items() if t != token and now - used > self.IDLE_TIMEOUT]:
+            await self._close_bot(idle_token)
+
+        if token not in self.bots:
+            # Создаем бота с переданным токеном
+            if self.api_base:
+                session = AiohttpSession(api=TelegramAPIServer.from_base(self.api_base))
+                bot = Bot(token=token, session=session)
+            else:
+                bot = Bot(token=token)
+            limiter = TelegramRateLimiter(self.GLOBAL_RATE, self.CHAT_INTERVAL, self.GROUP_INTERVAL)
+            self.bots[token] = (bot, limiter)
+        self.last_used[token] = now
+        return self.bots[token]
+
+    async def _close_bot(self, token: str):
+        """
+        Закрытие сессии бота и удаление его из кэша.
+        """
+        entry = self.bots.pop(token, None)
+        self.last_used.pop(token, None)
+        if entry is not None:
+            await entry[0].session.close()
+
+    async def close(self):
+        """
+        Закрытие сессий всех ботов. Вызывается при завершении работы приложения.
+        """
+        for token in list(self.bots):
+            await self._close_bot(token)
+
     async def send_notification(self, target_chat_id: int, message: str, token: str):
         """
         Метод для отправки уведомления в Telegram чат.
@@ -43,18 +158,25 @@ class TelegramNotificationSender:
             # Возвращаем ошибку
             raise ValueError("Missing Telegram configuration")
 
-        # Инициализация объекта бота
-        bot = None
-
         try:
-            # Создаем бота с переданным токеном
-            bot = Bot(token=token)
+            bot, limiter = await self._bot(token)
 
-            # Пробуем отправить уведомление через Telegram
-            await bot.send_message(
-                chat_id=target_chat_id,  # CHAT_ID получателя
-                text=message  # Сообщение уведомления
-            )
+            for attempt in range(self.MAX_RETRIES + 1):
+                # Ожидание своей очереди под лимиты Telegram
+                await limiter.acquire(target_chat_id)
+                try:
+                    # Пробуем отправить уведомление через Telegram
+                    await bot.send_message(
+                        chat_id=target_chat_id,  # CHAT_ID получателя
+                        text=message  # Сообщение уведомления
+                    )
+                    break
+                except TelegramRetryAfter as e:
+                    # Лимит все же превышен (например, другим клиентом того же бота)
+                    if attempt == self.MAX_RETRIES:
+                        raise
+                    self.logger.warning(f"Telegram просит подождать {e.retry_after} с перед отправкой в чат {target_chat_id}")
+                    limiter.defer(target_chat_id, e.retry_after)
 
             # Логируем удачную отправку сообщения через Telegram
             self.logger.info(f"Уведомление отправлено на Telegram пользователю с ID: {target_chat_id}")
@@ -71,7 +193,3 @@ class TelegramNotificationSender:
             # Логируем ошибку отправки уведомления через Telegram
             self.logger.error(f"Отправка уведомления не удалась. Ошибка: {e}.")
             return f"Ошибка при отправке уведомления: {e}"  # Возвращаем ошибку
-        finally:
-            # Закрываем сессию бота
-            if bot:
-                await bot.session.close()
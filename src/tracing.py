@@ -0,0 +1,133 @@
+# Импорт необходимых библиотек
+import time                            # Монотонные часы для замера этапов
+import uuid                            # Идентификатор трассировки
+from contextlib import contextmanager  # Декоратор для создания контекстных менеджеров
+
+
+class Trace:
+    """
+        Трассировка одного действия (например, хода чата) по этапам.
+
+        Этап замеряется контекстным менеджером span() по монотонным часам.
+        Повторные замеры одного этапа суммируются (например, разбор каждого
+        фрагмента потокового ответа), поэтому на этап хранится длительность
+        и количество вызовов.
+
+        Вложенные этапы вычитаются из внешнего: у каждого этапа учитывается
+        только собственное время, и сумма этапов не превышает общего времени.
+        Трассировка рассчитана на использование из одной задачи.
+    """
+
+    def __init__(self, name: str):
+        """
+            Начало трассировки.
+
+            Args:
+                name (str): Название действия (например, "chat_turn")
+        """
+        self.name = name
+        self.trace_id = uuid.uuid4().hex     # Идентификатор для сохранения этапов
+        self.timestamp = time.time()         # Время начала (epoch)
+        self.started = time.perf_counter()   # Начало по монотонным часам
+        self.finished = None                 # Окончание по монотонным часам
+        self.stages = {}                     # Этап -> [собственное время, количество вызовов]
+        self._children = []                  # Время вложенных этапов для открытых этапов
+
+    @contextmanager
+    def span(self, stage: str):
+        """
+            Замер этапа.
+
+            Args:
+                stage (str): Название этапа
+        """
+        started = time.perf_counter()
+        self._children.append(0.0)
+        try:
+            yield self
+        finally:
+            duration = time.perf_counter() - started
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += duration  # Для внешнего этапа это время вложенного
+            self.add(stage, duration - children)
+
+    def add(self, stage: str, duration: float, calls: int = 1):
+        """
+            Учет уже измеренного времени этапа.
+
+            Args:
+                stage (str): Название этапа
+                duration (float): Длительность в секундах
+                calls (int): Количество вызовов
+        """
+        item = self.stages.get(stage)
+        if item is None:
+            self.stages[stage] = [duration, calls]
+        else:
+            item[0] += duration
+            item[1] += calls
+
+    def finish(self) -> float:
+        """
+            Завершение трассировки.
+
+            Returns:
+                float: Общее время в секундах
+        """
+        if self.finished is None:
+            self.finished = time.perf_counter()
+        return self.total
+
+    @property
+    def total(self) -> float:
+        """
+            Общее время трассировки в секундах (до текущего момента, если не завершена).
+        """
+        return (self.finished or time.perf_counter()) - self.started
+
+    def breakdown(self) -> dict:
+        """
+            Время по этапам в порядке первого вызова.
+
+            Время вне замеренных этапов учитывается как этап "other".
+
+            Returns:
+                dict: {этап: (длительность в секундах, количество вызовов)}
+        """
+        result = {stage: (duration, calls) for stage, (duration, calls) in self.stages.items()}
+        other = self.total - sum(duration for duration, _ in self.stages.values())
+        if other > 0:
+            result['other'] = (other, 1)
+        return result
+
+    def format(self) -> str:
+        """
+            Краткая строка с этапами для журнала.
+        """
+        stages = ", ".join(
+            f"{stage} {duration * 1000:.0f}ms" for stage, (duration, _) in self.breakdown().items()
+        )
+        return f"{self.name} {self.total * 1000:.0f}ms: {stages}"
+
+
+async def traced(iterable, trace: Trace, stage: str):
+    """
+        Асинхронный перебор с замером ожидания каждого элемента как этапа.
+
+        Args:
+            iterable: Асинхронный итерируемый объект (например, поток ответа API)
+            trace (Trace): Трассировка
+            stage (str): Название этапа ожидания
+
+        Yields:
+            Элементы исходного перебора
+    """
+    iterator = iterable.__aiter__()
+    while True:
+        with trace.span(stage):
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+        yield item
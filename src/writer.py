@@ -0,0 +1,253 @@
+# Импорт необходимых библиотек
+import atexit                  # Модуль для гарантированного сброса очереди при выходе
+import queue                   # Потокобезопасная очередь для передачи записей в фоновый поток
+import threading               # Библиотека для работы с потоками
+import time                    # Библиотека для работы с временными метками
+from logger import AppLogger   # Импорт собственного логгера для отслеживания работы
+from histogram import LatencyHistogram  # Распределение времени записи пакетов
+
+
+class WriteBehindWriter:
+    """
+        Фоновая запись в SQLite с объединением операций в пакеты (write-behind).
+
+        Обеспечивает:
+            - Постановку записи в очередь за O(1) без ожидания диска
+            - Объединение записей в одну транзакцию (executemany для одинаковых запросов)
+            - Сброс пакета по размеру или по истечении интервала
+            - Принудительный сброс flush() и гарантированный сброс при завершении
+            - Повтор пакета по одной операции при ошибке, чтобы ошибочная
+              запись не откатила остальные записи пакета
+    """
+
+    # Служебные маркеры очереди
+    _FLUSH = object()  # Немедленно записать накопленный пакет
+    _STOP = object()   # Записать пакет и завершить поток
+
+    def __init__(self, connect, max_queue: int = 10000, batch_size: int = 200, flush_interval: float = 0.5):
+        """
+            Инициализация фоновой записи.
+
+            Args:
+                connect: Функция без аргументов, открывающая соединение с базой
+                    (вызывается в фоновом потоке)
+                max_queue (int): Максимальный размер очереди; при переполнении
+                    постановка в очередь ждет освобождения места
+                batch_size (int): Максимальное число записей в одной транзакции
+                flush_interval (float): Максимальная задержка записи в секундах
+        """
+        # Инициализация логгера для отслеживания работы
+        self.logger = AppLogger()
+
+        self.connect = connect                # Фабрика соединений
+        self.batch_size = batch_size          # Размер пакета
+        self.flush_interval = flush_interval  # Интервал сброса
+
+        self.queue = queue.Queue(maxsize=max_queue)  # Ограниченная очередь записей
+        self.thread = None                           # Фоновый поток записи
+        self.lock = threading.Lock()                 # Защита запуска/остановки потока
+        self.start_error = None                      # Ошибка открытия соединения при запуске потока
+
+        # Статистика записи (обновляется фоновым потоком, читается под stats_lock)
+        self.stats_lock = threading.Lock()
+        self.batch_latency = LatencyHistogram()  # Время записи пакета в секундах
+        self.written = 0                         # Записано операций
+        self.failed = 0                          # Операций, завершившихся ошибкой
+
+        # Сброс очереди при завершении процесса
+        atexit.register(self.close)
+
+    def submit(self, sql: str, params=()):
+        """
+            Постановка записи в очередь.
+
+            Args:
+                sql (str): SQL-запрос изменения данных
+                params: Параметры запроса
+
+            Raises:
+                Exception: Ошибка открытия соединения с базой при запуске потока
+        """
+        self._ensure_started()
+        self.queue.put((sql, params))
+
+    def pending(self) -> bool:
+        """
+            Есть ли записи, еще не сохраненные в базу.
+        """
+        return self.queue.unfinished_tasks > 0
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """
+            Ожидание записи всех поставленных в очередь операций.
+
+            Args:
+                timeout (float): Максимальное время ожидания в секундах
+
+            Returns:
+                bool: True, если очередь записана, False - если истек timeout
+
+            Raises:
+                Exception: Ошибка открытия соединения при перезапуске остановившегося потока
+        """
+        if self.thread is None or not self.pending():
+            return True
+        self._ensure_started()  # Остановившийся поток перезапускается, иначе очередь некому записать
+        done = threading.Event()
+        try:
+            self.queue.put((self._FLUSH, done), timeout=timeout)
+        except queue.Full:
+            done = None
+        if done is None or not done.wait(timeout):
+            self.logger.warning(
+                f"Очередь фоновой записи не записана за {timeout} с (операций в очереди: {self.queue.qsize()})"
+            )
+            return False
+        return True
+
+    def close(self):
+        """
+            Сброс очереди и остановка фонового потока.
+
+            Поток будет запущен снова при следующей записи.
+        """
+        with self.lock:
+            if self.thread is None:
+                return
+            if self.thread.is_alive():
+                self.queue.put((self._STOP, None))
+                self.thread.join()
+            self.thread = None
+
+    def _ensure_started(self):
+        """
+            Ленивый запуск фонового потока записи и перезапуск, если поток остановился.
+
+            Raises:
+                Exception: Ошибка открытия соединения с базой в фоновом потоке
+        """
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            if self.thread is not None:
+                self.logger.error(f"Поток фоновой записи остановился, перезапуск (операций в очереди: {self.queue.qsize()})")
+
+            # Поток открывает соединение сам (соединение SQLite привязано к потоку),
+            # запуск ждет результата, чтобы ошибка дошла до вызывающего кода
+            started = threading.Event()
+            self.start_error = None
+            self.thread = threading.Thread(target=self._run, args=(started,), name="write-behind", daemon=True)
+            self.thread.start()
+            started.wait()
+            if self.start_error is not None:
+                self.thread = None
+                error, self.start_error = self.start_error, None
+                self.logger.error(f"Не удалось открыть соединение фоновой записи: {error}")
+                raise error
+
+    def _run(self, started: threading.Event):
+        """
+            Основной цикл фонового потока: сбор пакета и запись одной транзакцией.
+
+            Args:
+                started (threading.Event): Устанавливается после открытия соединения
+        """
+        try:
+            conn = self.connect()
+        except Exception as e:
+            self.start_error = e
+            started.set()
+            return
+        started.set()
+        try:
+            while True:
+                batch = [self.queue.get()]  # Ожидание первой записи пакета
+                deadline = time.monotonic() + self.flush_interval
+
+                # Добор пакета до batch_size или до истечения интервала
+                while len(batch) < self.batch_size and batch[-1][0] not in (self._FLUSH, self._STOP):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                self._write_batch(conn, [item for item in batch if item[0] not in (self._FLUSH, self._STOP)])
+
+                stop = False
+                for item in batch:
+                    if item[0] is self._FLUSH:
+                        item[1].set()   # Сообщаем ожидающему flush() о завершении
+                    elif item[0] is self._STOP:
+                        stop = True
+                    self.queue.task_done()
+
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn, items):
+        """
+            Запись пакета одной транзакцией.
+
+            Подряд идущие одинаковые запросы объединяются в executemany,
+            порядок операций сохраняется.
+
+            Args:
+                conn: Соединение с базой фонового потока
+                items (list): Список пар (sql, params)
+        """
+        if not items:
+            return
+
+        # Группировка подряд идущих одинаковых запросов
+        groups = []
+        for sql, params in items:
+            if groups and groups[-1][0] == sql:
+                groups[-1][1].append(params)
+            else:
+                groups.append((sql, [params]))
+
+        started = time.perf_counter()
+        try:
+            with conn:  # Одна транзакция и один commit на весь пакет
+                for sql, params_list in groups:
+                    conn.executemany(sql, params_list)
+        except Exception as e:
+            # Пакет откатан целиком - повторяем по одной операции,
+            # чтобы одна ошибочная запись не потеряла остальные
+            self.logger.warning(f"Ошибка фоновой записи пакета из {len(items)} операций, запись по одной: {e}")
+            self._write_each(conn, items)
+            return
+
+        with self.stats_lock:
+            self.batch_latency.record(time.perf_counter() - started)
+            self.written += len(items)
+
+    def _write_each(self, conn, items):
+        """
+            Запись операций по одной, каждая в своей транзакции
+            (после ошибки записи пакета).
+
+            Args:
+                conn: Соединение с базой фонового потока
+                items (list): Список пар (sql, params)
+        """
+        written = failed = 0
+        for sql, params in items:
+            try:
+                with conn:
+                    conn.execute(sql, params)
+                written += 1
+            except Exception as e:
+                failed += 1
+                self.logger.error(f"Ошибка фоновой записи: {e}. Запрос: {sql.strip()[:200]}")
+
+        with self.stats_lock:
+            self.written += written
+            self.failed += failed